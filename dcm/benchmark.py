@@ -0,0 +1,516 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import copy
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from dcm.dcm_chart import DcmChart
+from dcm.dcm_core import (
+    Achievement,
+    CompetenceTree,
+    DynamicCompetenceMap,
+    Learner,
+)
+from dcm.generator import CompetenceTreeGenerator, GeneratorConfig
+from dcm.svg import DonutSegment, SVGConfig, SVGNodeConfig
+from dcm.version import Version
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    the timings of the rendering pipeline stages for one example
+
+    Attributes:
+        name (str): the file name of the example without extension
+        tree_id (str): the id of the competence tree
+        text_mode (str): the text display mode
+        with_learner (bool): True if the achievements of a learner were rendered
+        elements (int): number of elements of the competence tree
+        svg_size (int): size of the SVG markup in bytes
+        timings (Dict[str, float]): the best time in seconds of each stage by stage name
+    """
+
+    name: str
+    tree_id: str
+    text_mode: str
+    with_learner: bool
+    elements: int = 0
+    svg_size: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total(self) -> float:
+        """
+        the total time of all stages
+        """
+        total = sum(self.timings.values())
+        return total
+
+
+class Benchmark:
+    """
+    a benchmark of the stages of the rendering pipeline
+    for the bundled competence tree examples and synthetic
+    trees of increasing size
+    """
+
+    stages = [
+        "parse",
+        "from_dict",
+        "update_paths",
+        "calculate_ring_specs",
+        "inner_circle",
+        "calculate_segments",
+        "pie_elements",
+        "legend",
+        "svg_markup",
+    ]
+    text_modes = ["empty", "horizontal", "angled", "curved"]
+
+    def __init__(
+        self,
+        repeat: int = 3,
+        text_modes: Optional[List[str]] = None,
+        names: Optional[List[str]] = None,
+        examples_path: Optional[str] = None,
+        markup: str = "yaml",
+        with_examples: bool = True,
+        synthetic: Optional[List[int]] = None,
+        seed: int = 42,
+    ):
+        """
+        constructor
+
+        Args:
+            repeat (int): number of runs per example - the best time of each stage is reported
+            text_modes (List[str]): the text modes to benchmark - None for all
+            names (List[str]): the file names of the examples to benchmark - None for all
+            examples_path (str): the root directory of the examples - None for the bundled examples
+            markup (str): the markup of the examples ('json' or 'yaml')
+            with_examples (bool): if True benchmark the examples
+            synthetic (List[int]): the approximate facet counts of synthetic trees to benchmark
+                for scaling curves - None for no synthetic trees
+            seed (int): the seed of the synthetic tree generator
+        """
+        self.repeat = repeat
+        self.text_modes = text_modes or Benchmark.text_modes
+        self.names = names
+        self.examples_path = examples_path
+        self.markup = markup
+        self.with_examples = with_examples
+        self.synthetic = synthetic or []
+        self.seed = seed
+        self.results: List[BenchmarkResult] = []
+        # the seconds per operation of alternative implementations by comparison name
+        self.comparisons: Dict[str, Dict[str, float]] = {}
+
+    def get_learner(self, competence_tree: CompetenceTree) -> Learner:
+        """
+        get a learner with an achievement for each element of the
+        outermost visible ring of the given tree
+
+        Args:
+            competence_tree (CompetenceTree): the competence tree
+
+        Returns:
+            Learner: a learner with deterministic achievement levels
+        """
+        levels = [level.level for level in competence_tree.levels] or [1]
+        level_name = "facet"
+        for level_name in ["facet", "area", "aspect"]:
+            ring_spec = competence_tree.ring_specs.get(level_name)
+            if ring_spec is None or not ring_spec.empty:
+                break
+        achievements = []
+        elements = competence_tree.elements_by_level[level_name]
+        for index, element in enumerate(elements):
+            achievement = Achievement(
+                path=element.path, level=levels[index % len(levels)]
+            )
+            achievements.append(achievement)
+        learner = Learner(learner_id="benchmark", achievements=achievements)
+        return learner
+
+    def calculate_ring_specs(self, competence_tree: CompetenceTree, text_mode: str):
+        """
+        calculate the ring specifications of the given tree and apply
+        the given text mode to all rings as the ring spec view does
+
+        Args:
+            competence_tree (CompetenceTree): the competence tree
+            text_mode (str): the text display mode
+        """
+        competence_tree.calculate_ring_specs(text_mode)
+        for ring_spec in competence_tree.ring_specs.values():
+            ring_spec.text_mode = text_mode
+
+    def time_stage(self, timings: Dict[str, float], stage: str, func: Callable):
+        """
+        run the given function and keep the best time of the given stage
+
+        Args:
+            timings (Dict[str, float]): the best times by stage name
+            stage (str): the name of the stage
+            func (Callable): the function to time
+
+        Returns:
+            the result of the function
+        """
+        start_time = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start_time
+        if stage not in timings or elapsed < timings[stage]:
+            timings[stage] = elapsed
+        return result
+
+    def run_example(
+        self,
+        name: str,
+        definition: str,
+        text_mode: str,
+        with_learner: bool,
+        markup: Optional[str] = None,
+    ) -> BenchmarkResult:
+        """
+        benchmark the rendering pipeline for the given example
+
+        Args:
+            name (str): the file name of the example without extension
+            definition (str): the JSON or YAML definition
+            text_mode (str): the text display mode
+            with_learner (bool): if True render the achievements of a learner
+            markup (str): the markup of the definition - None for my markup
+
+        Returns:
+            BenchmarkResult: the best timings of each stage
+        """
+        markup = markup or self.markup
+        timings = {}
+        for _run in range(self.repeat):
+            data = self.time_stage(
+                timings,
+                "parse",
+                lambda: DynamicCompetenceMap.parse_markup(definition, markup),
+            )
+            tree = self.time_stage(
+                timings, "from_dict", lambda: CompetenceTree.from_dict_fast(data)
+            )
+            self.time_stage(timings, "update_paths", tree.update_paths)
+            learner = self.get_learner(tree) if with_learner else None
+            chart = DcmChart(DynamicCompetenceMap(tree))
+            chart.selected_paths = []
+            self.time_stage(
+                timings,
+                "calculate_ring_specs",
+                lambda: self.calculate_ring_specs(tree, text_mode),
+            )
+            svg = self.time_stage(
+                timings,
+                "inner_circle",
+                lambda: chart.prepare_and_add_inner_circle(
+                    SVGConfig(with_popup=True), tree
+                ),
+            )
+            segments = self.time_stage(
+                timings,
+                "calculate_segments",
+                lambda: chart.calculate_tree_segments(tree),
+            )
+            self.time_stage(
+                timings,
+                "pie_elements",
+                lambda: chart.generate_pie_elements_for_segments(
+                    svg=svg, ct=tree, segments=segments, learner=learner
+                ),
+            )
+            self.time_stage(timings, "legend", lambda: tree.add_legend(svg))
+            svg_markup = self.time_stage(
+                timings,
+                "svg_markup",
+                lambda: svg.get_svg_markup(with_java_script=True),
+            )
+        result = BenchmarkResult(
+            name=name,
+            tree_id=tree.id,
+            text_mode=text_mode,
+            with_learner=with_learner,
+            elements=len(tree.elements_by_path),
+            svg_size=len(svg_markup.encode()),
+            timings=timings,
+        )
+        return result
+
+    def compare_segment_derivation(self, number: int = 2000) -> Dict[str, float]:
+        """
+        compare deriving a stacked segment and node config by replace
+        with deriving them from deep copies
+
+        Args:
+            number (int): the number of derivations to time
+
+        Returns:
+            Dict[str, float]: the seconds per derivation by implementation
+        """
+        segment = DonutSegment(
+            cx=300.0,
+            cy=300.0,
+            inner_radius=100.0,
+            outer_radius=150.0,
+            start_angle=0.0,
+            end_angle=45.0,
+            text_mode="curved",
+        )
+        config = SVGNodeConfig(
+            x=300.0,
+            y=300.0,
+            fill="#C0C0C0",
+            title="Facet",
+            comment="CompetenceFacet:" + "description " * 20,
+            url="http://example.com/description/tree/aspect/area/facet",
+        )
+
+        def derive_by_deepcopy():
+            stacked_segment = copy.deepcopy(segment)
+            object.__setattr__(stacked_segment, "outer_radius", 125.0)
+            stacked_config = copy.deepcopy(config)
+            object.__setattr__(stacked_config, "fill", "#00FF00")
+
+        def derive_by_replace():
+            segment.replace(outer_radius=125.0)
+            config.replace(fill="#00FF00")
+
+        timings = {
+            "deepcopy": timeit.timeit(derive_by_deepcopy, number=number) / number,
+            "replace": timeit.timeit(derive_by_replace, number=number) / number,
+        }
+        self.comparisons["segment_derivation"] = timings
+        return timings
+
+    def compare_loading(self) -> Dict[str, float]:
+        """
+        compare loading my definitions via the fast path with loading them
+        via the pure python yaml parser and the dataclasses_json schema
+
+        Returns:
+            Dict[str, float]: the best seconds per definition by implementation
+        """
+
+        def load_slow(definition: str, markup: str) -> CompetenceTree:
+            if markup == "yaml":
+                data = yaml.safe_load(definition)
+            else:
+                data = json.loads(definition)
+            return CompetenceTree.from_dict(data)
+
+        def load_fast(definition: str, markup: str) -> CompetenceTree:
+            data = DynamicCompetenceMap.parse_markup(definition, markup)
+            return CompetenceTree.from_dict_fast(data)
+
+        definitions = list(self.iter_definitions())
+        timings = {}
+        for implementation, load in [("from_dict", load_slow), ("fast", load_fast)]:
+            best_times = {}
+            for _run in range(self.repeat):
+                for name, definition, markup in definitions:
+                    self.time_stage(best_times, name, lambda: load(definition, markup))
+            timings[implementation] = sum(best_times.values()) / max(
+                len(definitions), 1
+            )
+        self.comparisons["loading"] = timings
+        return timings
+
+    def run_comparisons(self, verbose: bool = False) -> Dict[str, Dict[str, float]]:
+        """
+        run the comparisons of alternative implementations
+
+        Args:
+            verbose (bool): if True print a line per comparison
+
+        Returns:
+            Dict[str, Dict[str, float]]: the seconds per operation by implementation and comparison name
+        """
+        self.compare_segment_derivation()
+        self.compare_loading()
+        if verbose:
+            for name, timings in self.comparisons.items():
+                timing_text = " ".join(
+                    f"{implementation} {seconds*1e6:.1f} µs"
+                    for implementation, seconds in timings.items()
+                )
+                print(f"{name:32} {timing_text}")
+        return self.comparisons
+
+    def iter_definitions(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        iterate over the definitions to benchmark
+
+        Yields:
+            Tuple[str, str, str]: the name, definition and markup of each tree
+        """
+        if self.with_examples:
+            for name, filepath in sorted(
+                DynamicCompetenceMap.iter_example_files(self.markup, self.examples_path)
+            ):
+                if self.names and name not in self.names:
+                    continue
+                with open(filepath, "r") as definition_file:
+                    definition = definition_file.read()
+                data = DynamicCompetenceMap.parse_markup(definition, self.markup)
+                if DynamicCompetenceMap.is_valid_definition(
+                    data, CompetenceTree.required_keys()
+                ):
+                    yield name, definition, self.markup
+        for total_facets in self.synthetic:
+            config = GeneratorConfig.for_facets(total_facets)
+            generator = CompetenceTreeGenerator(config, seed=self.seed)
+            name = f"synthetic_{config.total_facets}"
+            tree_dict = generator.generate_tree_dict(name)
+            yield name, json.dumps(tree_dict), "json"
+
+    def run(self, verbose: bool = False) -> List[BenchmarkResult]:
+        """
+        run the benchmark for all definitions, text modes and with and without learner
+
+        Args:
+            verbose (bool): if True print a line per result
+
+        Returns:
+            List[BenchmarkResult]: the results
+        """
+        self.results = []
+        for name, definition, markup in self.iter_definitions():
+            for text_mode in self.text_modes:
+                for with_learner in [False, True]:
+                    result = self.run_example(
+                        name, definition, text_mode, with_learner, markup
+                    )
+                    self.results.append(result)
+                    if verbose:
+                        learner_mode = "learner" if with_learner else "tree"
+                        print(
+                            f"{name:32} {text_mode:10} {learner_mode:7} "
+                            f"{result.elements:7} elements "
+                            f"{result.total*1000:8.1f} ms {result.svg_size:8} bytes"
+                        )
+        return self.results
+
+    def as_dict(self) -> dict:
+        """
+        get the machine readable results including the environment
+        """
+        benchmark_dict = {
+            "version": Version.version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "repeat": self.repeat,
+            "seed": self.seed,
+            "stages": Benchmark.stages,
+            "results": [asdict(result) for result in self.results],
+            "comparisons": self.comparisons,
+        }
+        return benchmark_dict
+
+    def save(self, json_path: str):
+        """
+        save the results as JSON to the given path
+        """
+        json_dir = os.path.dirname(json_path)
+        if json_dir:
+            os.makedirs(json_dir, exist_ok=True)
+        with open(json_path, "w") as json_file:
+            json.dump(self.as_dict(), json_file, indent=2)
+
+
+def main(argv: list = None):
+    """
+    run the benchmark from the command line
+    """
+    parser = ArgumentParser(
+        description="benchmark the dcm rendering pipeline for the competence tree examples"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="dcm-benchmark.json",
+        help="path of the JSON results file [default: %(default)s]",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of runs per example - the best time is reported [default: %(default)s]",
+    )
+    parser.add_argument(
+        "--text_modes",
+        nargs="+",
+        choices=Benchmark.text_modes,
+        help="the text modes to benchmark [default: all]",
+    )
+    parser.add_argument(
+        "--names", nargs="+", help="the examples to benchmark [default: all]"
+    )
+    parser.add_argument(
+        "-rp",
+        "--root_path",
+        help="path to the competence tree definitions [default: the bundled examples]",
+    )
+    parser.add_argument(
+        "--synthetic",
+        nargs="+",
+        type=int,
+        metavar="FACETS",
+        help="also benchmark synthetic trees with about the given numbers of facets e.g. 100 1000 10000",
+    )
+    parser.add_argument(
+        "--no_examples",
+        action="store_true",
+        help="do not benchmark the examples e.g. to get a pure scaling curve",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="seed of the synthetic tree generator [default: %(default)s]",
+    )
+    parser.add_argument(
+        "--comparisons",
+        action="store_true",
+        help="also compare alternative implementations e.g. replace versus deepcopy",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    benchmark = Benchmark(
+        repeat=args.repeat,
+        text_modes=args.text_modes,
+        names=args.names,
+        examples_path=args.root_path,
+        with_examples=not args.no_examples,
+        synthetic=args.synthetic,
+        seed=args.seed,
+    )
+    benchmark.run(verbose=args.verbose)
+    if args.comparisons:
+        benchmark.run_comparisons(verbose=args.verbose)
+    benchmark.save(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
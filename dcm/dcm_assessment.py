@@ -4,8 +4,8 @@ Created on 2024-01-10
 @author: wf
 """
 
-import os
 from datetime import datetime, timezone
+from typing import List, Optional
 
 from ngwidgets.progress import NiceguiProgressbar
 from ngwidgets.webserver import NiceGuiWebserver
@@ -111,6 +111,9 @@ class ButtonRow:
             # Assign it to self.achievement.date_assessed_iso
             self.achievement.date_assessed_iso = date_assessed_iso
 
+        self.assessment.record(self.achievement)
+        if self.assessment.changed_paths is not None:
+            self.assessment.changed_paths.append(self.achievement.path)
         self.set_button_states(self.achievement)
         # refresh the ui
         self.row.update()
@@ -145,25 +148,40 @@ class Assessment:
         self.reset(dcm=dcm, learner=learner)
         self.setup_ui()
 
-    def store(self) -> str:
+    def record(self, achievement: Achievement):
+        """
+        record the change of the given achievement of my learner
+
+        Args:
+            achievement(Achievement): the changed achievement
+        """
+        try:
+            learner_store = self.webserver.webserver.learner_store
+            learner_store.record(self.learner, achievement)
+        except Exception as ex:
+            self.webserver.handle_exception(ex)
+
+    def store(self, flush: bool = False) -> str:
         """
         Store the current state of
         the learner's achievements.
 
+        The learner is handed to the learner store of the webserver
+        which writes it in the background
+
+        Args:
+            flush(bool): if True write the learner immediately e.g. for a download
+
         Returns(str): the path to the file
         """
         file_path = None
         try:
-            # Serialize the learner object to JSON
-            learner_data_json = self.learner.to_json(indent=2)
-
-            # Determine the file path for storing the learner's data
-            filename = self.learner.file_name + ".json"
-            file_path = os.path.join(self.webserver.config.storage_path, filename)
-
-            # Write the serialized data to the file
-            with open(file_path, "w") as file:
-                file.write(learner_data_json)
+            learner_store = self.webserver.webserver.learner_store
+            if flush:
+                learner_store.flush(self.learner)
+                file_path = learner_store.get_file_path(self.learner)
+            else:
+                file_path = learner_store.schedule(self.learner)
 
             if self.debug:
                 print(f"Learner data stored in {file_path}")
@@ -189,10 +207,14 @@ class Assessment:
         self.competence_tree = dcm.competence_tree
         self.learner = learner
         self.achievement_index = 0
+        # paths of the achievements changed since the last rendering
+        # None forces a full rendering
+        self.changed_paths: Optional[List[str]] = None
         # do we need setup the achievements?
         if self.learner.achievements is None:
             self.learner.achievements = []
             self.setup_achievements()
+        self.learner.resolve_achievements(self.competence_tree)
         self.total = len(self.learner.achievements)
 
     def clear(self):
@@ -367,7 +389,9 @@ class Assessment:
             self.learner,
             selected_paths=[achievement.path],
             clear_assessment=False,
+            changed_paths=self.changed_paths,
         )
+        self.changed_paths = []
         self.button_row.achievement = achievement
         self.button_row.set_button_states(achievement)
         competence_element = self.competence_tree.lookup_by_path(achievement.path)
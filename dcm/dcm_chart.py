@@ -4,8 +4,8 @@ Created on 2024-01-12
 @author: wf
 """
 
-import copy
-from typing import Dict, List, Optional, Tuple
+import bisect
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
 
 from dcm.dcm_core import (
     CompetenceElement,
@@ -15,7 +15,15 @@ from dcm.dcm_core import (
     Learner,
     RingSpec,
 )
-from dcm.svg import SVG, DonutSegment, SVGConfig, SVGNodeConfig
+from dcm.stage_timer import NULL_TIMER, StageTimer
+from dcm.svg import (
+    SVG,
+    AngleTable,
+    DonutSegment,
+    SVGChunks,
+    SVGConfig,
+    SVGNodeConfig,
+)
 
 
 class DcmChart:
@@ -23,25 +31,59 @@ class DcmChart:
     a Dynamic competence map chart
     """
 
-    def __init__(self, dcm: DynamicCompetenceMap):
+    # the number of memoized layouts e.g. for different text modes kept per tree
+    max_layouts_per_tree = 8
+
+    def __init__(self, dcm: DynamicCompetenceMap, timer: StageTimer = NULL_TIMER):
         """
         Constructor
+
+        Args:
+            dcm (DynamicCompetenceMap): the competence map to visualize
+            timer (StageTimer): instrumentation hooks recording the durations of the
+                rendering stages - the default null timer records nothing
         """
         self.dcm = dcm
+        self.timer = timer
+        # the state of the last rendering for incremental updates
+        self.competence_tree: Optional[CompetenceTree] = None
+        self.segments: Optional[Dict[str, Dict[str, DonutSegment]]] = None
+        self.learner: Optional[Learner] = None
+        # the SVG of the last rendering to keep a patched markup in sync
+        self.markup_svg: Optional[SVG] = None
+        self.with_java_script = True
+        # unit vectors of all segment angles shared by the SVGs of this chart
+        self.angle_table = AngleTable()
 
     def prepare_and_add_inner_circle(
-        self, config, competence_tree: CompetenceTree, lookup_url: str = None
+        self,
+        config,
+        competence_tree: CompetenceTree,
+        lookup_url: str = None,
+        stream: Optional[TextIO] = None,
+        with_java_script: bool = True,
     ):
         """
         prepare the SVG markup generation and add
         the inner_circle
+
+        Args:
+            config (SVGConfig): the SVG configuration
+            competence_tree (CompetenceTree): the competence tree to visualize
+            lookup_url (str): base url for the description links
+            stream (TextIO): optional stream to write the markup to directly
+            with_java_script (bool): if True include the java script in streaming mode
         """
         self.lookup_url = (
             competence_tree.lookup_url if competence_tree.lookup_url else lookup_url
         )
 
         svg = SVG(config)
+        svg.angle_table = self.angle_table
+        svg.timer = self.timer
         self.svg = svg
+        if stream is not None:
+            svg.start_stream(stream, with_java_script=with_java_script)
         config = svg.config
         # center of circle
         self.cx = config.width // 2
@@ -150,12 +192,12 @@ class DcmChart:
 
         """
         level_color = self.dcm.competence_tree.get_level_color(level)
-        stack_element_config = copy.deepcopy(element_config)
-        stack_element_config.fill = level_color
+        stack_element_config = element_config.replace(fill=level_color)
         ratio = level / total_levels
         relative_radius = (segment.outer_radius - segment.inner_radius) * ratio
-        stacked_segment = copy.deepcopy(segment)
-        stacked_segment.outer_radius = segment.inner_radius + relative_radius
+        stacked_segment = segment.replace(
+            outer_radius=segment.inner_radius + relative_radius
+        )
         return stacked_segment, stack_element_config
 
     def add_donut_segment(
@@ -177,13 +219,14 @@ class DcmChart:
         """
         element_config = self.get_element_config(element)
         # make sure we show the text on the original segment
-        text_segment = copy.deepcopy(segment)
+        text_segment = segment
 
         if level_color:
-            element_config.fill = level_color  # Set the color
+            element_config = element_config.replace(fill=level_color)
         if element and element.path in self.selected_paths:
-            element_config.element_class = "selected"
-            element_config.color = "blue"
+            element_config = element_config.replace(
+                element_class="selected", color="blue"
+            )
         # in case we need to draw an achievement
         total_levels = self.dcm.competence_tree.total_valid_levels
 
@@ -193,7 +236,9 @@ class DcmChart:
             if not self.dcm.competence_tree.stacked_levels:
                 ratio = achievement_level / total_levels
                 relative_radius = (segment.outer_radius - segment.inner_radius) * ratio
-                segment.outer_radius = segment.inner_radius + relative_radius
+                segment = segment.replace(
+                    outer_radius=segment.inner_radius + relative_radius
+                )
                 result = svg.add_donut_segment(config=element_config, segment=segment)
             else:
                 # create the stacked segments starting with the highest level
@@ -213,15 +258,16 @@ class DcmChart:
                 # no autofill please
                 # textwrap.fill(element.short_name, width=20)
                 text = element.short_name
-                self.svg.add_text_to_donut_segment(
-                    text_segment, text, direction=text_mode
-                )
+                with self.timer.stage("text"):
+                    self.svg.add_text_to_donut_segment(
+                        text_segment, text, direction=text_mode
+                    )
         # in stacked mode show the level circles
         # by drawing arcs even if no achievements
         # are available
         if ringspec and ringspec.levels_visible:
             if total_levels:
-                svg.add_element(f"<!-- arcs for {element.path} -->")
+                svg.add_comment(f"arcs for {element.path}")
                 for level in range(total_levels):
                     stacked_segment, stack_element_config = self.get_stacked_segment(
                         level, total_levels, segment, element_config
@@ -257,8 +303,7 @@ class DcmChart:
             if level_color:
                 # set the color and radius of
                 # the segment for achievement
-                # make sure we don't interfere with the segment calculations
-                segment = copy.deepcopy(segment)
+                # segments are immutable so the segment calculations are not affected
                 result = self.add_donut_segment(
                     svg, element, segment, level_color, achievement.level
                 )
@@ -313,14 +358,172 @@ class DcmChart:
                                                            to its corresponding DonutSegment.
             learner (Learner): The learner object containing achievement data.
         """
+        for _element in self.iter_pie_elements_for_segments(svg, ct, segments, learner):
+            pass
+
+    def iter_pie_elements_for_segments(
+        self,
+        svg: SVG,
+        ct: CompetenceTree,
+        segments: Dict[str, Dict[str, DonutSegment]],
+        learner: Learner,
+    ) -> Iterator[CompetenceElement]:
+        """
+        Generate pie elements for the competence tree using pre-calculated segments
+        one element at a time e.g. to allow streaming the markup.
+
+        Args:
+            svg (SVG): The SVG object where the pie elements will be drawn.
+            ct (CompetenceTree): The competence tree structure.
+            segments (Dict[str, Dict[str, DonutSegment]]): the segments by level name and path
+            learner (Learner): The learner object containing achievement data.
+
+        Yields:
+            CompetenceElement: each element after its pie elements have been added to the svg
+        """
         for level_name, segment_dict in segments.items():
             ringspec = ct.ring_specs[level_name]
             for path, segment in segment_dict.items():
                 element = ct.elements_by_path.get(path, None)
                 if element:
+                    svg.start_fragment(self.get_fragment_id(path))
                     self.generate_donut_segment_for_element(
                         svg, element, learner, segment=segment, ringspec=ringspec
                     )
+                    svg.end_fragment()
+                    yield element
+
+    @staticmethod
+    def get_fragment_id(path: str) -> str:
+        """
+        get the id of the fragment group of the competence element with the given path
+
+        Args:
+            path (str): the path of the competence element
+
+        Returns:
+            str: the fragment id
+        """
+        fragment_id = f"dcm-{path.replace('/', '.')}"
+        return fragment_id
+
+    def generate_ring_fragments(self, level_name: str) -> Dict[str, str]:
+        """
+        recalculate the radii of the segments of the given ring from its
+        current ring specification and generate the markup of the
+        fragments of the ring's elements
+
+        the angles of the segments of the last rendering are kept so that
+        only the affected ring needs to be regenerated e.g. when
+        a ring spec slider is dragged
+
+        the segments of the last rendering are never modified since they
+        may be shared with other charts - the chart gets a new segment dict
+        for the changed ring instead
+
+        the complete fragment group of each element of the ring is
+        regenerated and not only the changed "d" attributes of its paths
+        since the text placement and the stacked achievement segments depend
+        on the radii as well
+
+        Args:
+            level_name (str): the ring level e.g. "aspect", "area" or "facet"
+
+        Returns:
+            Dict[str, str]: the fragment markup by fragment id
+        """
+        if self.segments is None:
+            raise ValueError("generate_svg_markup needs to be called first")
+        ringspec = self.competence_tree.ring_specs[level_name]
+        inner_radius, outer_radius = self.get_ring_radii(ringspec)
+        segment_dict = {
+            path: segment.replace(
+                inner_radius=inner_radius,
+                outer_radius=outer_radius,
+                text_mode=ringspec.text_mode,
+            )
+            for path, segment in self.segments.get(level_name, {}).items()
+        }
+        self.segments = {**self.segments, level_name: segment_dict}
+        fragments = self.generate_fragments(
+            {path: level_name for path in segment_dict.keys()}
+        )
+        return fragments
+
+    def generate_path_fragments(
+        self, paths: List[str], selected_paths: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        generate the markup of the fragments of the elements with the given paths
+        e.g. after a learner's achievement or the selection changed
+
+        the fragments of the previously and newly selected elements are
+        always included
+
+        Args:
+            paths (List[str]): the paths of the changed elements
+            selected_paths (List[str]): the new selection - None to keep the current selection
+
+        Returns:
+            Dict[str, str]: the fragment markup by fragment id
+        """
+        if self.segments is None:
+            raise ValueError("generate_svg_markup needs to be called first")
+        changed_paths = list(paths)
+        if selected_paths is not None:
+            changed_paths.extend(self.selected_paths)
+            changed_paths.extend(selected_paths)
+            self.selected_paths = selected_paths
+        level_names_by_path = {}
+        for level_name, segment_dict in self.segments.items():
+            for path in changed_paths:
+                if path in segment_dict:
+                    level_names_by_path[path] = level_name
+        fragments = self.generate_fragments(level_names_by_path)
+        return fragments
+
+    def generate_fragments(self, level_names_by_path: Dict[str, str]) -> Dict[str, str]:
+        """
+        generate the markup of the fragments of the given elements
+        based on the segments of the last rendering
+
+        Args:
+            level_names_by_path (Dict[str, str]): the ring level name by element path
+
+        Returns:
+            Dict[str, str]: the fragment markup by fragment id
+        """
+        ct = self.competence_tree
+        svg = SVG(self.svg.config)
+        svg.angle_table = self.angle_table
+        self.svg = svg
+        fragments = {}
+        for path, level_name in level_names_by_path.items():
+            element = ct.elements_by_path.get(path, None)
+            if element:
+                segment = self.segments[level_name][path]
+                ringspec = ct.ring_specs[level_name]
+                svg.elements = []
+                self.generate_donut_segment_for_element(
+                    svg, element, self.learner, segment=segment, ringspec=ringspec
+                )
+                fragments[self.get_fragment_id(path)] = "".join(svg.elements)
+        return fragments
+
+    def get_ring_radii(self, ringspec: RingSpec) -> Tuple[float, float]:
+        """
+        get the inner and outer radius of a ring based on
+        the SVG configuration and the given ring specification
+
+        Args:
+            ringspec (RingSpec): the ring specification
+
+        Returns:
+            Tuple[float, float]: the inner and outer radius
+        """
+        inner_radius = self.svg.config.width / 2 * ringspec.inner_ratio
+        outer_radius = self.svg.config.width / 2 * ringspec.outer_ratio
+        return inner_radius, outer_radius
 
     def create_donut_segment(
         self,
@@ -343,8 +546,7 @@ class DcmChart:
             DonutSegment: A new DonutSegment instance configured as specified.
         """
         # Calculate the actual inner and outer radii based on the SVG config and ringspec ratios
-        inner_radius = self.svg.config.width / 2 * ringspec.inner_ratio
-        outer_radius = self.svg.config.width / 2 * ringspec.outer_ratio
+        inner_radius, outer_radius = self.get_ring_radii(ringspec)
         # Create a new segment for this element
         segment = DonutSegment(
             cx=parent_segment.cx,
@@ -448,7 +650,10 @@ class DcmChart:
         return sub_segments
 
     def calculate_parent_segments(
-        self, segments: Dict[str, DonutSegment], ringspec: RingSpec
+        self,
+        segments: Dict[str, DonutSegment],
+        ringspec: RingSpec,
+        ct: Optional[CompetenceTree] = None,
     ) -> Dict[str, DonutSegment]:
         """
         Aggregates child segments into parent segments, calculating the combined start and end angles
@@ -458,32 +663,62 @@ class DcmChart:
         Args:
             segments: A dictionary of child segments with paths as keys and DonutSegment objects as values.
             ringspec: A RingSpec object specifying the dimensions for the newly created parent segments.
+            ct: the competence tree whose node table is used to find the parents - if None the paths are split
 
         Returns:
             A dictionary of aggregated parent segments with parent paths as keys and newly created DonutSegment objects as values.
         """
-        parent_segments: Dict[str, DonutSegment] = {}
+        # the angle range and a child segment as template by parent path
+        parent_ranges: Dict[str, Tuple[float, float, DonutSegment]] = {}
 
-        for path, segment in segments.items():
-            # Extract the parent path
-            parent_path = "/".join(path.split("/")[:-1])
-            if parent_path not in parent_segments:
+        if ct is not None and segments:
+            # the elements of a level are a contiguous range of the node table
+            node_table = ct.node_table
+            first_element = ct.elements_by_path[next(iter(segments))]
+            level = node_table.levels[first_element.node_index]
+            start = bisect.bisect_left(node_table.levels, level)
+            end = bisect.bisect_right(node_table.levels, level)
+            child_segments = []
+            for index in range(start, end):
+                segment = segments.get(node_table.elements[index].path)
+                if segment is not None:
+                    parent_index = node_table.parents[index]
+                    parent_path = node_table.elements[parent_index].path
+                    child_segments.append((parent_path, segment))
+        else:
+            child_segments = [
+                ("/".join(path.split("/")[:-1]), segment)
+                for path, segment in segments.items()
+            ]
+        for parent_path, segment in child_segments:
+            parent_range = parent_ranges.get(parent_path)
+            if parent_range is None:
                 # For a new parent segment, initialize with current segment's angles
-                parent_segments[parent_path] = self.create_donut_segment(
-                    parent_segment=segment,  # Assuming there's logic to determine this correctly
-                    start_angle=segment.start_angle,
-                    end_angle=segment.end_angle,
-                    ringspec=ringspec,
+                parent_ranges[parent_path] = (
+                    segment.start_angle,
+                    segment.end_angle,
+                    segment,
                 )
             else:
                 # Update existing parent segment's angles
-                parent_segment = parent_segments[parent_path]
-                parent_segment.start_angle = min(
-                    segment.start_angle, parent_segment.start_angle
-                )
-                parent_segment.end_angle = max(
-                    segment.end_angle, parent_segment.end_angle
+                start_angle, end_angle, child_segment = parent_range
+                parent_ranges[parent_path] = (
+                    min(segment.start_angle, start_angle),
+                    max(segment.end_angle, end_angle),
+                    child_segment,
                 )
+        parent_segments: Dict[str, DonutSegment] = {}
+        for parent_path, (
+            start_angle,
+            end_angle,
+            child_segment,
+        ) in parent_ranges.items():
+            parent_segments[parent_path] = self.create_donut_segment(
+                parent_segment=child_segment,
+                start_angle=start_angle,
+                end_angle=end_angle,
+                ringspec=ringspec,
+            )
 
         return parent_segments
 
@@ -513,18 +748,18 @@ class DcmChart:
         if symmetry_level == "facet":
             # work from outer level to inner
             area_segments = self.calculate_parent_segments(
-                sub_segments, ct.ring_specs["area"]
+                sub_segments, ct.ring_specs["area"], ct
             )
             self.level_segments["area"] = area_segments
             aspect_segments = self.calculate_parent_segments(
-                area_segments, ct.ring_specs["aspect"]
+                area_segments, ct.ring_specs["aspect"], ct
             )
             self.level_segments["aspect"] = aspect_segments
         elif symmetry_level == "area":
             # work from outer level to inner
             area_segments = sub_segments
             aspect_segments = self.calculate_parent_segments(
-                area_segments, ct.ring_specs["aspect"]
+                area_segments, ct.ring_specs["aspect"], ct
             )
             self.level_segments["aspect"] = aspect_segments
             # work from middle level to outer
@@ -599,28 +834,330 @@ class DcmChart:
             competence_tree = self.dcm.competence_tree
         self.selected_paths = selected_paths
 
-        competence_tree.calculate_ring_specs(text_mode)
-        svg = self.prepare_and_add_inner_circle(config, competence_tree, lookup_url)
+        with self.timer.stage("calculate_ring_specs"):
+            competence_tree.calculate_ring_specs(text_mode)
+        with self.timer.stage("inner_circle"):
+            svg = self.prepare_and_add_inner_circle(config, competence_tree, lookup_url)
+        segments = self.calculate_tree_segments(competence_tree)
+        svg_markup = self.generate_svg_markup_for_segments(
+            svg, competence_tree, segments, learner, with_java_script
+        )
+        return svg_markup
+
+    def get_layout_key(self, competence_tree: CompetenceTree) -> tuple:
+        """
+        get the key of the layout of the given tree for the prepared inner circle
+
+        Args:
+            competence_tree (CompetenceTree): the competence tree to layout
 
+        Returns:
+            tuple: the layout version of the tree, the symmetry, the ring specifications and the geometry
+        """
+        ring_specs = tuple(
+            (level_name, rs.inner_ratio, rs.outer_ratio, rs.text_mode)
+            for level_name, rs in competence_tree.ring_specs.items()
+        )
+        key = (
+            competence_tree.layout_version,
+            competence_tree.get_symmetry_spec(),
+            ring_specs,
+            self.svg.config.width,
+            self.cx,
+            self.cy,
+            self.tree_radius,
+        )
+        return key
+
+    def calculate_tree_segments(
+        self, competence_tree: CompetenceTree
+    ) -> Dict[str, Dict[str, DonutSegment]]:
+        """
+        calculate the segments for the whole given competence tree
+        based on the center and radius of the prepared inner circle
+
+        the segments only depend on the structure of the tree, the
+        ring specifications and the geometry of the chart so they are
+        memoized in the tree's layouts and shared by all renderings of
+        the tree e.g. the re-renderings of an assessment - the segments
+        must therefore not be modified
+
+        Args:
+            competence_tree (CompetenceTree): the competence tree to layout
+
+        Returns:
+            Dict[str, Dict[str, DonutSegment]]: the segments by level name and path
+        """
+        key = self.get_layout_key(competence_tree)
+        layout = competence_tree.layouts.get(key)
+        if layout is not None:
+            competence_tree.layouts.move_to_end(key)
+            segments, self.angle_table = layout
+            self.svg.angle_table = self.angle_table
+            if self.timer.enabled:
+                self.timer.count("layout_hits")
+            return segments
         segment = DonutSegment(
             cx=self.cx, cy=self.cy, inner_radius=0, outer_radius=self.tree_radius
         )
-        segments = self.calculate_segments(competence_tree, segment)
-        self.generate_pie_elements_for_segments(
-            svg=svg, ct=competence_tree, segments=segments, learner=learner
+        with self.timer.stage("calculate_segments"):
+            segments = self.calculate_segments(competence_tree, segment)
+            # compute the unit vectors of all segment angles in one go
+            for segment_dict in segments.values():
+                self.angle_table.precompute_segments(segment_dict.values())
+        layouts = competence_tree.layouts
+        # evict the least recently used layouts
+        while len(layouts) >= DcmChart.max_layouts_per_tree:
+            layouts.popitem(last=False)
+        layouts[key] = (segments, self.angle_table)
+        if self.timer.enabled:
+            self.timer.count(
+                "segments", sum(len(segment_dict) for segment_dict in segments.values())
+            )
+        return segments
+
+    def generate_svg_markup_for_segments(
+        self,
+        svg: SVG,
+        competence_tree: CompetenceTree,
+        segments: Dict[str, Dict[str, DonutSegment]],
+        learner: Learner = None,
+        with_java_script: bool = True,
+    ) -> str:
+        """
+        generate the SVG markup for the given pre-calculated segments
+
+        Args:
+            svg (SVG): the SVG with the prepared inner circle
+            competence_tree (CompetenceTree): the competence tree to visualize
+            segments (Dict[str, Dict[str, DonutSegment]]): the segments by level name and path
+            learner (Learner, optional): the learner whose achievements are to be shown
+            with_java_script (bool): if True include the java script
+
+        Returns:
+            str: the SVG markup
+        """
+        self.competence_tree = competence_tree
+        self.segments = segments
+        self.learner = learner
+        with self.timer.stage("pie_elements"):
+            self.generate_pie_elements_for_segments(
+                svg=svg, ct=competence_tree, segments=segments, learner=learner
+            )
+        if svg.config.legend_height > 0:
+            with self.timer.stage("legend"):
+                competence_tree.add_legend(svg)
+        if self.timer.enabled:
+            self.timer.count("elements", len(competence_tree.elements_by_path))
+        self.markup_svg = svg
+        self.with_java_script = with_java_script
+        return svg.get_svg_markup(with_java_script=with_java_script)
+
+    def patch_svg_markup(self, fragments: Dict[str, str]) -> str:
+        """
+        apply the given fragments to the SVG of the last rendering
+        e.g. to keep the markup of a display patched in the browser in sync
+
+        Args:
+            fragments (Dict[str, str]): the fragment markup by fragment id
+
+        Returns:
+            str: the complete patched SVG markup
+        """
+        if self.markup_svg is None:
+            raise ValueError("generate_svg_markup needs to be called first")
+        self.markup_svg.patch_fragments(fragments)
+        svg_markup = self.markup_svg.get_svg_markup(
+            with_java_script=self.with_java_script
+        )
+        return svg_markup
+
+    def iter_svg_markup(
+        self,
+        competence_tree: CompetenceTree = None,
+        learner: Learner = None,
+        selected_paths: List = [],
+        config: SVGConfig = None,
+        with_java_script: bool = True,
+        text_mode: str = "empty",
+        lookup_url: str = "",
+    ) -> Iterator[str]:
+        """
+        Generate the SVG markup chunk by chunk without building the full
+        document in memory e.g. for a StreamingResponse. The concatenated
+        chunks are identical to the result of generate_svg_markup.
+
+        Args:
+            see generate_svg_markup
+
+        Yields:
+            str: the chunks of the SVG markup
+        """
+        if competence_tree is None:
+            competence_tree = self.dcm.competence_tree
+        self.selected_paths = selected_paths
+
+        competence_tree.calculate_ring_specs(text_mode)
+        chunks = SVGChunks()
+        svg = self.prepare_and_add_inner_circle(
+            config,
+            competence_tree,
+            lookup_url,
+            stream=chunks,
+            with_java_script=with_java_script,
         )
-        # self.generate_pie_elements(
-        #    level=1,
-        #    svg=svg,
-        #    ct=competence_tree,
-        #    parent_element=competence_tree,
-        #    learner=learner,
-        #    segment=segment,
-        # )
+        segments = self.calculate_tree_segments(competence_tree)
+        for _element in self.iter_pie_elements_for_segments(
+            svg, competence_tree, segments, learner
+        ):
+            yield from chunks
+            chunks.clear()
         if svg.config.legend_height > 0:
             competence_tree.add_legend(svg)
+        svg.end_stream()
+        yield from chunks
 
-        return svg.get_svg_markup(with_java_script=with_java_script)
+    def write_svg_markup(
+        self,
+        stream: TextIO,
+        competence_tree: CompetenceTree = None,
+        learner: Learner = None,
+        selected_paths: List = [],
+        config: SVGConfig = None,
+        with_java_script: bool = True,
+        text_mode: str = "empty",
+        lookup_url: str = "",
+    ):
+        """
+        Write the SVG markup directly to the given text stream e.g. a file.
+
+        Args:
+            stream (TextIO): the stream to write to
+            see generate_svg_markup for the other arguments
+        """
+        for chunk in self.iter_svg_markup(
+            competence_tree=competence_tree,
+            learner=learner,
+            selected_paths=selected_paths,
+            config=config,
+            with_java_script=with_java_script,
+            text_mode=text_mode,
+            lookup_url=lookup_url,
+        ):
+            stream.write(chunk)
+
+    @staticmethod
+    def get_duplicates(names: List[str]) -> List[str]:
+        """
+        get the names occurring more than once in the given list
+
+        Args:
+            names (List[str]): the names e.g. learner ids
+
+        Returns:
+            List[str]: the sorted duplicate names - empty if all names are unique
+        """
+        seen = set()
+        duplicates = set()
+        for name in names:
+            if name in seen:
+                duplicates.add(name)
+            seen.add(name)
+        return sorted(duplicates)
+
+    def generate_svg_markup_batch(
+        self,
+        learners: List[Learner],
+        competence_tree: CompetenceTree = None,
+        config: SVGConfig = None,
+        with_java_script: bool = True,
+        text_mode: str = "empty",
+        lookup_url: str = "",
+    ) -> Dict[str, str]:
+        """
+        Generate the SVG markup for many learners of the same CompetenceTree.
+        The markup of the tree - the inner circle, the pie elements of all
+        competence elements and the legend - is generated only once. For each
+        learner only the achievement overlay segments are generated and spliced
+        into the shared markup.
+
+        Args:
+            learners (List[Learner]): the learners to generate the markup for
+            competence_tree (CompetenceTree, optional): The competence tree structure
+                to be visualized. If None, the competence tree of the DcmChart instance
+                will be used. Defaults to None.
+            config (SVGConfig, optional): Configuration for the SVG canvas and legend.
+            with_java_script (bool, optional): Indicates whether to include JavaScript
+                in the SVG for interactivity. Defaults to True.
+            text_mode(str): text display mode
+            lookup_url (str, optional): Base URL for linking to detailed descriptions
+
+        Returns:
+            Dict[str, str]: the SVG markup by learner_id
+
+        Raises:
+            ValueError: if learner ids are not unique
+        """
+        duplicate_ids = DcmChart.get_duplicates(
+            [learner.learner_id for learner in learners]
+        )
+        if duplicate_ids:
+            raise ValueError(f"duplicate learner ids {duplicate_ids}")
+        if competence_tree is None:
+            competence_tree = self.dcm.competence_tree
+        self.selected_paths = []
+        competence_tree.calculate_ring_specs(text_mode)
+        chunks = SVGChunks()
+        svg = self.prepare_and_add_inner_circle(
+            config,
+            competence_tree,
+            lookup_url,
+            stream=chunks,
+            with_java_script=with_java_script,
+        )
+        segments = self.calculate_tree_segments(competence_tree)
+        self.competence_tree = competence_tree
+        self.segments = segments
+        # the markup without achievements split at the overlay positions
+        base_parts = []
+        # the element and segment of each overlay position
+        overlays = []
+        with self.timer.stage("pie_elements"):
+            for level_name, segment_dict in segments.items():
+                ringspec = competence_tree.ring_specs[level_name]
+                for path, segment in segment_dict.items():
+                    element = competence_tree.elements_by_path.get(path, None)
+                    if element:
+                        svg.start_fragment(self.get_fragment_id(path))
+                        self.generate_donut_segment_for_element(
+                            svg, element, None, segment=segment, ringspec=ringspec
+                        )
+                        if segment.outer_radius != 0.0:
+                            base_parts.append("".join(chunks))
+                            chunks.clear()
+                            overlays.append((element, segment))
+                        svg.end_fragment()
+        if svg.config.legend_height > 0:
+            with self.timer.stage("legend"):
+                competence_tree.add_legend(svg)
+        svg.end_stream()
+        base_parts.append("".join(chunks))
+        svg_markups = {}
+        overlay_chunks = SVGChunks()
+        with self.timer.stage("achievements"):
+            for learner in learners:
+                svg.stream = overlay_chunks
+                parts = [base_parts[0]]
+                for (element, segment), base_part in zip(overlays, base_parts[1:]):
+                    self.generate_donut_segment_for_achievement(
+                        svg, learner, element, segment
+                    )
+                    parts.extend(overlay_chunks)
+                    overlay_chunks.clear()
+                    parts.append(base_part)
+                svg.stream = None
+                svg_markups[learner.learner_id] = "".join(parts)
+        return svg_markups
 
     def save_svg_to_file(self, svg_markup: str, filename: str):
         """
@@ -11,6 +11,7 @@ from ngwidgets.cmd import WebserverCmd
 
 from dcm.dcm_core import DynamicCompetenceMap
 from dcm.dcm_webserver import DynamicCompentenceMapWebServer
+from dcm.render_pool import RenderPool
 
 
 class CompetenceCmd(WebserverCmd):
@@ -29,6 +30,87 @@ class CompetenceCmd(WebserverCmd):
             default=DynamicCompetenceMap.examples_path(),
             help="path to example dcm definition files [default: %(default)s]",
         )
+        parser.add_argument(
+            "--render_cache_size",
+            type=int,
+            default=256,
+            help="maximum number of rendered SVG markups to keep in memory [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--render_cache_dir",
+            help="optional directory for the on-disk tier of the SVG render cache",
+        )
+        parser.add_argument(
+            "--svgz",
+            action="store_true",
+            help="precompute a gzip compressed .svgz file for each rendered SVG in the render cache directory",
+        )
+        parser.add_argument(
+            "--render_mode",
+            choices=RenderPool.modes,
+            default="thread",
+            help="where to run SVG rendering [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--render_workers",
+            type=int,
+            help="number of render workers [default: number of CPUs]",
+        )
+        parser.add_argument(
+            "--render_queue",
+            type=int,
+            default=16,
+            help="number of render requests that may wait for a worker before answering 429 [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--tree_memory_budget",
+            type=int,
+            help="maximum definition file size in bytes of the competence trees to keep loaded [default: no limit]",
+        )
+        parser.add_argument(
+            "--watch_interval",
+            type=float,
+            default=0,
+            help="number of seconds between checks for changed competence tree definitions e.g. 2 - 0 disables hot reload [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--description_cache_size",
+            type=int,
+            default=4096,
+            help="maximum number of rendered element descriptions to keep in memory [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--prerender_descriptions",
+            action="store_true",
+            help="render all element descriptions of a competence tree in the background when its first description is requested",
+        )
+        parser.add_argument(
+            "--instrument",
+            action="store_true",
+            help="record the durations of the rendering stages - see /render/stats",
+        )
+        parser.add_argument(
+            "--store_delay",
+            type=float,
+            default=2.0,
+            help="maximum number of seconds before changes of a learner are written - 0 for immediate writes [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--learner_store",
+            choices=["json", "events", "sqlite"],
+            default="json",
+            help="json: rewrite the learner file, events: append achievement changes to a log, sqlite: use an indexed database [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--learner_db",
+            help="path of the SQLite learner database [default: learners.db in the storage path]",
+        )
+        parser.add_argument(
+            "--compaction_threshold",
+            type=int,
+            default=100,
+            help="number of logged events after which a learner log is compacted into the learner file [default: %(default)s]",
+        )
         return parser
 
 
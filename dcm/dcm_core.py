@@ -6,10 +6,22 @@ Created on 2023-06-11
 
 import json
 import os
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from json.decoder import JSONDecodeError
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
 import markdown2
 import yaml
@@ -18,6 +30,74 @@ from basemkit.yamlable import YamlAble, lod_storable
 from slugify import slugify
 
 from dcm.svg import SVG, SVGNodeConfig
+from dcm.tree_cache import TreeCache
+
+try:
+    # optional faster JSON parser
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# use the libyaml based C loader if available
+YamlSafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def get_field_converters(cls) -> Dict[str, Any]:
+    """
+    get the scalar type converters for the constructor fields of the given dataclass
+
+    the converters are cached per class
+
+    Args:
+        cls: the dataclass
+
+    Returns:
+        Dict[str, Any]: the scalar type (str, int, float or bool) by field name - None for other types
+    """
+    converters = cls.__dict__.get("_field_converters")
+    if converters is None:
+        type_hints = get_type_hints(cls)
+        converters = {}
+        for dataclass_field in fields(cls):
+            if not dataclass_field.init:
+                continue
+            field_type = type_hints[dataclass_field.name]
+            if get_origin(field_type) is Union:
+                # Optional[x]
+                field_types = [t for t in get_args(field_type) if t is not type(None)]
+                if len(field_types) == 1:
+                    field_type = field_types[0]
+            converter = field_type if field_type in (str, int, float, bool) else None
+            converters[dataclass_field.name] = converter
+        cls._field_converters = converters
+    return converters
+
+
+def get_init_kwargs(cls, data: dict) -> dict:
+    """
+    get the constructor keyword arguments for the given dataclass from the given
+    dict ignoring unknown keys and fields that are not part of the constructor
+
+    scalar values are converted to the field type the same way
+    dataclasses_json does e.g. an int time is converted to a float
+
+    Args:
+        cls: the dataclass
+        data (dict): the dict e.g. from parsing a JSON or YAML definition
+
+    Returns:
+        dict: the keyword arguments
+    """
+    converters = get_field_converters(cls)
+    kwargs = {}
+    for key, value in data.items():
+        if key not in converters:
+            continue
+        converter = converters[key]
+        if converter is not None and value is not None and type(value) is not converter:
+            value = converter(value)
+        kwargs[key] = value
+    return kwargs
 
 
 @dataclass_json
@@ -48,6 +128,15 @@ class RingSpec:
         )
         return empty
 
+    @classmethod
+    def from_dict_fast(cls, data: dict) -> "RingSpec":
+        """
+        create a ring specification from the given dict
+        bypassing the dataclasses_json schema machinery
+        """
+        ring_spec = cls(**get_init_kwargs(cls, data))
+        return ring_spec
+
 
 @dataclass_json
 @dataclass
@@ -86,6 +175,21 @@ class CompetenceElement:
         if self.short_name is None:
             self.short_name = self.name[:10]
 
+    @classmethod
+    def from_dict_fast(cls, data: dict) -> "CompetenceElement":
+        """
+        create a competence element from the given dict
+        bypassing the dataclasses_json schema machinery
+
+        Args:
+            data (dict): the dict e.g. from parsing a JSON or YAML definition
+
+        Returns:
+            CompetenceElement: the competence element
+        """
+        element = cls(**get_init_kwargs(cls, data))
+        return element
+
     def as_html(self) -> str:
         """
         convert me to html
@@ -148,6 +252,19 @@ class CompetenceArea(CompetenceElement):
 
     facets: List[CompetenceFacet] = field(default_factory=list)
 
+    @classmethod
+    def from_dict_fast(cls, data: dict) -> "CompetenceArea":
+        """
+        create a competence area with its facets from the given dict
+        """
+        kwargs = get_init_kwargs(cls, data)
+        if kwargs.get("facets") is not None:
+            kwargs["facets"] = [
+                CompetenceFacet.from_dict_fast(facet) for facet in kwargs["facets"]
+            ]
+        area = cls(**kwargs)
+        return area
+
 
 @dataclass_json
 @dataclass
@@ -161,6 +278,19 @@ class CompetenceAspect(CompetenceElement):
 
     areas: List[CompetenceArea] = field(default_factory=list)
 
+    @classmethod
+    def from_dict_fast(cls, data: dict) -> "CompetenceAspect":
+        """
+        create a competence aspect with its areas from the given dict
+        """
+        kwargs = get_init_kwargs(cls, data)
+        if kwargs.get("areas") is not None:
+            kwargs["areas"] = [
+                CompetenceArea.from_dict_fast(area) for area in kwargs["areas"]
+            ]
+        aspect = cls(**kwargs)
+        return aspect
+
 
 @dataclass_json
 @dataclass
@@ -179,6 +309,115 @@ class CompetenceLevel(CompetenceElement):
     utf8_icon: Optional[str] = None
 
 
+@dataclass
+class NodeTable:
+    """
+    a compact integer indexed table of the elements of a competence tree
+
+    the nodes are numbered breadth first so that the children of each node
+    have consecutive indices - the level of a node is its depth
+    0: tree, 1: aspect, 2: area, 3: facet
+
+    Attributes:
+        elements (List[CompetenceElement]): the element of each node
+        parents (List[int]): the index of the parent of each node - -1 for the tree
+        levels (List[int]): the level of each node
+        child_starts (List[int]): the index of the first child of each node
+        child_ends (List[int]): the index after the last child of each node
+
+    the node index of each element is available as its node_index attribute
+    """
+
+    elements: List[CompetenceElement] = field(default_factory=list)
+    parents: List[int] = field(default_factory=list)
+    levels: List[int] = field(default_factory=list)
+    child_starts: List[int] = field(default_factory=list)
+    child_ends: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    @classmethod
+    def of_tree(cls, tree: "CompetenceTree") -> "NodeTable":
+        """
+        create the node table of the given tree from its elements by level
+        and set the node index of each element
+
+        Args:
+            tree (CompetenceTree): the tree with updated paths
+
+        Returns:
+            NodeTable: the node table
+        """
+        level_elements = [
+            tree.elements_by_level[level_name] for level_name in tree.level_names
+        ]
+        elements = [element for elements in level_elements for element in elements]
+        for index, element in enumerate(elements):
+            element.node_index = index
+        levels = [
+            level
+            for level, elements_of_level in enumerate(level_elements)
+            for _element in elements_of_level
+        ]
+        parents = [-1] + [0] * len(level_elements[1])
+        parents.extend(area.aspect.node_index for area in level_elements[2])
+        parents.extend(facet.area.node_index for facet in level_elements[3])
+        # leaves have an empty child range
+        child_starts = list(range(len(elements)))
+        child_ends = list(child_starts)
+        for index in range(len(elements) - 1, 0, -1):
+            child_starts[parents[index]] = index
+        for index in range(1, len(elements)):
+            child_ends[parents[index]] = index + 1
+        node_table = cls(
+            elements=elements,
+            parents=parents,
+            levels=levels,
+            child_starts=child_starts,
+            child_ends=child_ends,
+        )
+        return node_table
+
+    def get_parent(self, element: CompetenceElement) -> Optional[CompetenceElement]:
+        """
+        get the parent of the given element
+
+        Args:
+            element (CompetenceElement): an element of the tree
+
+        Returns:
+            Optional[CompetenceElement]: the parent - None for the tree
+        """
+        parent_index = self.parents[element.node_index]
+        parent = self.elements[parent_index] if parent_index >= 0 else None
+        return parent
+
+    def get_ids(self, index: int) -> List[str]:
+        """
+        get the ids of the path of the node with the given index by following the parent indices
+
+        Args:
+            index (int): the node index
+
+        Returns:
+            List[str]: the ids from the tree down to the node
+        """
+        ids = []
+        while index >= 0:
+            ids.append(self.elements[index].id)
+            index = self.parents[index]
+        ids.reverse()
+        return ids
+
+    def get_children(self, index: int) -> List[CompetenceElement]:
+        """
+        get the child elements of the node with the given index
+        """
+        children = self.elements[self.child_starts[index] : self.child_ends[index]]
+        return children
+
+
 @dataclass_json
 @dataclass
 class CompetenceTree(CompetenceElement, YamlAble["CompetenceTree"]):
@@ -213,6 +452,42 @@ class CompetenceTree(CompetenceElement, YamlAble["CompetenceTree"]):
         self.update_paths()
         self.calculate_ring_specs("empty")
 
+    @classmethod
+    def from_dict_fast(cls, data: dict) -> "CompetenceTree":
+        """
+        create a competence tree from the given dict
+        bypassing the dataclasses_json schema machinery
+
+        gives the same result as from_dict for valid definitions
+        but is considerably faster for large trees
+
+        Args:
+            data (dict): the dict e.g. from parsing a JSON or YAML definition
+
+        Returns:
+            CompetenceTree: the competence tree
+        """
+        kwargs = get_init_kwargs(cls, data)
+        if kwargs.get("aspects") is not None:
+            kwargs["aspects"] = [
+                CompetenceAspect.from_dict_fast(aspect) for aspect in kwargs["aspects"]
+            ]
+        if kwargs.get("levels") is not None:
+            kwargs["levels"] = [
+                CompetenceLevel.from_dict_fast(level) for level in kwargs["levels"]
+            ]
+        if kwargs.get("element_names") is not None:
+            kwargs["element_names"] = {
+                key: str(value) for key, value in kwargs["element_names"].items()
+            }
+        if kwargs.get("ring_specs") is not None:
+            kwargs["ring_specs"] = {
+                key: RingSpec.from_dict_fast(ring_spec)
+                for key, ring_spec in kwargs["ring_specs"].items()
+            }
+        tree = cls(**kwargs)
+        return tree
+
     def calculate_ring_specs(self, text_mode: str):
         """
         calculate the ring specifications
@@ -253,6 +528,16 @@ class CompetenceTree(CompetenceElement, YamlAble["CompetenceTree"]):
             self.ring_specs[rl].symmetry_mode = None
         if symmetry_level in self.ring_specs:
             self.ring_specs[symmetry_level].symmetry_mode = symmetry_mode
+        self.invalidate_layouts()
+
+    def invalidate_layouts(self):
+        """
+        drop the memoized chart layouts of this tree and increment the
+        layout version e.g. after the structure or the symmetry changed
+        """
+        self.layout_version = getattr(self, "layout_version", 0) + 1
+        # the memoized layouts by layout key in least recently used order - see DcmChart.calculate_tree_segments
+        self.layouts = OrderedDict()
 
     def get_symmetry_spec(self) -> Tuple[str, str]:
         """
@@ -301,6 +586,7 @@ class CompetenceTree(CompetenceElement, YamlAble["CompetenceTree"]):
         """
         update my paths
         """
+        self.invalidate_layouts()
         self.level_names = ["tree", "aspect", "area", "facet"]
         self.level_attr_names = [None, "aspects", "areas", "facets"]
         self.total_elements = {"tree": 1, "aspects": 0, "areas": 0, "facets": 0}
@@ -338,6 +624,8 @@ class CompetenceTree(CompetenceElement, YamlAble["CompetenceTree"]):
                     self.elements_by_path[facet.path] = facet
                     self.total_elements["facets"] = self.total_elements["facets"] + 1
                     self.elements_by_level["facet"].append(facet)
+        # the elements by level are in breadth first order
+        self.node_table = NodeTable.of_tree(self)
 
     @classmethod
     def required_keys(cls) -> Tuple:
@@ -492,24 +780,53 @@ class Achievement:
     evidence: Optional[str] = None
     date_assessed_iso: Optional[str] = None
 
+    @property
+    def path_parts(self) -> List[str]:
+        """
+        the ids of my path - taken from the node table if I have been
+        resolved otherwise split only once until the path changes
+        """
+        cached = self.__dict__.get("_path_parts")
+        if cached is None or cached[0] is not self.path:
+            cached = (self.path, self.path.split("/"))
+            self.__dict__["_path_parts"] = cached
+        return cached[1]
+
+    def resolve(self, competence_tree: "CompetenceTree") -> Optional[CompetenceElement]:
+        """
+        resolve my path to the element of the given tree and take the ids
+        of my path from the tree's node table via the element's node index
+
+        Args:
+            competence_tree (CompetenceTree): the tree to resolve my path in
+
+        Returns:
+            Optional[CompetenceElement]: the element - None if the path is not part of the tree
+        """
+        element = competence_tree.elements_by_path.get(self.path)
+        if element is not None:
+            path_ids = competence_tree.node_table.get_ids(element.node_index)
+            self.__dict__["_path_parts"] = (self.path, path_ids)
+        return element
+
     @property
     def tree_id(self):
-        parts = self.path.split("/")
+        parts = self.path_parts
         return parts[0] if parts else None
 
     @property
     def aspect_id(self):
-        parts = self.path.split("/")
+        parts = self.path_parts
         return parts[1] if len(parts) > 1 else None
 
     @property
     def area_id(self):
-        parts = self.path.split("/")
+        parts = self.path_parts
         return parts[2] if len(parts) > 2 else None
 
     @property
     def facet_id(self):
-        parts = self.path.split("/")
+        parts = self.path_parts
         return parts[3] if len(parts) > 3 else None
 
 
@@ -586,6 +903,22 @@ class Learner:
         self.achievements_by_path[new_achievement.path] = new_achievement
         self.achievement_indices_by_path[new_achievement.path] = index
 
+    def resolve_achievements(self, competence_tree: "CompetenceTree") -> int:
+        """
+        resolve the paths of my achievements in the given tree
+
+        Args:
+            competence_tree (CompetenceTree): the tree to resolve the paths in
+
+        Returns:
+            int: the number of achievements with a path of the tree
+        """
+        resolved = 0
+        for achievement in self.achievements or []:
+            if achievement.resolve(competence_tree) is not None:
+                resolved += 1
+        return resolved
+
     def get_competence_tree_ids(self) -> List[str]:
         """
         Get all unique competence tree IDs of my achievements.
@@ -657,27 +990,44 @@ class DynamicCompetenceMap:
             Exception: If there's an error in reading or parsing the file, or if the file does not meet the required validation criteria.
         """
         example_dcm_defs = {}
+        for file_prefix, filepath in cls.iter_example_files(markup):
+            with open(filepath, "r") as definition_file:
+                definition_text = definition_file.read()
+            try:
+                definition_data = cls.parse_markup(definition_text, markup)
+                if cls.is_valid_definition(definition_data, required_keys):
+                    if as_text:
+                        example_dcm_defs[file_prefix] = definition_text
+                    else:
+                        example_dcm_defs[file_prefix] = definition_data
+            except Exception as ex:
+                cls.handle_markup_issue(
+                    os.path.basename(filepath), definition_text, ex, markup
+                )
+        return example_dcm_defs
+
+    @classmethod
+    def iter_example_files(
+        cls, markup: str = "json", examples_path: Optional[str] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        iterate over the example definition files with the given markup
+
+        Args:
+            markup (str): the markup format of the files ('json' or 'yaml')
+            examples_path (str): the root directory - None for the default examples path
+
+        Yields:
+            Tuple[str, str]: the file name without extension and the path of each file
+        """
         file_ext = f".{markup}"
-        examples_path = cls.examples_path()
+        if examples_path is None:
+            examples_path = cls.examples_path()
         for dirpath, _dirnames, filenames in os.walk(examples_path):
             for filename in filenames:
                 if filename.endswith(file_ext):
-                    filepath = os.path.join(dirpath, filename)
-                    with open(filepath, "r") as definition_file:
-                        file_prefix = filename.replace(file_ext, "")
-                        definition_text = definition_file.read()
-                        try:
-                            definition_data = cls.parse_markup(definition_text, markup)
-                            if cls.is_valid_definition(definition_data, required_keys):
-                                if as_text:
-                                    example_dcm_defs[file_prefix] = definition_text
-                                else:
-                                    example_dcm_defs[file_prefix] = definition_data
-                        except Exception as ex:
-                            cls.handle_markup_issue(
-                                filename, definition_text, ex, markup
-                            )
-        return example_dcm_defs
+                    file_prefix = filename.replace(file_ext, "")
+                    yield file_prefix, os.path.join(dirpath, filename)
 
     @classmethod
     def parse_markup(cls, text: str, markup: str) -> Union[dict, list]:
@@ -695,10 +1045,13 @@ class DynamicCompetenceMap:
             ValueError: If an unsupported markup format is specified.
         """
         if markup == "json":
-            data = json.loads(text)
+            if orjson is not None:
+                data = orjson.loads(text)
+            else:
+                data = json.loads(text)
             return data
         elif markup == "yaml":
-            data = yaml.safe_load(text)
+            data = yaml.load(text, Loader=YamlSafeLoader)
             return data
         else:
             raise ValueError(f"Unsupported markup format: {markup}")
@@ -727,19 +1080,97 @@ class DynamicCompetenceMap:
         return all(key in definition_data for key in required_keys)
 
     @classmethod
-    def get_examples(cls, content_class=CompetenceTree, markup: str = "json") -> dict:
+    def get_examples(
+        cls,
+        content_class=CompetenceTree,
+        markup: str = "json",
+        tree_cache: Optional["TreeCache"] = None,
+    ) -> dict:
+        """
+        get the examples with the given markup parsing each file only once
+
+        Args:
+            content_class: the class of the examples
+            markup (str): the markup format of the files ('json' or 'yaml')
+            tree_cache (TreeCache): optional cache of parse results to avoid parsing unchanged files
+
+        Returns:
+            dict: the examples by main id
+        """
         examples = {}
-        for name, definition_string in cls.get_example_dcm_definitions(
-            required_keys=content_class.required_keys(), markup=markup
-        ).items():
-            example = cls.from_definition_string(
-                name, definition_string, content_class, markup=markup
+        for name, filepath in cls.iter_example_files(markup):
+            example = cls.load_definition_file(
+                name, filepath, content_class, markup=markup, tree_cache=tree_cache
             )
-            # check the type of the example
-            example_id = example.main_id
-            examples[example_id] = example
+            if example is not None:
+                # check the type of the example
+                example_id = example.main_id
+                examples[example_id] = example
         return examples
 
+    @classmethod
+    def load_definition_file(
+        cls,
+        name: str,
+        filepath: str,
+        content_class=CompetenceTree,
+        markup: str = "json",
+        tree_cache: Optional["TreeCache"] = None,
+    ) -> Any:
+        """
+        load the given definition file parsing it only once
+
+        Args:
+            name (str): A name identifier for the data source.
+            filepath (str): the path of the definition file
+            content_class: the class which will be instantiated with the parsed data
+            markup (str): the markup format of the file ('json' or 'yaml')
+            tree_cache (TreeCache): optional cache of parse results to avoid parsing unchanged files
+
+        Returns:
+            Any: a DynamicCompetenceMap for a CompetenceTree or the content class instance -
+            None if the definition does not have the required keys of the content class
+        """
+        if tree_cache is not None:
+            hit, example = tree_cache.get(filepath, content_class)
+            if hit:
+                return example
+            # get the key before reading so that a concurrent change is not missed
+            key = tree_cache.get_key(filepath, content_class)
+        with open(filepath, "r") as definition_file:
+            definition_string = definition_file.read()
+        example = None
+        try:
+            data = cls.parse_markup(definition_string, markup)
+            if cls.is_valid_definition(data, content_class.required_keys()):
+                example = cls.from_definition_data(data, content_class)
+        except Exception as ex:
+            cls.handle_markup_issue(name, definition_string, ex, markup)
+        if tree_cache is not None:
+            tree_cache.put(filepath, content_class, example, key=key)
+        return example
+
+    @classmethod
+    def from_definition_data(cls, data: dict, content_class) -> Any:
+        """
+        create a DynamicCompetenceMap or Learner instance from parsed definition data
+
+        Args:
+            data (dict): the parsed JSON or YAML definition
+            content_class (dataclass_json): The class which will be instantiated with the parsed data.
+
+        Returns:
+            Any: a DynamicCompetenceMap for a CompetenceTree or the content class instance
+        """
+        if hasattr(content_class, "from_dict_fast"):
+            content = content_class.from_dict_fast(data)
+        else:
+            content = content_class.from_dict(data)
+        if isinstance(content, CompetenceTree):
+            return DynamicCompetenceMap(content)
+        else:
+            return content
+
     @classmethod
     def from_definition_string(
         cls,
@@ -771,10 +1202,7 @@ class DynamicCompetenceMap:
                 debug_file_path = os.path.join("/tmp", f"{name}.json")
                 with open(debug_file_path, "w") as debug_file:
                     json.dump(data, debug_file, indent=2, default=str)
-            content = content_class.from_dict(data)
-            if isinstance(content, CompetenceTree):
-                return DynamicCompetenceMap(content)
-            else:
-                return content
+            content = cls.from_definition_data(data, content_class)
+            return content
         except Exception as ex:
             cls.handle_markup_issue(name, definition_string, ex, markup)
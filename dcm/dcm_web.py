@@ -77,7 +77,7 @@ class RingSpecView:
     def on_level_visible_change(self):
         """ """
         self.ringspec.levels_visible = self.level_visible_checkbox.value
-        self.parent.on_change()
+        self.parent.on_change(self.ring_level)
 
     def on_inner_ratio_change(self, gev: GenericEventArguments):
         """
@@ -85,7 +85,7 @@ class RingSpecView:
         """
         if self.change_enabled:
             self.ringspec.inner_ratio = gev.args
-            self.parent.on_change()
+            self.parent.on_change(self.ring_level)
 
     def on_outer_ratio_change(self, gev: GenericEventArguments):
         """
@@ -93,7 +93,7 @@ class RingSpecView:
         """
         if self.change_enabled:
             self.ringspec.outer_ratio = gev.args
-            self.parent.on_change()
+            self.parent.on_change(self.ring_level)
 
     async def on_text_mode_change(self, args):
         """
@@ -105,7 +105,7 @@ class RingSpecView:
         new_text_mode = args.value
         if new_text_mode != self.ringspec.text_mode:
             self.ringspec.text_mode = new_text_mode
-        self.parent.on_change()
+        self.parent.on_change(self.ring_level)
 
 
 class RingSpecsView:
@@ -181,8 +181,11 @@ class RingSpecsView:
             pass
         self.on_change()
 
-    def on_change(self):
+    def on_change(self, ring_level: str = None):
         """
-        if a ring spec trigger update
+        if a ring spec changed trigger an update
+
+        Args:
+            ring_level (str): the level of the changed ring - None for all rings
         """
-        self.webserver.on_update_ringspecs()
+        self.webserver.on_update_ringspecs(ring_level)
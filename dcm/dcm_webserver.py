@@ -4,24 +4,49 @@ Created on 2023-11-06
 @author: wf
 """
 
+import asyncio
+import json
 import os
+import time
 import uuid
-from typing import List, Optional
+import weakref
+from functools import partial
+from typing import Awaitable, Dict, List, Optional
 from urllib.parse import urlparse
 
-from fastapi import HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import HTTPException, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
 from ngwidgets.file_selector import FileSelector
 from ngwidgets.input_webserver import InputWebserver, InputWebSolution
 from ngwidgets.webserver import WebserverConfig
 from nicegui import Client, app, ui
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 from dcm.dcm_assessment import Assessment
 from dcm.dcm_chart import DcmChart
 from dcm.dcm_core import CompetenceTree, DynamicCompetenceMap, Learner
 from dcm.dcm_web import RingSpecsView
+from dcm.description_cache import DescriptionCache
+from dcm.learner_repository import LearnerRepository, SqliteLearnerRepository
+from dcm.learner_store import LearnerEventLog, LearnerStore
+from dcm.metrics import Counter, Histogram, Metric, Sample, get_metrics_text
+from dcm.render_cache import RenderCache, choose_encoding, compress
+from dcm.render_pool import (
+    RenderPool,
+    RenderPoolSaturated,
+    render_svg_markup,
+    render_svg_markup_timed,
+    render_svg_zip_batch,
+)
+from dcm.stage_timer import (
+    NULL_TIMER,
+    RecordingStageTimer,
+    StageTimer,
+    StageTimingStats,
+)
 from dcm.svg import SVG, SVGConfig
+from dcm.tree_cache import TreeCache
+from dcm.tree_registry import TreeRegistry
 from dcm.version import Version
 
 
@@ -42,6 +67,37 @@ class SVGRenderRequest(BaseModel):
     text_mode: Optional[str] = "empty"
     config: Optional[SVGConfig] = None
 
+    @field_validator("config", mode="before")
+    @classmethod
+    def without_timestamp(cls, config):
+        """
+        switch the timestamp off unless the request explicitly asks for it
+        so that identical requests give identical markup with the same ETag
+        """
+        if isinstance(config, dict) and "with_timestamp" not in config:
+            config = {**config, "with_timestamp": False}
+        return config
+
+
+class SVGBatchRenderRequest(BaseModel):
+    """
+    A request for rendering the SVGs of many learners for the same competence tree.
+
+    Attributes:
+        name (str): The name of the render request.
+        definition (str): The string representation of the competence tree, in either JSON or YAML format.
+        markup (str): The format of the definition ('json' or 'yaml').
+        learners (List[str]): The JSON string representations of the learners.
+        config (SVGConfig): Optional configuration for SVG rendering. Defaults to None, which uses default settings.
+    """
+
+    name: str
+    definition: str
+    markup: str
+    learners: List[str]
+    text_mode: Optional[str] = "empty"
+    config: Optional[SVGConfig] = None
+
 
 class DynamicCompentenceMapWebServer(InputWebserver):
     """
@@ -69,18 +125,103 @@ class DynamicCompentenceMapWebServer(InputWebserver):
         InputWebserver.__init__(
             self, config=DynamicCompentenceMapWebServer.get_config()
         )
-        self.examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        # warm starts load the parsed examples from the tree cache
+        self.tree_cache = TreeCache(
+            os.path.join(self.config.storage_path, "tree_cache")
+        )
+        self.description_cache = DescriptionCache()
+        # the examples are only indexed by tree id here and loaded on first access
+        self.examples = self.get_tree_registry()
+        self.prerender_descriptions = False
+        self.render_cache = RenderCache()
+        self.render_pool = RenderPool()
+        # seconds clients may use rendered SVG markup without revalidating it
+        self.svg_max_age = 60
+        # responses smaller than this number of bytes are not compressed
+        self.min_compress_size = 1024
+        # per stage render timings - only recorded if instrumentation is enabled
+        self.instrument = False
+        self.stage_stats = StageTimingStats()
+        # operational metrics exposed at /metrics
+        self.request_count = Counter(
+            "dcm_http_requests_total",
+            "number of requests by route and status",
+            ("route", "status"),
+        )
+        self.request_latency = Histogram(
+            "dcm_http_request_duration_seconds",
+            "request latencies by route",
+            ("route",),
+        )
+        self.learner_write_latency = Histogram(
+            "dcm_learner_store_write_duration_seconds",
+            "durations of the learner store writes",
+        )
+        # the solutions of the connected clients to count the active assessments
+        self.solutions = weakref.WeakSet()
+        self.learner_store: LearnerRepository = LearnerStore(self.config.storage_path)
+        self.learner_store.write_observer = self.learner_write_latency.observe
+        app.on_shutdown(self.on_shutdown)
 
         # FastAPI endpoints
         @app.post("/svg/")
-        async def render_svg(svg_render_request: SVGRenderRequest) -> HTMLResponse:
+        async def render_svg(
+            request: Request, svg_render_request: SVGRenderRequest
+        ) -> HTMLResponse:
             """
             render the given request
             """
-            return await self.render_svg(svg_render_request)
+            return await self.observe_request(
+                "/svg/",
+                self.render_svg(
+                    svg_render_request,
+                    request.headers.get("if-none-match"),
+                    request.headers.get("accept-encoding"),
+                ),
+            )
+
+        @app.post("/svg/batch")
+        async def render_svg_batch(
+            svg_batch_render_request: SVGBatchRenderRequest,
+        ) -> Response:
+            """
+            render the given batch request
+            """
+            return await self.observe_request(
+                "/svg/batch", self.render_svg_batch(svg_batch_render_request)
+            )
+
+        @app.get("/svg/cache")
+        async def get_render_cache_stats() -> dict:
+            """
+            get the hit/miss/eviction counters of the render cache
+            """
+            return self.render_cache.stats.as_dict()
+
+        @app.get("/render/stats")
+        async def get_render_stage_stats() -> dict:
+            """
+            get the aggregated durations of the rendering stages
+            """
+            return self.stage_stats.as_dict()
+
+        @app.get("/descriptions/stats")
+        async def get_description_cache_stats() -> dict:
+            """
+            get the counters of the description cache
+            """
+            return self.description_cache.stats.as_dict()
+
+        @app.get("/trees/stats")
+        async def get_tree_registry_stats() -> dict:
+            """
+            get the counters of the lazily loaded competence trees
+            """
+            return self.examples.stats.as_dict()
 
         @app.get("/description/{tree_id}/{aspect_id}/{area_id}/{facet_id}")
         async def get_description_for_facet(
+            request: Request,
             tree_id: str,
             aspect_id: str = None,
             area_id: str = None,
@@ -100,11 +241,18 @@ class DynamicCompentenceMapWebServer(InputWebserver):
                 HTMLResponse: HTML content of the description.
             """
             path = f"{tree_id}/{aspect_id}/{area_id}/{facet_id}"
-            return await self.show_description(path)
+            return await self.observe_request(
+                "/description/{path}",
+                self.show_description(
+                    path,
+                    if_none_match=request.headers.get("if-none-match"),
+                    accept_encoding=request.headers.get("accept-encoding"),
+                ),
+            )
 
         @app.get("/description/{tree_id}/{aspect_id}/{area_id}")
         async def get_description_for_area(
-            tree_id: str, aspect_id: str = None, area_id: str = None
+            request: Request, tree_id: str, aspect_id: str = None, area_id: str = None
         ) -> HTMLResponse:
             """
             Endpoints to get the description of a
@@ -119,11 +267,18 @@ class DynamicCompentenceMapWebServer(InputWebserver):
                 HTMLResponse: HTML content of the description.
             """
             path = f"{tree_id}/{aspect_id}/{area_id}"
-            return await self.show_description(path)
+            return await self.observe_request(
+                "/description/{path}",
+                self.show_description(
+                    path,
+                    if_none_match=request.headers.get("if-none-match"),
+                    accept_encoding=request.headers.get("accept-encoding"),
+                ),
+            )
 
         @app.get("/description/{tree_id}/{aspect_id}")
         async def get_description_for_aspect(
-            tree_id: str, aspect_id: str = None
+            request: Request, tree_id: str, aspect_id: str = None
         ) -> HTMLResponse:
             """
             Endpoint to get the description of a competence aspect
@@ -136,10 +291,19 @@ class DynamicCompentenceMapWebServer(InputWebserver):
                 HTMLResponse: HTML content of the description.
             """
             path = f"{tree_id}/{aspect_id}"
-            return await self.show_description(path)
+            return await self.observe_request(
+                "/description/{path}",
+                self.show_description(
+                    path,
+                    if_none_match=request.headers.get("if-none-match"),
+                    accept_encoding=request.headers.get("accept-encoding"),
+                ),
+            )
 
         @app.get("/description/{tree_id}")
-        async def get_description_for_tree(tree_id: str) -> HTMLResponse:
+        async def get_description_for_tree(
+            request: Request, tree_id: str
+        ) -> HTMLResponse:
             """
             Endpoint to get the description of a competence tree
 
@@ -150,40 +314,341 @@ class DynamicCompentenceMapWebServer(InputWebserver):
                 HTMLResponse: HTML content of the description.
             """
             path = f"{tree_id}"
-            return await self.show_description(path)
+            return await self.observe_request(
+                "/description/{path}",
+                self.show_description(
+                    path,
+                    if_none_match=request.headers.get("if-none-match"),
+                    accept_encoding=request.headers.get("accept-encoding"),
+                ),
+            )
 
         # nicegui RESTFul endpoints
         @ui.page("/learner/{learner_slug}")
         async def show_learner(client: Client, learner_slug: str):
-            return await self.page(
-                client, DcmSolution.assess_learner_by_slug, learner_slug
+            return await self.observe_request(
+                "/learner/{learner_slug}",
+                self.page(client, DcmSolution.assess_learner_by_slug, learner_slug),
+            )
+
+        @app.get("/metrics")
+        async def get_metrics() -> PlainTextResponse:
+            """
+            get the operational metrics in the Prometheus text exposition format
+            """
+            return PlainTextResponse(
+                get_metrics_text(self.get_metrics()),
+                media_type="text/plain; version=0.0.4; charset=utf-8",
+            )
+
+    async def observe_request(self, route: str, response: Awaitable):
+        """
+        await the given response of a request to the given route
+        and count it and its latency
+
+        Args:
+            route (str): the route template of the request
+            response (Awaitable): the response to await
+
+        Returns:
+            the response
+        """
+        start_time = time.perf_counter()
+        status = 500
+        try:
+            result = await response
+            status = getattr(result, "status_code", 200)
+            return result
+        except HTTPException as ex:
+            status = ex.status_code
+            raise
+        finally:
+            self.request_count.inc(route, str(status))
+            self.request_latency.observe(time.perf_counter() - start_time, route)
+
+    def get_metrics(self) -> List[Metric]:
+        """
+        get the current operational metrics
+        """
+        render_stats = self.render_cache.stats
+        description_stats = self.description_cache.stats
+        description_lookups = description_stats.hits + description_stats.misses
+        tree_stats = self.examples.stats
+        store_stats = self.learner_store.stats
+        active_assessments = sum(
+            1 for solution in list(self.solutions) if solution.assessment is not None
+        )
+        metrics = [
+            self.request_count,
+            self.request_latency,
+            Sample(
+                "dcm_render_cache_hits_total",
+                "number of SVG renderings answered from the render cache",
+                render_stats.hits + render_stats.disk_hits,
+                "counter",
+            ),
+            Sample(
+                "dcm_render_cache_misses_total",
+                "number of SVG renderings that needed a render",
+                render_stats.misses,
+                "counter",
+            ),
+            Sample(
+                "dcm_render_cache_hit_ratio",
+                "ratio of SVG renderings answered from the render cache",
+                render_stats.hit_ratio,
+            ),
+            Sample(
+                "dcm_render_cache_entries",
+                "number of SVG markups held in memory",
+                render_stats.entries,
+            ),
+            Sample(
+                "dcm_description_cache_hit_ratio",
+                "ratio of descriptions answered from the description cache",
+                (
+                    description_stats.hits / description_lookups
+                    if description_lookups
+                    else 0.0
+                ),
+            ),
+            Sample(
+                "dcm_description_cache_entries",
+                "number of element descriptions held in memory",
+                description_stats.entries,
+            ),
+            Sample(
+                "dcm_render_pool_pending",
+                "number of renderings running or waiting for a worker",
+                self.render_pool.pending,
+            ),
+            Sample(
+                "dcm_trees_indexed",
+                "number of competence trees available",
+                tree_stats.indexed,
+            ),
+            Sample(
+                "dcm_trees_loaded",
+                "number of competence trees loaded in memory",
+                tree_stats.loaded,
+            ),
+            Sample(
+                "dcm_trees_loaded_bytes",
+                "definition size of the loaded competence trees as an estimate of their memory use",
+                tree_stats.loaded_bytes,
+            ),
+            Sample(
+                "dcm_trees_evictions_total",
+                "number of competence trees evicted to stay within the memory budget",
+                tree_stats.evictions,
+                "counter",
+            ),
+            Sample(
+                "dcm_assessments_active",
+                "number of client sessions with an active assessment",
+                active_assessments,
+            ),
+            Sample(
+                "dcm_learner_store_pending",
+                "number of learners waiting to be written",
+                store_stats.pending,
+            ),
+            Sample(
+                "dcm_learner_store_errors_total",
+                "number of failed learner writes",
+                store_stats.errors,
+                "counter",
+            ),
+            self.learner_write_latency,
+        ]
+        return metrics
+
+    async def get_conditional_response(
+        self,
+        content: str,
+        etag: str,
+        if_none_match: Optional[str],
+        max_age: int,
+        accept_encoding: Optional[str] = None,
+        cache_key: Optional[str] = None,
+    ) -> Response:
+        """
+        get a cacheable and - if the client accepts it - compressed response for the given content
+
+        Args:
+            content (str): the HTML or SVG markup
+            etag (str): the entity tag of the content
+            if_none_match (str): the If-None-Match header of the request
+            max_age (int): the number of seconds clients may use the content without revalidating it
+            accept_encoding (str): the Accept-Encoding header of the request
+            cache_key (str): the render cache key of the content to reuse compressed markup - None to compress on the fly
+
+        Returns:
+            Response: a 304 response if the client's copy is still valid else the content
+        """
+        encoding = None
+        if len(content) >= self.min_compress_size:
+            encoding = choose_encoding(accept_encoding)
+        if encoding:
+            # each representation needs its own entity tag
+            etag = f'{etag[:-1]}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={max_age}",
+            "Vary": "Accept-Encoding",
+        }
+        if if_none_match:
+            client_etags = [tag.strip() for tag in if_none_match.split(",")]
+            if etag in client_etags or "*" in client_etags:
+                return Response(status_code=304, headers=headers)
+        if encoding:
+            body = None
+            if cache_key:
+                body = self.render_cache.get_compressed(
+                    cache_key, content, encoding, memory_only=True
+                )
+            if body is None:
+                # read the svgz file or compress without blocking the event loop
+                if cache_key:
+                    compress_content = partial(
+                        self.render_cache.get_compressed, cache_key, content, encoding
+                    )
+                else:
+                    compress_content = partial(compress, content, encoding)
+                body = await asyncio.get_running_loop().run_in_executor(
+                    None, compress_content
+                )
+            headers["Content-Encoding"] = encoding
+            response = Response(
+                content=body, media_type="text/html; charset=utf-8", headers=headers
             )
+        else:
+            response = HTMLResponse(content=content, headers=headers)
+        return response
 
-    async def render_svg(self, svg_render_request: SVGRenderRequest) -> HTMLResponse:
+    async def render_svg(
+        self,
+        svg_render_request: SVGRenderRequest,
+        if_none_match: Optional[str] = None,
+        accept_encoding: Optional[str] = None,
+    ) -> Response:
         """
         render the given request
+
+        the markup is rendered without a timestamp unless the request's
+        configuration asks for one so that identical requests give identical
+        markup with the same ETag
+
+        Args:
+            svg_render_request (SVGRenderRequest): the render request
+            if_none_match (str): the If-None-Match header of the request
+            accept_encoding (str): the Accept-Encoding header of the request
+
+        Returns:
+            Response: the SVG markup or a 304 response if the client's copy is still valid
+
+        Raises:
+            HTTPException: 429 if the render pool is saturated
         """
         r = svg_render_request
-        dcm = DynamicCompetenceMap.from_definition_string(
-            r.name, r.definition, content_class=CompetenceTree, markup=r.markup
+        config = r.config if r.config is not None else SVGConfig(with_timestamp=False)
+        key = RenderCache.get_key(r.definition, r.markup, r.text_mode, config)
+        entry = self.render_cache.get_entry(key, memory_only=True)
+        if entry is None:
+            # the on-disk tier is read without blocking the event loop
+            entry = await asyncio.get_running_loop().run_in_executor(
+                None, self.render_cache.get_entry, key
+            )
+        if entry is not None:
+            svg_markup, etag = entry
+        else:
+            render = render_svg_markup_timed if self.instrument else render_svg_markup
+            try:
+                result = await self.render_pool.run(
+                    render,
+                    r.name,
+                    r.definition,
+                    r.markup,
+                    r.text_mode,
+                    config,
+                )
+            except RenderPoolSaturated as ex:
+                raise HTTPException(
+                    status_code=429, detail=str(ex), headers={"Retry-After": "1"}
+                )
+            if self.instrument:
+                svg_markup, timer_dict = result
+                self.stage_stats.add(timer_dict["timings"], timer_dict["counts"])
+            else:
+                svg_markup = result
+            etag = await asyncio.get_running_loop().run_in_executor(
+                None, self.render_cache.put, key, svg_markup
+            )
+        response = await self.get_conditional_response(
+            svg_markup,
+            etag,
+            if_none_match,
+            self.svg_max_age,
+            accept_encoding=accept_encoding,
+            cache_key=key,
         )
-        dcm_chart = DcmChart(dcm)
-        svg_markup = dcm_chart.generate_svg_markup(
-            config=r.config, with_java_script=True, text_mode=r.text_mode
+        return response
+
+    async def render_svg_batch(
+        self, svg_batch_render_request: SVGBatchRenderRequest
+    ) -> Response:
+        """
+        render the given batch request
+
+        Returns:
+            Response: a zip archive with one SVG per learner
+
+        Raises:
+            HTTPException: 429 if the render pool is saturated
+            HTTPException: 400 if the learners are not unique
+        """
+        r = svg_batch_render_request
+        try:
+            zip_bytes = await self.render_pool.run(
+                render_svg_zip_batch,
+                r.name,
+                r.definition,
+                r.markup,
+                r.learners,
+                r.text_mode,
+                r.config,
+            )
+        except RenderPoolSaturated as ex:
+            raise HTTPException(
+                status_code=429, detail=str(ex), headers={"Retry-After": "1"}
+            )
+        except ValueError as ex:
+            raise HTTPException(status_code=400, detail=str(ex))
+        response = Response(
+            content=zip_bytes,
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{r.name}.zip"'},
         )
-        response = HTMLResponse(content=svg_markup)
         return response
 
-    async def show_description(self, path: str = None) -> HTMLResponse:
+    async def show_description(
+        self,
+        path: str = None,
+        if_none_match: Optional[str] = None,
+        accept_encoding: Optional[str] = None,
+    ) -> Response:
         """
         Show the HTML description of a specific
         competence element given by the path
 
         Args:
             path(str): the path identifying the element
+            if_none_match(str): the If-None-Match header of the request
+            accept_encoding(str): the Accept-Encoding header of the request
 
         Returns:
-            HTMLResponse: The response object containing the HTML-formatted description.
+            Response: The response object containing the HTML-formatted description
+            or a 304 response if the client's copy is still valid
 
         Raises:
             HTTPException: If the example name provided does not exist in the examples collection.
@@ -191,11 +656,38 @@ class DynamicCompentenceMapWebServer(InputWebserver):
         path_parts = path.split("/")
         tree_id = path_parts[0]
         if tree_id in self.examples:
-            example = self.examples[tree_id]
-            element = example.competence_tree.lookup_by_path(path)
+            if self.examples.is_loaded(tree_id):
+                example = self.examples[tree_id]
+            else:
+                # parse the definition without blocking the event loop
+                example = await asyncio.get_running_loop().run_in_executor(
+                    None, self.examples.__getitem__, tree_id
+                )
+            competence_tree = example.competence_tree
+            if self.prerender_descriptions and self.description_cache.needs_prerender(
+                tree_id
+            ):
+                # render the descriptions the user is likely to click next
+                asyncio.get_running_loop().run_in_executor(
+                    None, self.description_cache.prerender, competence_tree
+                )
+            element = competence_tree.lookup_by_path(path)
             if element:
-                content = element.as_html()
-                return HTMLResponse(content=content)
+                entry = self.description_cache.get(element, cached_only=True)
+                if entry is None:
+                    # render the markdown without blocking the event loop
+                    entry = await asyncio.get_running_loop().run_in_executor(
+                        None, self.description_cache.get, element
+                    )
+                content, etag = entry
+                response = await self.get_conditional_response(
+                    content,
+                    etag,
+                    if_none_match,
+                    self.description_cache.max_age,
+                    accept_encoding=accept_encoding,
+                )
+                return response
             else:
                 content = f"No element found for {path} in {tree_id}"
                 return HTMLResponse(content=content, status_code=404)
@@ -203,6 +695,36 @@ class DynamicCompentenceMapWebServer(InputWebserver):
             msg = f"unknown competence tree {tree_id}"
             raise HTTPException(status_code=404, detail=msg)
 
+    def get_tree_registry(self, examples_path: Optional[str] = None) -> TreeRegistry:
+        """
+        get a registry of the competence tree definitions of the given directory
+
+        Args:
+            examples_path (str): the root directory of the definitions - None for the default examples path
+
+        Returns:
+            TreeRegistry: the registry invalidating the description cache on changes
+        """
+        registry = TreeRegistry(
+            examples_path=examples_path, markup="yaml", tree_cache=self.tree_cache
+        )
+        registry.add_listener(self.description_cache.invalidate_tree)
+        return registry
+
+    def get_stage_timer(self) -> StageTimer:
+        """
+        get a stage timer for a rendering - the null timer if instrumentation is disabled
+        """
+        timer = RecordingStageTimer() if self.instrument else NULL_TIMER
+        return timer
+
+    def add_stage_timings(self, timer: StageTimer):
+        """
+        aggregate the timings of the given stage timer
+        """
+        if timer.enabled:
+            self.stage_stats.add(timer.timings, timer.counts)
+
     def configure_run(self):
         """
         configure the allowed urls
@@ -216,7 +738,75 @@ class DynamicCompentenceMapWebServer(InputWebserver):
             DynamicCompetenceMap.examples_path(),
             self.root_path,
         ]
-        pass
+        args = self.args
+        examples_path = (
+            self.examples.examples_path or DynamicCompetenceMap.examples_path()
+        )
+        if self.root_path and os.path.abspath(examples_path) != self.root_path:
+            # serve and watch the definitions of the configured root path
+            self.examples = self.get_tree_registry(self.root_path)
+        render_cache_size = getattr(args, "render_cache_size", None)
+        render_cache_dir = getattr(args, "render_cache_dir", None)
+        if render_cache_size is not None or render_cache_dir:
+            if render_cache_size is None:
+                render_cache_size = self.render_cache.max_entries
+            self.render_cache = RenderCache(
+                max_entries=render_cache_size,
+                cache_dir=render_cache_dir,
+                svgz=getattr(args, "svgz", False),
+            )
+        render_mode = getattr(args, "render_mode", None)
+        if render_mode:
+            self.render_pool.shutdown()
+            self.render_pool = RenderPool(
+                mode=render_mode,
+                max_workers=getattr(args, "render_workers", None),
+                max_queue=getattr(args, "render_queue", 16),
+            )
+        tree_memory_budget = getattr(args, "tree_memory_budget", None)
+        if tree_memory_budget is not None:
+            self.examples.memory_budget = tree_memory_budget
+        description_cache_size = getattr(args, "description_cache_size", None)
+        if description_cache_size is not None:
+            # keep the cache since the tree registry notifies it of reloads
+            self.description_cache.max_entries = description_cache_size
+            self.description_cache.stats.max_entries = description_cache_size
+        self.prerender_descriptions = getattr(args, "prerender_descriptions", False)
+        self.instrument = getattr(args, "instrument", False)
+        watch_interval = getattr(args, "watch_interval", None)
+        if watch_interval:
+            # hot reload changed competence tree definitions
+            self.examples.start_watching(watch_interval)
+        learner_store = getattr(args, "learner_store", None)
+        store_delay = getattr(args, "store_delay", None)
+        if learner_store or store_delay is not None:
+            self.learner_store.close()
+            if learner_store == "events":
+                self.learner_store = LearnerEventLog(
+                    self.config.storage_path,
+                    compaction_threshold=getattr(args, "compaction_threshold", 100),
+                )
+            elif learner_store == "sqlite":
+                self.learner_store = SqliteLearnerRepository(
+                    self.config.storage_path, db_path=getattr(args, "learner_db", None)
+                )
+                if self.learner_store.learner_count == 0:
+                    # migrate the learners stored as json files
+                    self.learner_store.import_json_files()
+            else:
+                self.learner_store = LearnerStore(
+                    self.config.storage_path,
+                    max_delay=store_delay if store_delay is not None else 2.0,
+                )
+            self.learner_store.write_observer = self.learner_write_latency.observe
+
+    def on_shutdown(self):
+        """
+        stop watching the competence tree definitions and
+        write the pending learners before the server stops
+        """
+        self.examples.stop_watching()
+        self.learner_store.close()
 
 
 class DcmSolution(InputWebSolution):
@@ -237,7 +827,10 @@ class DcmSolution(InputWebSolution):
         self.dcm = None
         self.learner = None
         self.assessment = None
+        webserver.solutions.add(self)
         self.text_mode = "empty"
+        # the chart of the last rendering for incremental updates
+        self.dcm_chart = None
 
     def get_basename_without_extension(self, url) -> str:
         # Parse the URL to get the path component
@@ -277,10 +870,7 @@ class DcmSolution(InputWebSolution):
         Raises:
             FileNotFoundError: If the learner file does not exist.
         """
-        learner_file = self.get_learner_file_path(learner_slug)
-        if not os.path.exists(learner_file):
-            raise FileNotFoundError(f"Learner file not found: {learner_file}")
-        self.learner = Learner.load_from_json_file(learner_file)
+        self.learner = self.webserver.learner_store.load(learner_slug)
         self.save_session_state()
 
     async def render(self, _click_args=None):
@@ -324,6 +914,7 @@ class DcmSolution(InputWebSolution):
         learner: Learner = None,
         selected_paths: List = [],
         clear_assessment: bool = True,
+        changed_paths: Optional[List[str]] = None,
     ):
         """
         render the dynamic competence map
@@ -333,9 +924,24 @@ class DcmSolution(InputWebSolution):
             selected_paths (List, optional): A list of paths that should be highlighted
             in the SVG. These paths typically represent specific competencies or
             achievements. Defaults to an empty list.
+            changed_paths (List[str], optional): the paths of the elements that changed
+            since the last rendering of the same map and learner - if given only
+            these and the previously and newly selected elements are patched
 
         """
         try:
+            if (
+                changed_paths is not None
+                and not clear_assessment
+                and self.dcm_chart is not None
+                and self.dcm_chart.dcm is dcm
+                and self.dcm_chart.learner is learner
+            ):
+                fragments = self.dcm_chart.generate_path_fragments(
+                    changed_paths, selected_paths=selected_paths
+                )
+                self.patch_svg_fragments(fragments)
+                return
             if clear_assessment and self.assessment:
                 try:
                     self.assessment_row.clear()
@@ -346,7 +952,8 @@ class DcmSolution(InputWebSolution):
             self.dcm = dcm
             self.ringspecs_view.update_rings(dcm.competence_tree)
             self.assess_state()
-            dcm_chart = DcmChart(dcm)
+            timer = self.webserver.get_stage_timer()
+            dcm_chart = DcmChart(dcm, timer=timer)
             svg_markup = dcm_chart.generate_svg_markup(
                 learner=learner,
                 selected_paths=selected_paths,
@@ -354,6 +961,8 @@ class DcmSolution(InputWebSolution):
                 with_java_script=False,
                 text_mode=self.text_mode,
             )
+            self.webserver.add_stage_timings(timer)
+            self.dcm_chart = dcm_chart
             # Use the new get_java_script method to get the JavaScript
             self.svg_view.content = (svg_markup,)
             self.svg_view.update()
@@ -366,14 +975,24 @@ class DcmSolution(InputWebSolution):
         """
         self.user_id = app.storage.browser["id"]
         self.prepare_svg()
+        self.client.on_disconnect(self.on_session_end)
+
+    def on_session_end(self):
+        """
+        write the learner of this session when the client disconnects
+        """
+        if self.learner is not None and self.assessment is not None:
+            self.webserver.learner_store.flush(self.learner)
+        self.webserver.solutions.discard(self)
 
     def prepare_svg(self):
         """
         prepare the SVG / javascript display
         """
-        config = SVGConfig(with_popup=True)
+        config = SVGConfig(with_popup=True, fragment_ids=True)
         self.svg = SVG(config=config)
         java_script = self.svg.get_java_script()
+        java_script += self.svg.get_patch_java_script()
 
         # Add the script using ui.add_head_html()
         ui.add_head_html(java_script, shared=True)
@@ -507,15 +1126,42 @@ class DcmSolution(InputWebSolution):
         # self.render_dcm(dcm,learner=learner)
         self.assess_learner(dcm, learner)
 
-    def on_update_ringspecs(self):
+    def on_update_ringspecs(self, ring_level: str = None):
         """
         react on changes in the ringspecs
+
+        Args:
+            ring_level (str): the ring level whose ring spec changed - None if
+                the change affects the whole chart e.g. a symmetry change
         """
+        if ring_level in ["aspect", "area", "facet"] and self.dcm_chart:
+            # only the segments of the given ring need to be regenerated
+            try:
+                fragments = self.dcm_chart.generate_ring_fragments(ring_level)
+                self.patch_svg_fragments(fragments)
+                return
+            except Exception as ex:
+                self.handle_exception(ex)
         if self.learner:
             self.render_item(self.learner)
         else:
             self.render_item(self.dcm)
 
+    def patch_svg_fragments(self, fragments: Dict[str, str]):
+        """
+        replace the given fragments of the displayed SVG in the browser
+
+        the content of the svg view is kept in sync without sending it so that
+        later updates and reconnecting clients get the patched markup
+
+        Args:
+            fragments (Dict[str, str]): the fragment markup by fragment id
+        """
+        ui.run_javascript(f"patchFragments({json.dumps(fragments)})")
+        svg_markup = self.dcm_chart.patch_svg_markup(fragments)
+        with self.svg_view.props.suspend_updates():
+            self.svg_view.content = svg_markup
+
     def assess_state(self):
         """
         save the session state and reflect
@@ -544,7 +1190,7 @@ class DcmSolution(InputWebSolution):
                 if not self.assessment:
                     ui.notify("no active learner assessment")
                     return
-                json_path = self.assessment.store()
+                json_path = self.assessment.store(flush=True)
                 ui.notify(f"downloading {json_path}")
                 ui.download(json_path)
         except Exception as ex:
@@ -0,0 +1,163 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional, Set, Tuple
+
+from dcm.dcm_core import CompetenceElement, CompetenceTree
+from dcm.render_cache import get_etag
+
+
+@dataclass
+class DescriptionCacheStats:
+    """
+    counters of a description cache
+
+    Attributes:
+        hits (int): number of descriptions answered from the cache
+        misses (int): number of descriptions that needed to be rendered
+        prerendered (int): number of descriptions rendered in advance
+        invalidations (int): number of entries dropped because their tree changed
+        evictions (int): number of least recently used entries dropped to stay within max_entries
+        entries (int): number of entries currently cached
+        max_entries (int): the capacity of the cache
+    """
+
+    hits: int = 0
+    misses: int = 0
+    prerendered: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+    entries: int = 0
+    max_entries: int = 0
+
+    def as_dict(self) -> dict:
+        """
+        get my counters as a dict
+        """
+        return asdict(self)
+
+
+class DescriptionCache:
+    """
+    memoized HTML descriptions of competence elements by path
+    with an ETag per description - the least recently used
+    descriptions are evicted beyond max_entries
+    """
+
+    def __init__(self, max_age: int = 60, max_entries: int = 4096):
+        """
+        constructor
+
+        Args:
+            max_age (int): the number of seconds clients may use a description without revalidating it
+            max_entries (int): the maximum number of descriptions to keep
+        """
+        self.max_age = max_age
+        self.max_entries = max_entries
+        # html and etag by element path in least recently used order
+        self.entries: OrderedDict[str, Tuple[str, str]] = OrderedDict()
+        # the ids of the trees that have been pre-rendered
+        self.prerendered_tree_ids: Set[str] = set()
+        # incremented on each invalidation so that renders started before are not stored
+        self.generation = 0
+        self.stats = DescriptionCacheStats(max_entries=max_entries)
+        self.lock = threading.Lock()
+
+    def get(
+        self, element: CompetenceElement, cached_only: bool = False
+    ) -> Optional[Tuple[str, str]]:
+        """
+        get the html description of the given element rendering it on first use
+
+        Args:
+            element (CompetenceElement): the element
+            cached_only (bool): if True do not render and do not count a miss so that event loop callers may try the cache first
+
+        Returns:
+            Tuple[str, str]: the html and its entity tag - None if cached_only and not cached
+        """
+        with self.lock:
+            entry = self.entries.get(element.path)
+            if entry is not None:
+                self.entries.move_to_end(element.path)
+                self.stats.hits += 1
+                return entry
+            if cached_only:
+                return None
+            self.stats.misses += 1
+            generation = self.generation
+        entry = self.render(element, generation)
+        return entry
+
+    def render(self, element: CompetenceElement, generation: int) -> Tuple[str, str]:
+        """
+        render the html description of the given element and cache it
+        unless the cache has been invalidated since the given generation
+        """
+        html = element.as_html()
+        entry = (html, get_etag(html))
+        with self.lock:
+            if generation == self.generation and self.max_entries > 0:
+                self.entries[element.path] = entry
+                self.entries.move_to_end(element.path)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.stats.evictions += 1
+                self.stats.entries = len(self.entries)
+        return entry
+
+    def needs_prerender(self, tree_id: str) -> bool:
+        """
+        check whether the descriptions of the given tree still need to be
+        pre-rendered and mark them as scheduled
+        """
+        with self.lock:
+            needs_prerender = tree_id not in self.prerendered_tree_ids
+            self.prerendered_tree_ids.add(tree_id)
+        return needs_prerender
+
+    def prerender(self, competence_tree: CompetenceTree):
+        """
+        render the descriptions of all elements of the given tree that are not cached yet
+
+        Args:
+            competence_tree (CompetenceTree): the tree
+        """
+        with self.lock:
+            generation = self.generation
+        for path, element in list(competence_tree.elements_by_path.items()):
+            with self.lock:
+                if generation != self.generation:
+                    break
+                cached = path in self.entries
+            if not cached:
+                self.render(element, generation)
+                with self.lock:
+                    self.stats.prerendered += 1
+
+    def invalidate_tree(self, tree_id: str):
+        """
+        drop the descriptions of the given tree e.g. after it has been reloaded
+
+        Args:
+            tree_id (str): the id of the tree
+        """
+        prefix = f"{tree_id}/"
+        with self.lock:
+            self.generation += 1
+            self.prerendered_tree_ids.discard(tree_id)
+            paths = [
+                path
+                for path in self.entries
+                if path == tree_id or path.startswith(prefix)
+            ]
+            for path in paths:
+                del self.entries[path]
+            self.stats.invalidations += len(paths)
+            self.stats.entries = len(self.entries)
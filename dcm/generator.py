@@ -0,0 +1,367 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import math
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from dcm.dcm_core import Achievement, CompetenceTree, Learner
+from dcm.xapi import XAPI
+
+
+@dataclass
+class GeneratorConfig:
+    """
+    configuration of the size and content of synthetic competence trees
+
+    Attributes:
+        aspects (int): number of aspects of the tree
+        areas_per_aspect (int): number of areas of each aspect
+        facets_per_area (int): number of facets of each area
+        levels (int): number of competence levels
+        with_time (bool): if True the facets get a time in hours
+        with_score (bool): if True the facets get a maximum score
+        description_words (int): number of words of the element descriptions - 0 for none
+    """
+
+    aspects: int = 5
+    areas_per_aspect: int = 4
+    facets_per_area: int = 5
+    levels: int = 5
+    with_time: bool = True
+    with_score: bool = True
+    description_words: int = 20
+
+    @property
+    def total_facets(self) -> int:
+        """
+        the number of facets of the generated trees
+        """
+        total_facets = self.aspects * self.areas_per_aspect * self.facets_per_area
+        return total_facets
+
+    @classmethod
+    def for_facets(
+        cls, total_facets: int, aspects: int = 8, **kwargs
+    ) -> "GeneratorConfig":
+        """
+        get a configuration for trees with about the given number of facets
+
+        Args:
+            total_facets (int): the approximate number of facets
+            aspects (int): the number of aspects
+            **kwargs: further configuration attributes
+
+        Returns:
+            GeneratorConfig: a configuration with a balanced area/facet fan-out
+        """
+        per_aspect = max(1, total_facets / aspects)
+        areas_per_aspect = max(1, round(math.sqrt(per_aspect)))
+        facets_per_area = max(1, round(per_aspect / areas_per_aspect))
+        config = cls(
+            aspects=aspects,
+            areas_per_aspect=areas_per_aspect,
+            facets_per_area=facets_per_area,
+            **kwargs,
+        )
+        return config
+
+
+class CompetenceTreeGenerator:
+    """
+    generator of synthetic competence trees, learners and
+    xAPI statements for scale testing
+
+    the same seed gives the same trees, learners and statements
+    """
+
+    aspect_colors = [
+        "#C8102E",
+        "#00843D",
+        "#0057B8",
+        "#FFB81C",
+        "#6D2077",
+        "#E87722",
+        "#009CA6",
+        "#7A9A01",
+    ]
+    words = [
+        "analyze",
+        "design",
+        "document",
+        "evaluate",
+        "communicate",
+        "model",
+        "structure",
+        "quality",
+        "requirements",
+        "architecture",
+        "interfaces",
+        "decisions",
+        "risks",
+        "patterns",
+        "components",
+        "deployment",
+    ]
+
+    def __init__(self, config: Optional[GeneratorConfig] = None, seed: int = 42):
+        """
+        constructor
+
+        Args:
+            config (GeneratorConfig): the size and content of the trees - None for the default
+            seed (int): the seed of the random generator
+        """
+        self.config = config or GeneratorConfig()
+        self.random = random.Random(seed)
+
+    def get_description(self, name: str) -> Optional[str]:
+        """
+        get a random markdown description for the element with the given name
+        """
+        if self.config.description_words <= 0:
+            return None
+        words = self.random.choices(
+            CompetenceTreeGenerator.words, k=self.config.description_words
+        )
+        description = f"**{name}**: {' '.join(words)}"
+        return description
+
+    def get_level_color(self, level: int) -> str:
+        """
+        get a color from light to dark green for the given level
+        """
+        ratio = level / max(1, self.config.levels)
+        green = 255 - int(155 * ratio)
+        color = f"#{int(220 * (1 - ratio)):02X}{green:02X}{int(220 * (1 - ratio)):02X}"
+        return color
+
+    def get_element_dict(self, name: str, element_id: str) -> dict:
+        """
+        get the definition of an element with the given name and id
+        """
+        element_dict = {"name": name, "id": element_id}
+        description = self.get_description(name)
+        if description:
+            element_dict["description"] = description
+        return element_dict
+
+    def generate_tree_dict(self, tree_id: str = "synthetic") -> dict:
+        """
+        generate the definition of a competence tree as it would be parsed from YAML or JSON
+
+        Args:
+            tree_id (str): the id of the tree
+
+        Returns:
+            dict: the definition
+        """
+        config = self.config
+        tree_dict = self.get_element_dict(f"Synthetic tree {tree_id}", tree_id)
+        tree_dict["url"] = f"https://example.com/{tree_id}"
+        tree_dict["description"] = tree_dict.get("description", "")
+        aspects = []
+        for aspect_index in range(config.aspects):
+            aspect_dict = self.get_element_dict(
+                f"Aspect {aspect_index + 1}", f"A{aspect_index + 1}"
+            )
+            colors = CompetenceTreeGenerator.aspect_colors
+            aspect_dict["color_code"] = colors[aspect_index % len(colors)]
+            areas = []
+            for area_index in range(config.areas_per_aspect):
+                area_dict = self.get_element_dict(
+                    f"Area {aspect_index + 1}.{area_index + 1}",
+                    f"A{aspect_index + 1}_{area_index + 1}",
+                )
+                facets = []
+                for facet_index in range(config.facets_per_area):
+                    facet_dict = self.get_element_dict(
+                        f"Facet {aspect_index + 1}.{area_index + 1}.{facet_index + 1}",
+                        f"F{aspect_index + 1}_{area_index + 1}_{facet_index + 1}",
+                    )
+                    if config.with_time:
+                        facet_dict["time"] = float(self.random.randint(1, 40))
+                        facet_dict["time_unit"] = "h"
+                    if config.with_score:
+                        facet_dict["max_score"] = 100.0
+                        facet_dict["score_unit"] = "%"
+                    facets.append(facet_dict)
+                area_dict["facets"] = facets
+                areas.append(area_dict)
+            aspect_dict["areas"] = areas
+            aspects.append(aspect_dict)
+        tree_dict["aspects"] = aspects
+        tree_dict["levels"] = [
+            {
+                "name": f"Level {level}",
+                "level": level,
+                "color_code": self.get_level_color(level),
+            }
+            for level in range(1, config.levels + 1)
+        ]
+        return tree_dict
+
+    def generate_tree(self, tree_id: str = "synthetic") -> CompetenceTree:
+        """
+        generate a competence tree
+
+        Args:
+            tree_id (str): the id of the tree
+
+        Returns:
+            CompetenceTree: the tree
+        """
+        tree = CompetenceTree.from_dict_fast(self.generate_tree_dict(tree_id))
+        return tree
+
+    def get_random_date_iso(self, start: datetime, days: int) -> str:
+        """
+        get a random date within the given number of days after the given start in ISO format
+        """
+        date = start + timedelta(seconds=self.random.randint(0, days * 86400))
+        date_iso = date.isoformat(timespec="milliseconds") + "Z"
+        return date_iso
+
+    def generate_learner(
+        self,
+        competence_tree: CompetenceTree,
+        learner_id: Optional[str] = None,
+        coverage: float = 0.5,
+    ) -> Learner:
+        """
+        generate a learner with achievements for a random part of the facets of the given tree
+
+        Args:
+            competence_tree (CompetenceTree): the tree
+            learner_id (str): the id of the learner - None for a random uuid
+            coverage (float): the fraction of facets the learner has assessed
+
+        Returns:
+            Learner: the learner
+        """
+        if learner_id is None:
+            learner_id = str(uuid.UUID(int=self.random.getrandbits(128)))
+        levels = [level.level for level in competence_tree.levels] or [1]
+        start = datetime(2024, 1, 1)
+        achievements = []
+        for facet in competence_tree.elements_by_level["facet"]:
+            if self.random.random() < coverage:
+                achievement = Achievement(
+                    path=facet.path,
+                    level=self.random.choice(levels),
+                    date_assessed_iso=self.get_random_date_iso(start, 365),
+                )
+                achievements.append(achievement)
+        learner = Learner(learner_id=learner_id, achievements=achievements)
+        return learner
+
+    def generate_learners(
+        self, competence_tree: CompetenceTree, count: int, coverage: float = 0.5
+    ) -> List[Learner]:
+        """
+        generate the given number of learners for the given tree
+
+        Args:
+            competence_tree (CompetenceTree): the tree
+            count (int): the number of learners
+            coverage (float): the fraction of facets each learner has assessed
+
+        Returns:
+            List[Learner]: the learners
+        """
+        learners = [
+            self.generate_learner(competence_tree, coverage=coverage)
+            for _index in range(count)
+        ]
+        return learners
+
+    def iter_xapi_statements(
+        self,
+        competence_tree: CompetenceTree,
+        learner_id: str,
+        count: int,
+    ) -> Iterator[dict]:
+        """
+        generate a stream of xAPI statement records of the given learner
+        for random facets of the given tree in the learning record store
+        format read by XAPI.to_learner
+
+        Args:
+            competence_tree (CompetenceTree): the tree
+            learner_id (str): the account name of the learner
+            count (int): the number of statements
+
+        Yields:
+            dict: the statement records
+        """
+        facets = competence_tree.elements_by_level["facet"]
+        start = datetime(2024, 1, 1)
+        for _index in range(count):
+            facet = self.random.choice(facets)
+            max_score = 3
+            raw_score = self.random.randint(0, max_score)
+            timestamp = self.get_random_date_iso(start, 365)
+            statement = {
+                "actor": {
+                    "account": {
+                        "name": learner_id,
+                        "homePage": "https://example.com",
+                    },
+                    "objectType": "Agent",
+                },
+                "verb": {
+                    "id": "http://adlnet.gov/expapi/verbs/completed",
+                    "display": {"en-US": "completed"},
+                },
+                "object": {
+                    "id": f"https://example.com/activities/{facet.id}",
+                    "objectType": "Activity",
+                },
+                "context": {
+                    "extensions": {
+                        "learningObjectMetadata": {
+                            "competencePath": facet.path,
+                            "facet": facet.name,
+                        }
+                    }
+                },
+                "result": {
+                    "score": {
+                        "min": 0,
+                        "max": max_score,
+                        "raw": raw_score,
+                        "scaled": raw_score / max_score,
+                    },
+                    "completion": True,
+                },
+                "timestamp": timestamp,
+                "id": str(uuid.UUID(int=self.random.getrandbits(128))),
+                "version": "1.0.0",
+            }
+            yield {"statement": statement, "timestamp": timestamp}
+
+    def generate_xapi(
+        self, competence_tree: CompetenceTree, learner_id: str, count: int
+    ) -> XAPI:
+        """
+        generate an xAPI learning record store export of the given learner
+
+        Args:
+            competence_tree (CompetenceTree): the tree
+            learner_id (str): the account name of the learner
+            count (int): the number of statements
+
+        Returns:
+            XAPI: the xAPI records ready to be converted with to_learner
+        """
+        xapi = XAPI()
+        xapi.xapi_dict = list(
+            self.iter_xapi_statements(competence_tree, learner_id, count)
+        )
+        return xapi
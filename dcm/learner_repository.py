@@ -0,0 +1,573 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator, List, Optional
+
+from dcm.dcm_core import Achievement, Learner
+
+
+def write_atomic(file_path: str, text: str):
+    """
+    write the given text to the given file via a temporary file
+    so that readers never see a partially written file
+
+    Args:
+        file_path (str): the path of the file to write
+        text (str): the content
+    """
+    tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w") as tmp_file:
+            tmp_file.write(text)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@dataclass
+class LearnerStoreStats:
+    """
+    counters of a learner repository
+
+    Attributes:
+        scheduled (int): number of store requests
+        coalesced (int): number of store requests merged into an already pending write
+        writes (int): number of files written
+        errors (int): number of failed writes
+        pending (int): number of learners currently waiting to be written
+        write_seconds (float): the total duration of the writes
+    """
+
+    scheduled: int = 0
+    coalesced: int = 0
+    writes: int = 0
+    errors: int = 0
+    pending: int = 0
+    write_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        """
+        get my counters as a dict
+        """
+        stats_dict = asdict(self)
+        return stats_dict
+
+
+class LearnerRepository(ABC):
+    """
+    abstract storage of learners
+
+    learners are identified by their file name (the slug of the learner id)
+    a json file of a learner e.g. for downloading is available at get_file_path
+    after flush has been called for the learner
+    """
+
+    def __init__(self, storage_path: str, indent: int = 2):
+        """
+        constructor
+
+        Args:
+            storage_path (str): the directory for the learner json files
+            indent (int): the json indentation
+        """
+        self.storage_path = storage_path
+        self.indent = indent
+        self.stats = LearnerStoreStats()
+        # optional callback to be called with the duration of each write e.g. for metrics
+        self.write_observer: Optional[Callable[[float], None]] = None
+
+    def observe_write(self, start_time: float):
+        """
+        count a write started at the given perf_counter time
+        """
+        seconds = time.perf_counter() - start_time
+        self.stats.writes += 1
+        self.stats.write_seconds += seconds
+        if self.write_observer is not None:
+            self.write_observer(seconds)
+
+    def get_file_path(self, learner: Learner) -> str:
+        """
+        get the path of the json file of the given learner
+
+        Args:
+            learner (Learner): the learner
+
+        Returns:
+            str: the file path
+        """
+        file_path = os.path.join(self.storage_path, f"{learner.file_name}.json")
+        return file_path
+
+    @abstractmethod
+    def schedule(self, learner: Learner) -> str:
+        """
+        store the given learner
+
+        Args:
+            learner (Learner): the learner to store
+
+        Returns:
+            str: the path of the json file of the learner
+        """
+
+    @abstractmethod
+    def record(self, learner: Learner, achievement: Achievement) -> str:
+        """
+        record a change of the given achievement of the given learner
+
+        Args:
+            learner (Learner): the learner
+            achievement (Achievement): the changed achievement
+
+        Returns:
+            str: the path of the json file of the learner
+        """
+
+    @abstractmethod
+    def load(self, file_name: str) -> Learner:
+        """
+        load the learner with the given file name
+
+        Args:
+            file_name (str): the file name of the learner without extension
+
+        Returns:
+            Learner: the learner
+
+        Raises:
+            FileNotFoundError: if the learner does not exist
+        """
+
+    @abstractmethod
+    def flush(self, learner: Optional[Learner] = None):
+        """
+        make sure the given learner or all learners are persisted
+        and the json file of the given learner is up to date
+
+        Args:
+            learner (Learner): the learner - None for all learners
+        """
+
+    @abstractmethod
+    def close(self):
+        """
+        persist all pending changes and release my resources
+        """
+
+    def iter_learners(self) -> Iterator[Learner]:
+        """
+        iterate over all learners by loading the json files of my storage path
+        """
+        for file_name in sorted(os.listdir(self.storage_path)):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                learner = self.load(file_name[: -len(".json")])
+            except Exception:
+                # not a learner file e.g. a session storage file
+                continue
+            if isinstance(learner, Learner) and learner.learner_id:
+                yield learner
+
+    @classmethod
+    def matches(
+        cls,
+        achievement: Achievement,
+        path: Optional[str] = None,
+        tree_id: Optional[str] = None,
+        min_level: Optional[int] = None,
+        assessed_since: Optional[str] = None,
+    ) -> bool:
+        """
+        check whether the given achievement fulfills the given conditions
+
+        Args:
+            achievement (Achievement): the achievement to check
+            path (str): the path of the competence element
+            tree_id (str): the id of the competence tree
+            min_level (int): the minimum level
+            assessed_since (str): the minimum assessment date in ISO format
+
+        Returns:
+            bool: True if all given conditions are met
+        """
+        if path is not None and achievement.path != path:
+            return False
+        if tree_id is not None and achievement.tree_id != tree_id:
+            return False
+        if min_level is not None and (
+            achievement.level is None or achievement.level < min_level
+        ):
+            return False
+        if assessed_since is not None and (
+            achievement.date_assessed_iso is None
+            or achievement.date_assessed_iso < assessed_since
+        ):
+            return False
+        return True
+
+    def find_learners(
+        self,
+        path: Optional[str] = None,
+        tree_id: Optional[str] = None,
+        min_level: Optional[int] = None,
+        assessed_since: Optional[str] = None,
+    ) -> List[str]:
+        """
+        find the learners that have an achievement fulfilling all given conditions
+        e.g. all learners with level >= 3 on a facet
+
+        this default implementation scans all learners and blocks
+        while doing so - call it from a worker thread when serving requests
+
+        Args:
+            path (str): the path of the competence element
+            tree_id (str): the id of the competence tree
+            min_level (int): the minimum level
+            assessed_since (str): the minimum assessment date in ISO format
+
+        Returns:
+            List[str]: the sorted ids of the matching learners
+        """
+        self.flush()
+        learner_ids = set()
+        for learner in self.iter_learners():
+            for achievement in learner.achievements or []:
+                if self.matches(achievement, path, tree_id, min_level, assessed_since):
+                    learner_ids.add(learner.learner_id)
+                    break
+        return sorted(learner_ids)
+
+
+class SqliteLearnerRepository(LearnerRepository):
+    """
+    a learner repository in a local SQLite database with
+    the achievements indexed by tree id, path and assessment date
+    """
+
+    schema = """
+CREATE TABLE IF NOT EXISTS learner (
+    learner_id TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS achievement (
+    learner_id TEXT NOT NULL REFERENCES learner(learner_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tree_id TEXT,
+    path TEXT NOT NULL,
+    level INTEGER,
+    score REAL,
+    score_unit TEXT,
+    evidence TEXT,
+    date_assessed_iso TEXT,
+    PRIMARY KEY (learner_id, position)
+);
+CREATE INDEX IF NOT EXISTS achievement_tree_id ON achievement(tree_id);
+CREATE INDEX IF NOT EXISTS achievement_path_level ON achievement(path, level);
+CREATE INDEX IF NOT EXISTS achievement_date ON achievement(date_assessed_iso);
+"""
+
+    achievement_columns = [
+        "path",
+        "level",
+        "score",
+        "score_unit",
+        "evidence",
+        "date_assessed_iso",
+    ]
+
+    def __init__(self, storage_path: str, db_path: str = None, indent: int = 2):
+        """
+        constructor
+
+        Args:
+            storage_path (str): the directory for the learner json files
+            db_path (str): the path of the SQLite database - default: learners.db in the storage path
+            indent (int): the json indentation
+        """
+        super().__init__(storage_path, indent=indent)
+        self.db_path = db_path or os.path.join(storage_path, "learners.db")
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(self.schema)
+
+    @property
+    def learner_count(self) -> int:
+        """
+        get the number of learners in the database
+        """
+        with self.lock:
+            (count,) = self.connection.execute(
+                "SELECT COUNT(*) FROM learner"
+            ).fetchone()
+        return count
+
+    def get_achievement_row(
+        self, learner: Learner, position: int, achievement: Achievement
+    ) -> tuple:
+        """
+        get the database row for the given achievement
+        """
+        row = (
+            learner.learner_id,
+            position,
+            achievement.tree_id,
+            achievement.path,
+            achievement.level,
+            achievement.score,
+            achievement.score_unit,
+            achievement.evidence,
+            achievement.date_assessed_iso,
+        )
+        return row
+
+    def save(self, learner: Learner):
+        """
+        save the given learner with all achievements in one transaction
+
+        Args:
+            learner (Learner): the learner to save
+        """
+        start_time = time.perf_counter()
+        rows = [
+            self.get_achievement_row(learner, position, achievement)
+            for position, achievement in enumerate(learner.achievements or [])
+        ]
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO learner(learner_id, file_name) VALUES (?, ?) "
+                "ON CONFLICT(learner_id) DO UPDATE SET file_name=excluded.file_name",
+                (learner.learner_id, learner.file_name),
+            )
+            self.connection.execute(
+                "DELETE FROM achievement WHERE learner_id=?", (learner.learner_id,)
+            )
+            self.connection.executemany(
+                "INSERT INTO achievement VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        self.observe_write(start_time)
+
+    def schedule(self, learner: Learner) -> str:
+        """
+        save the given learner
+
+        Args:
+            learner (Learner): the learner to store
+
+        Returns:
+            str: the path of the json file of the learner - written on flush
+        """
+        self.stats.scheduled += 1
+        self.save(learner)
+        return self.get_file_path(learner)
+
+    def record(self, learner: Learner, achievement: Achievement) -> str:
+        """
+        update the row of the given achievement of the given learner
+
+        Args:
+            learner (Learner): the learner
+            achievement (Achievement): the changed achievement
+
+        Returns:
+            str: the path of the json file of the learner - written on flush
+        """
+        start_time = time.perf_counter()
+        position = learner.achievement_indices_by_path.get(achievement.path)
+        if position is None or learner.achievements[position] is not achievement:
+            # the path might not be unique
+            position = next(
+                (
+                    index
+                    for index, candidate in enumerate(learner.achievements or [])
+                    if candidate is achievement
+                ),
+                None,
+            )
+        known = False
+        with self.lock, self.connection:
+            if position is not None:
+                known = self.connection.execute(
+                    "SELECT 1 FROM learner WHERE learner_id=?", (learner.learner_id,)
+                ).fetchone()
+            if known:
+                row = self.get_achievement_row(learner, position, achievement)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO achievement VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+        if known:
+            self.observe_write(start_time)
+        else:
+            # save observes the write itself
+            self.save(learner)
+        return self.get_file_path(learner)
+
+    def load(self, file_name: str) -> Learner:
+        """
+        load the learner with the given file name
+
+        Args:
+            file_name (str): the file name of the learner without extension
+
+        Returns:
+            Learner: the learner
+
+        Raises:
+            FileNotFoundError: if the learner is neither in the database nor available as a json file
+        """
+        columns = ", ".join(self.achievement_columns)
+        with self.lock:
+            learner_row = self.connection.execute(
+                "SELECT learner_id FROM learner WHERE file_name=?", (file_name,)
+            ).fetchone()
+            if learner_row is None:
+                # e.g. a learner json file uploaded after the initial import
+                return self.import_json_file(file_name)
+            (learner_id,) = learner_row
+            rows = self.connection.execute(
+                f"SELECT {columns} FROM achievement WHERE learner_id=? ORDER BY position",
+                (learner_id,),
+            ).fetchall()
+        achievements = [
+            Achievement(**dict(zip(self.achievement_columns, row))) for row in rows
+        ]
+        learner = Learner(learner_id, achievements=achievements or None)
+        return learner
+
+    def flush(self, learner: Optional[Learner] = None):
+        """
+        save the given learner and write its json file
+
+        Args:
+            learner (Learner): the learner - None since all learners are already persisted
+        """
+        if learner is not None:
+            self.save(learner)
+            write_atomic(
+                self.get_file_path(learner), learner.to_json(indent=self.indent)
+            )
+
+    def close(self):
+        """
+        close the database connection
+        """
+        with self.lock:
+            self.connection.close()
+
+    def iter_learners(self) -> Iterator[Learner]:
+        """
+        iterate over all learners in the database
+        """
+        with self.lock:
+            file_names = [
+                file_name
+                for (file_name,) in self.connection.execute(
+                    "SELECT file_name FROM learner ORDER BY file_name"
+                )
+            ]
+        for file_name in file_names:
+            yield self.load(file_name)
+
+    def find_learners(
+        self,
+        path: Optional[str] = None,
+        tree_id: Optional[str] = None,
+        min_level: Optional[int] = None,
+        assessed_since: Optional[str] = None,
+    ) -> List[str]:
+        """
+        find the learners that have an achievement fulfilling all given conditions
+        using the indices of the achievement table
+
+        Args:
+            path (str): the path of the competence element
+            tree_id (str): the id of the competence tree
+            min_level (int): the minimum level
+            assessed_since (str): the minimum assessment date in ISO format
+
+        Returns:
+            List[str]: the sorted ids of the matching learners
+        """
+        conditions = []
+        params = []
+        for condition, value in [
+            ("path=?", path),
+            ("tree_id=?", tree_id),
+            ("level>=?", min_level),
+            ("date_assessed_iso>=?", assessed_since),
+        ]:
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT DISTINCT learner_id FROM achievement {where} ORDER BY learner_id",
+                params,
+            ).fetchall()
+        learner_ids = [learner_id for (learner_id,) in rows]
+        return learner_ids
+
+    def import_json_file(self, file_name: str) -> Learner:
+        """
+        import the learner json file with the given file name from my storage path
+
+        Args:
+            file_name (str): the file name of the learner without extension
+
+        Returns:
+            Learner: the imported learner
+
+        Raises:
+            FileNotFoundError: if there is no learner json file with the given name
+        """
+        learner_file = os.path.join(self.storage_path, f"{file_name}.json")
+        if not os.path.exists(learner_file):
+            raise FileNotFoundError(f"Learner not found: {file_name}")
+        learner = Learner.load_from_json_file(learner_file)
+        if not isinstance(learner, Learner) or not learner.learner_id:
+            raise FileNotFoundError(f"Learner not found: {file_name}")
+        self.save(learner)
+        return learner
+
+    def import_json_files(self, json_path: str = None) -> int:
+        """
+        import the learner json files of the given directory
+
+        Args:
+            json_path (str): the directory to import from - default: my storage path
+
+        Returns:
+            int: the number of learners imported
+        """
+        json_path = json_path or self.storage_path
+        count = 0
+        for file_name in sorted(os.listdir(json_path)):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                learner = Learner.load_from_json_file(
+                    os.path.join(json_path, file_name)
+                )
+            except Exception:
+                # not a learner file e.g. a session storage file
+                continue
+            if isinstance(learner, Learner) and learner.learner_id:
+                self.save(learner)
+                count += 1
+        return count
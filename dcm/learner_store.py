@@ -0,0 +1,478 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+from dcm.dcm_core import Achievement, Learner
+from dcm.learner_repository import LearnerRepository, write_atomic
+
+logger = logging.getLogger(__name__)
+
+
+class LearnerStore(LearnerRepository):
+    """
+    a background writer for learner files
+
+    store requests are coalesced per learner - a learner is written at most
+    max_delay seconds after its first unsaved change by a worker thread so
+    that the event loop is not blocked by writing files
+
+    the json snapshot of a learner is taken when the write is scheduled so
+    that the worker thread never serializes a learner that is being modified
+    """
+
+    def __init__(self, storage_path: str, max_delay: float = 2.0, indent: int = 2):
+        """
+        constructor
+
+        Args:
+            storage_path (str): the directory for the learner json files
+            max_delay (float): maximum number of seconds a change may wait to be written - 0 for synchronous writes
+            indent (int): the json indentation
+        """
+        super().__init__(storage_path, indent=indent)
+        self.max_delay = max_delay
+        self.condition = threading.Condition()
+        # serializes the writes so that an older state never overwrites a newer one
+        self.write_lock = threading.Lock()
+        # the snapshots are numbered in the order they are taken
+        self.sequence = itertools.count()
+        # the number of the last snapshot written by file path
+        self.written: Dict[str, int] = {}
+        # the json snapshots waiting to be written with their due time and number by file path
+        self.pending: Dict[str, Tuple[str, float, int]] = {}
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+
+    def schedule(self, learner: Learner) -> str:
+        """
+        schedule writing the given learner
+
+        Args:
+            learner (Learner): the learner to write
+
+        Returns:
+            str: the path of the file the learner will be written to
+        """
+        file_path = self.get_file_path(learner)
+        if self.max_delay <= 0 or self.closed:
+            self.stats.scheduled += 1
+            self.write(learner)
+            return file_path
+        learner_data_json = learner.to_json(indent=self.indent)
+        sequence = next(self.sequence)
+        with self.condition:
+            self.stats.scheduled += 1
+            pending = self.pending.get(file_path)
+            if pending is not None:
+                # keep the due time of the first unsaved change
+                self.stats.coalesced += 1
+                due_time = pending[1]
+            else:
+                due_time = time.monotonic() + self.max_delay
+                self.condition.notify()
+            self.pending[file_path] = (learner_data_json, due_time, sequence)
+            self.stats.pending = len(self.pending)
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="dcm-learner-store", daemon=True
+                )
+                self.thread.start()
+        return file_path
+
+    def write(self, learner: Learner) -> str:
+        """
+        write the given learner atomically
+
+        Args:
+            learner (Learner): the learner to write
+
+        Returns:
+            str: the path of the file written
+        """
+        file_path = self.get_file_path(learner)
+        sequence = next(self.sequence)
+        self.write_json(file_path, learner.to_json(indent=self.indent), sequence)
+        return file_path
+
+    def write_json(self, file_path: str, learner_data_json: str, sequence: int):
+        """
+        write the given json snapshot of a learner atomically
+        unless a newer snapshot has already been written
+
+        Args:
+            file_path (str): the path of the learner file
+            learner_data_json (str): the json snapshot
+            sequence (int): the number of the snapshot
+        """
+        with self.write_lock:
+            if sequence < self.written.get(file_path, -1):
+                return
+            start_time = time.perf_counter()
+            try:
+                write_atomic(file_path, learner_data_json)
+            except Exception:
+                self.stats.errors += 1
+                raise
+            self.written[file_path] = sequence
+            self.observe_write(start_time)
+
+    def record(self, learner: Learner, achievement: Achievement) -> str:
+        """
+        record a change of the given achievement of the given learner
+
+        Args:
+            learner (Learner): the learner
+            achievement (Achievement): the changed achievement
+
+        Returns:
+            str: the path of the file the learner will be written to
+        """
+        file_path = self.schedule(learner)
+        return file_path
+
+    def load(self, file_name: str) -> Learner:
+        """
+        load the learner with the given file name
+
+        Args:
+            file_name (str): the file name of the learner without extension
+
+        Returns:
+            Learner: the learner
+
+        Raises:
+            FileNotFoundError: if the learner file does not exist
+        """
+        learner_file = os.path.join(self.storage_path, f"{file_name}.json")
+        # make sure a pending change of this learner is visible in the file
+        with self.condition:
+            pending = self.pending.pop(learner_file, None)
+            self.stats.pending = len(self.pending)
+        if pending is not None:
+            learner_data_json, _due_time, sequence = pending
+            self.write_json(learner_file, learner_data_json, sequence)
+        # wait for a write of the worker thread that is in progress
+        with self.write_lock:
+            if not os.path.exists(learner_file):
+                raise FileNotFoundError(f"Learner file not found: {learner_file}")
+            learner = Learner.load_from_json_file(learner_file)
+        return learner
+
+    def pop_due(self, flush_all: bool = False) -> Tuple[list, Optional[float]]:
+        """
+        remove the snapshots that are due from the pending snapshots
+
+        needs to be called with the condition held
+
+        Args:
+            flush_all (bool): if True all pending snapshots are due
+
+        Returns:
+            Tuple[list, Optional[float]]: the file paths, json snapshots and their numbers that are due
+            and the number of seconds until the next snapshot is due - None if none is pending
+        """
+        now = time.monotonic()
+        due_snapshots = []
+        next_due = None
+        for file_path, (learner_data_json, due_time, sequence) in list(
+            self.pending.items()
+        ):
+            if flush_all or due_time <= now:
+                due_snapshots.append((file_path, learner_data_json, sequence))
+                del self.pending[file_path]
+            elif next_due is None or due_time - now < next_due:
+                next_due = due_time - now
+        self.stats.pending = len(self.pending)
+        return due_snapshots, next_due
+
+    def run(self):
+        """
+        write the pending snapshots when they are due
+        """
+        while True:
+            with self.condition:
+                while True:
+                    due_snapshots, next_due = self.pop_due(flush_all=self.closed)
+                    if due_snapshots or self.closed:
+                        break
+                    self.condition.wait(next_due)
+                closed = self.closed
+            for file_path, learner_data_json, sequence in due_snapshots:
+                try:
+                    self.write_json(file_path, learner_data_json, sequence)
+                except Exception:
+                    logger.exception("could not store learner %s", file_path)
+            if closed:
+                break
+
+    def flush(self, learner: Optional[Learner] = None):
+        """
+        write the given learner or all pending snapshots now
+
+        Args:
+            learner (Learner): the learner to write - None for all pending snapshots
+        """
+        if learner is None:
+            with self.condition:
+                due_snapshots, _next_due = self.pop_due(flush_all=True)
+            for file_path, learner_data_json, sequence in due_snapshots:
+                self.write_json(file_path, learner_data_json, sequence)
+        else:
+            file_path = self.get_file_path(learner)
+            with self.condition:
+                self.pending.pop(file_path, None)
+                self.stats.pending = len(self.pending)
+            self.write(learner)
+
+    def close(self):
+        """
+        write all pending snapshots and stop the worker thread
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+
+@dataclass
+class AchievementEvent:
+    """
+    a change of the level of an achievement
+
+    Attributes:
+        path (str): the path of the achievement
+        level (int): the new level - None if the level has been reset
+        date_assessed_iso (str): the date of the assessment in ISO format
+    """
+
+    path: str
+    level: Optional[int] = None
+    date_assessed_iso: Optional[str] = None
+
+    @classmethod
+    def of_achievement(cls, achievement: Achievement) -> "AchievementEvent":
+        """
+        get the event for the current state of the given achievement
+        """
+        event = cls(
+            path=achievement.path,
+            level=achievement.level,
+            date_assessed_iso=achievement.date_assessed_iso,
+        )
+        return event
+
+    def to_line(self) -> str:
+        """
+        get my compact json line representation
+        """
+        line = json.dumps(asdict(self), separators=(",", ":")) + "\n"
+        return line
+
+    @classmethod
+    def from_line(cls, line: str) -> "AchievementEvent":
+        """
+        get the event for the given json line
+        """
+        event = cls(**json.loads(line))
+        return event
+
+    def apply(self, learner: Learner):
+        """
+        apply me to the given learner
+
+        Args:
+            learner (Learner): the learner to update
+        """
+        achievement = learner.achievements_by_path.get(self.path)
+        if achievement is None:
+            if learner.achievements is None:
+                learner.achievements = []
+            achievement = Achievement(path=self.path)
+            learner.add_achievement(achievement)
+        achievement.level = self.level
+        achievement.date_assessed_iso = self.date_assessed_iso
+
+
+class LearnerEventLog(LearnerRepository):
+    """
+    a learner store that appends each achievement change as an event
+    to a per learner log instead of rewriting the learner file
+
+    the log is compacted into the learner json snapshot periodically
+    the compacted events are moved to an audit log
+    """
+
+    def __init__(
+        self, storage_path: str, compaction_threshold: int = 100, indent: int = 2
+    ):
+        """
+        constructor
+
+        Args:
+            storage_path (str): the directory for the learner files
+            compaction_threshold (int): number of events after which a log is compacted
+            indent (int): the json indentation of the snapshots
+        """
+        super().__init__(storage_path, indent=indent)
+        self.compaction_threshold = compaction_threshold
+        self.lock = threading.RLock()
+        # the learners with events that have not been compacted by learner id
+        self.learners: Dict[str, Learner] = {}
+        # the number of events that have not been compacted by learner id
+        self.event_counts: Dict[str, int] = {}
+
+    def get_log_path(self, file_name: str) -> str:
+        """
+        get the path of the event log for the given learner file name
+        """
+        log_path = os.path.join(self.storage_path, f"{file_name}.events.jsonl")
+        return log_path
+
+    def get_audit_path(self, file_name: str) -> str:
+        """
+        get the path of the audit log with the compacted events
+        for the given learner file name
+        """
+        audit_path = os.path.join(self.storage_path, f"{file_name}.audit.jsonl")
+        return audit_path
+
+    def schedule(self, learner: Learner) -> str:
+        """
+        make sure a snapshot of the given learner exists - further changes
+        are recorded as events
+
+        Args:
+            learner (Learner): the learner
+
+        Returns:
+            str: the path of the snapshot
+        """
+        file_path = self.get_file_path(learner)
+        with self.lock:
+            self.stats.scheduled += 1
+            if not os.path.exists(file_path):
+                self.compact(learner)
+        return file_path
+
+    def record(self, learner: Learner, achievement: Achievement) -> str:
+        """
+        append an event for the current state of the given achievement
+        to the log of the given learner
+
+        Args:
+            learner (Learner): the learner
+            achievement (Achievement): the changed achievement
+
+        Returns:
+            str: the path of the snapshot
+        """
+        file_path = self.schedule(learner)
+        event = AchievementEvent.of_achievement(achievement)
+        with self.lock:
+            start_time = time.perf_counter()
+            with open(self.get_log_path(learner.file_name), "a") as log_file:
+                log_file.write(event.to_line())
+            self.observe_write(start_time)
+            learner_id = learner.learner_id
+            self.learners[learner_id] = learner
+            event_count = self.event_counts.get(learner_id, 0) + 1
+            self.event_counts[learner_id] = event_count
+            self.stats.pending = len(self.learners)
+            if event_count >= self.compaction_threshold:
+                self.compact(learner)
+        return file_path
+
+    def iter_events(self, file_name: str) -> Iterator[AchievementEvent]:
+        """
+        iterate over the events of the log of the learner with the given file name
+        """
+        log_path = self.get_log_path(file_name)
+        if os.path.exists(log_path):
+            with open(log_path) as log_file:
+                for line in log_file:
+                    if line.strip():
+                        yield AchievementEvent.from_line(line)
+
+    def compact(self, learner: Learner):
+        """
+        write the snapshot of the given learner and move
+        the events of its log to the audit log
+
+        events are idempotent so a crash during compaction at worst
+        replays events that are already contained in the snapshot
+
+        Args:
+            learner (Learner): the learner to compact
+        """
+        with self.lock:
+            write_atomic(
+                self.get_file_path(learner), learner.to_json(indent=self.indent)
+            )
+            log_path = self.get_log_path(learner.file_name)
+            if os.path.exists(log_path):
+                with open(log_path) as log_file:
+                    events = log_file.read()
+                with open(self.get_audit_path(learner.file_name), "a") as audit_file:
+                    audit_file.write(events)
+                os.remove(log_path)
+            self.learners.pop(learner.learner_id, None)
+            self.event_counts.pop(learner.learner_id, None)
+            self.stats.pending = len(self.learners)
+
+    def load(self, file_name: str) -> Learner:
+        """
+        load the learner with the given file name by replaying the
+        events of its log on its snapshot
+
+        Args:
+            file_name (str): the file name of the learner without extension
+
+        Returns:
+            Learner: the learner
+
+        Raises:
+            FileNotFoundError: if the learner snapshot does not exist
+        """
+        learner_file = os.path.join(self.storage_path, f"{file_name}.json")
+        with self.lock:
+            if not os.path.exists(learner_file):
+                raise FileNotFoundError(f"Learner file not found: {learner_file}")
+            learner = Learner.load_from_json_file(learner_file)
+            for event in self.iter_events(file_name):
+                event.apply(learner)
+        return learner
+
+    def flush(self, learner: Optional[Learner] = None):
+        """
+        compact the log of the given learner or of all learners with events
+
+        Args:
+            learner (Learner): the learner to compact - None for all learners with events
+        """
+        with self.lock:
+            if learner is None:
+                learners = list(self.learners.values())
+            else:
+                learners = [learner]
+            for flush_learner in learners:
+                self.compact(flush_learner)
+
+    def close(self):
+        """
+        compact all logs
+        """
+        self.flush()
@@ -0,0 +1,217 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import bisect
+import math
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+def format_labels(label_names: Sequence[str], label_values: Sequence[str]) -> str:
+    """
+    format the given labels in the Prometheus text exposition format
+
+    Args:
+        label_names (Sequence[str]): the names of the labels
+        label_values (Sequence[str]): the values of the labels
+
+    Returns:
+        str: e.g. '{route="/svg/",status="200"}' - empty if there are no labels
+    """
+    if not label_names:
+        return ""
+    pairs = []
+    for name, value in zip(label_names, label_values):
+        escaped = (
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        pairs.append(f'{name}="{escaped}"')
+    labels = "{" + ",".join(pairs) + "}"
+    return labels
+
+
+def format_value(value: float) -> str:
+    """
+    format the given sample value
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    text = repr(float(value)) if isinstance(value, float) else str(value)
+    return text
+
+
+class Metric:
+    """
+    a metric with optionally labeled series in the Prometheus text exposition format
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """
+        constructor
+
+        Args:
+            name (str): the name of the metric
+            documentation (str): the help text
+            label_names (Sequence[str]): the names of the labels of the series
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+
+    def iter_header(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.metric_type}"
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        iterate over the lines of the text exposition of this metric
+        """
+        yield from self.iter_header()
+
+
+class Counter(Metric):
+    """
+    a monotonically increasing counter
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        """
+        increment the series with the given label values
+        """
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def iter_lines(self) -> Iterator[str]:
+        yield from self.iter_header()
+        with self.lock:
+            values = sorted(self.values.items())
+        for label_values, value in values:
+            labels = format_labels(self.label_names, label_values)
+            yield f"{self.name}{labels} {format_value(value)}"
+
+
+class Sample(Metric):
+    """
+    a single value e.g. taken from the counters of a cache when the metrics are collected
+    """
+
+    def __init__(
+        self, name: str, documentation: str, value: float, metric_type: str = "gauge"
+    ):
+        """
+        constructor
+
+        Args:
+            name (str): the name of the metric
+            documentation (str): the help text
+            value (float): the value
+            metric_type (str): the Prometheus type of the metric e.g. 'gauge' or 'counter'
+        """
+        super().__init__(name, documentation)
+        self.value = value
+        self.metric_type = metric_type
+
+    def iter_lines(self) -> Iterator[str]:
+        yield from self.iter_header()
+        yield f"{self.name} {format_value(self.value)}"
+
+
+class Histogram(Metric):
+    """
+    a histogram of observed values e.g. latencies in seconds
+    """
+
+    metric_type = "histogram"
+    default_buckets = (
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ):
+        """
+        constructor
+
+        Args:
+            name (str): the name of the metric
+            documentation (str): the help text
+            label_names (Sequence[str]): the names of the labels of the series
+            buckets (Sequence[float]): the upper bounds of the buckets - None for the default buckets
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets or Histogram.default_buckets))
+        # bucket counts, sum and count by label values
+        self.series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        """
+        observe the given value for the series with the given label values
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self.series[label_values] = series
+            bucket_counts, total = series
+            bucket_counts[index] += 1
+            total[0] += value
+
+    def iter_lines(self) -> Iterator[str]:
+        yield from self.iter_header()
+        with self.lock:
+            series_list = [
+                (label_values, list(bucket_counts), total[0])
+                for label_values, (bucket_counts, total) in sorted(self.series.items())
+            ]
+        label_names = self.label_names + ("le",)
+        for label_values, bucket_counts, total in series_list:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                labels = format_labels(
+                    label_names, label_values + (format_value(bound),)
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+def get_metrics_text(metrics: Sequence[Metric]) -> str:
+    """
+    get the Prometheus text exposition of the given metrics
+    """
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.iter_lines())
+    text = "\n".join(lines) + "\n"
+    return text
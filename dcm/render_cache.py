@@ -0,0 +1,409 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional, Tuple
+
+from dcm.svg import SVGConfig
+
+try:
+    # optional brotli compression
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def get_etag(content: str) -> str:
+    """
+    get a strong HTTP entity tag for the given content
+
+    Args:
+        content (str): the response content e.g. SVG or HTML markup
+
+    Returns:
+        str: the quoted content hash
+    """
+    etag = f'"{hashlib.sha256(content.encode()).hexdigest()[:32]}"'
+    return etag
+
+
+def get_encodings() -> List[str]:
+    """
+    get the supported content encodings in order of preference
+    """
+    encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return encodings
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    choose the content encoding for the given Accept-Encoding header
+
+    Args:
+        accept_encoding (str): the Accept-Encoding header of the request
+
+    Returns:
+        Optional[str]: the preferred supported encoding the client accepts - None for no compression
+    """
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        parts = coding.strip().split(";")
+        name = parts[0].strip().lower()
+        quality = 1.0
+        for param in parts[1:]:
+            param = param.strip()
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+    for encoding in get_encodings():
+        if qualities.get(encoding, qualities.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content: str, encoding: str) -> bytes:
+    """
+    compress the given content with the given encoding
+
+    Args:
+        content (str): the content e.g. SVG markup
+        encoding (str): "br" or "gzip"
+
+    Returns:
+        bytes: the compressed utf-8 encoded content
+    """
+    data = content.encode()
+    if encoding == "br":
+        compressed = brotli.compress(data, quality=5)
+    elif encoding == "gzip":
+        # mtime=0 for deterministic output
+        compressed = gzip.compress(data, compresslevel=6, mtime=0)
+    else:
+        raise ValueError(f"unsupported content encoding {encoding}")
+    return compressed
+
+
+@dataclass
+class RenderCacheStats:
+    """
+    counters of a render cache to allow sizing it
+
+    Attributes:
+        hits (int): number of lookups answered from memory
+        disk_hits (int): number of lookups answered from the on-disk tier
+        misses (int): number of lookups that needed a render
+        evictions (int): number of entries dropped from memory
+        compressions (int): number of markups that needed to be compressed
+        compressed_hits (int): number of compressed markups answered from memory or .svgz files
+        disk_errors (int): number of on-disk tier files that could not be read or written
+        entries (int): number of entries currently held in memory
+        max_entries (int): the capacity of the in-memory tier
+    """
+
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    compressions: int = 0
+    compressed_hits: int = 0
+    disk_errors: int = 0
+    entries: int = 0
+    max_entries: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        the ratio of lookups that did not need a render
+        """
+        lookups = self.hits + self.disk_hits + self.misses
+        hit_ratio = (self.hits + self.disk_hits) / lookups if lookups > 0 else 0.0
+        return hit_ratio
+
+    def as_dict(self) -> dict:
+        """
+        get my counters as a dict including the hit ratio
+        """
+        stats_dict = asdict(self)
+        stats_dict["hit_ratio"] = self.hit_ratio
+        return stats_dict
+
+
+class RenderCache:
+    """
+    a bounded least recently used cache for rendered SVG markup
+    and its compressed variants with an optional on-disk tier
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        cache_dir: Optional[str] = None,
+        svgz: bool = False,
+    ):
+        """
+        constructor
+
+        Args:
+            max_entries (int): the maximum number of markups to keep in memory - 0 disables the memory tier
+            cache_dir (str): optional directory for the on-disk tier
+            svgz (bool): if True precompute a gzip compressed .svgz file next to each .svg file of the on-disk tier
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.svgz = svgz
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        # the markups and their entity tags by key
+        self.entries = OrderedDict()
+        # the compressed markups by (key, encoding)
+        self.compressed = OrderedDict()
+        self.stats = RenderCacheStats(max_entries=max_entries)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get_key(
+        cls,
+        definition: str,
+        markup: str,
+        text_mode: Optional[str],
+        config: Optional[SVGConfig],
+    ) -> str:
+        """
+        get the content hash key for the given render parameters
+
+        Args:
+            definition (str): the JSON or YAML definition of the competence tree
+            markup (str): the markup of the definition ('json' or 'yaml')
+            text_mode (str): the text display mode
+            config (SVGConfig): the SVG configuration - None for the default configuration
+
+        Returns:
+            str: a hex digest identifying the render result
+        """
+        config_dict = asdict(config) if config else None
+        options = json.dumps(
+            {"markup": markup, "text_mode": text_mode, "config": config_dict},
+            sort_keys=True,
+        )
+        sha = hashlib.sha256()
+        sha.update(options.encode())
+        sha.update(b"\0")
+        sha.update(definition.encode())
+        key = sha.hexdigest()
+        return key
+
+    def get_file_path(self, key: str) -> Optional[str]:
+        """
+        get the on-disk path for the given key
+        """
+        file_path = (
+            os.path.join(self.cache_dir, f"{key}.svg") if self.cache_dir else None
+        )
+        return file_path
+
+    def get_svgz_path(self, key: str) -> Optional[str]:
+        """
+        get the on-disk path of the gzip compressed markup for the given key
+        """
+        svgz_path = (
+            os.path.join(self.cache_dir, f"{key}.svgz")
+            if self.cache_dir and self.svgz
+            else None
+        )
+        return svgz_path
+
+    @classmethod
+    def write_file(cls, file_path: str, data: bytes):
+        """
+        write the given data to a temporary file first so that readers never see partial content
+        """
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, file_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remember(self, key: str, entry: Tuple[str, str]):
+        """
+        keep the given markup and entity tag in memory evicting the least recently used entries
+        """
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats.evictions += 1
+        self.stats.entries = len(self.entries)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        look up the markup for the given key
+
+        Args:
+            key (str): the key as returned by get_key
+
+        Returns:
+            str: the cached markup or None if not cached
+        """
+        entry = self.get_entry(key)
+        svg_markup = entry[0] if entry is not None else None
+        return svg_markup
+
+    def get_entry(
+        self, key: str, memory_only: bool = False
+    ) -> Optional[Tuple[str, str]]:
+        """
+        look up the markup and its entity tag for the given key
+
+        the entity tag is computed only once when the markup enters the cache
+
+        Args:
+            key (str): the key as returned by get_key
+            memory_only (bool): if True do not read the on-disk tier and do not count a miss so that event loop callers may try the memory tier first
+
+        Returns:
+            Tuple[str, str]: the cached markup and its entity tag or None if not cached
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry
+        if memory_only:
+            return None
+        file_path = self.get_file_path(key)
+        if file_path and os.path.isfile(file_path):
+            try:
+                with open(file_path, "r") as svg_file:
+                    svg_markup = svg_file.read()
+                entry = (svg_markup, get_etag(svg_markup))
+            except OSError:
+                with self.lock:
+                    self.stats.disk_errors += 1
+        with self.lock:
+            if entry is not None:
+                self._remember(key, entry)
+                self.stats.disk_hits += 1
+            else:
+                self.stats.misses += 1
+        return entry
+
+    def put(self, key: str, svg_markup: str) -> str:
+        """
+        store the given markup for the given key
+
+        a failing write of the on-disk tier e.g. on a full disk is only
+        counted - the markup is still served from memory
+
+        Args:
+            key (str): the key as returned by get_key
+            svg_markup (str): the rendered markup
+
+        Returns:
+            str: the entity tag of the markup
+        """
+        etag = get_etag(svg_markup)
+        with self.lock:
+            self._remember(key, (svg_markup, etag))
+            file_path = self.get_file_path(key)
+        if file_path:
+            try:
+                RenderCache.write_file(file_path, svg_markup.encode())
+                svgz_path = self.get_svgz_path(key)
+                if svgz_path:
+                    RenderCache.write_file(svgz_path, compress(svg_markup, "gzip"))
+            except OSError:
+                with self.lock:
+                    self.stats.disk_errors += 1
+        return etag
+
+    def get_compressed(
+        self, key: str, svg_markup: str, encoding: str, memory_only: bool = False
+    ) -> Optional[bytes]:
+        """
+        get the compressed markup for the given key compressing and caching it if needed
+
+        Args:
+            key (str): the key as returned by get_key
+            svg_markup (str): the markup for the key
+            encoding (str): the content encoding "br" or "gzip"
+            memory_only (bool): if True neither read the svgz file nor compress
+
+        Returns:
+            bytes: the compressed markup or None if memory_only and not held in memory
+        """
+        compressed_key = (key, encoding)
+        with self.lock:
+            compressed = self.compressed.get(compressed_key)
+            if compressed is not None:
+                self.compressed.move_to_end(compressed_key)
+                self.stats.compressed_hits += 1
+                return compressed
+        if memory_only:
+            return None
+        svgz_path = self.get_svgz_path(key) if encoding == "gzip" else None
+        if svgz_path and os.path.isfile(svgz_path):
+            try:
+                with open(svgz_path, "rb") as svgz_file:
+                    compressed = svgz_file.read()
+                with self.lock:
+                    self.stats.compressed_hits += 1
+            except OSError:
+                with self.lock:
+                    self.stats.disk_errors += 1
+        if compressed is None:
+            compressed = compress(svg_markup, encoding)
+            with self.lock:
+                self.stats.compressions += 1
+        with self.lock:
+            if self.max_entries > 0:
+                self.compressed[compressed_key] = compressed
+                while len(self.compressed) > self.max_entries:
+                    self.compressed.popitem(last=False)
+        return compressed
+
+    def get_or_render(self, key: str, render: Callable[[], str]) -> str:
+        """
+        get the markup for the given key rendering and caching it if needed
+
+        Args:
+            key (str): the key as returned by get_key
+            render (Callable): function returning the markup on a cache miss
+
+        Returns:
+            str: the svg markup
+        """
+        svg_markup = self.get(key)
+        if svg_markup is None:
+            svg_markup = render()
+            self.put(key, svg_markup)
+        return svg_markup
+
+    def clear(self):
+        """
+        clear the in-memory tier
+        """
+        with self.lock:
+            self.entries.clear()
+            self.compressed.clear()
+            self.stats.entries = 0
@@ -0,0 +1,225 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import asyncio
+import io
+import os
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from dcm.dcm_chart import DcmChart
+from dcm.dcm_core import CompetenceTree, DynamicCompetenceMap, Learner
+from dcm.stage_timer import RecordingStageTimer
+from dcm.svg import SVGConfig
+
+
+def render_svg_markup(
+    name: str,
+    definition: str,
+    markup: str,
+    text_mode: str = "empty",
+    config: Optional[SVGConfig] = None,
+) -> str:
+    """
+    parse the given competence tree definition and render it as SVG
+
+    this is a module level function so that it may be run in a worker process
+
+    Args:
+        name (str): the name of the definition used in error messages
+        definition (str): the JSON or YAML definition of the competence tree
+        markup (str): the markup of the definition ('json' or 'yaml')
+        text_mode (str): the text display mode
+        config (SVGConfig): the SVG configuration - None for the default configuration
+
+    Returns:
+        str: the SVG markup
+    """
+    dcm = DynamicCompetenceMap.from_definition_string(
+        name, definition, content_class=CompetenceTree, markup=markup
+    )
+    dcm_chart = DcmChart(dcm)
+    svg_markup = dcm_chart.generate_svg_markup(
+        config=config, with_java_script=True, text_mode=text_mode
+    )
+    return svg_markup
+
+
+def render_svg_markup_timed(
+    name: str,
+    definition: str,
+    markup: str,
+    text_mode: str = "empty",
+    config: Optional[SVGConfig] = None,
+) -> Tuple[str, dict]:
+    """
+    parse the given competence tree definition and render it as SVG
+    recording the durations of the stages and the element and byte counts
+
+    this is a module level function so that it may be run in a worker process
+
+    Args:
+        see render_svg_markup
+
+    Returns:
+        Tuple[str, dict]: the SVG markup and the timings and counts of the stages
+    """
+    timer = RecordingStageTimer()
+    with timer.stage("parse"):
+        dcm = DynamicCompetenceMap.from_definition_string(
+            name, definition, content_class=CompetenceTree, markup=markup
+        )
+    dcm_chart = DcmChart(dcm, timer=timer)
+    svg_markup = dcm_chart.generate_svg_markup(
+        config=config, with_java_script=True, text_mode=text_mode
+    )
+    return svg_markup, timer.as_dict()
+
+
+def render_svg_zip_batch(
+    name: str,
+    definition: str,
+    markup: str,
+    learner_definitions: List[str],
+    text_mode: str = "empty",
+    config: Optional[SVGConfig] = None,
+) -> bytes:
+    """
+    parse the given competence tree and learner definitions and render
+    the SVG for each learner into a zip archive
+
+    this is a module level function so that it may be run in a worker process
+
+    Args:
+        name (str): the name of the definition used in error messages
+        definition (str): the JSON or YAML definition of the competence tree
+        markup (str): the markup of the definition ('json' or 'yaml')
+        learner_definitions (List[str]): the JSON definitions of the learners
+        text_mode (str): the text display mode
+        config (SVGConfig): the SVG configuration - None for the default configuration
+
+    Returns:
+        bytes: a zip archive with a <learner file name>.svg entry per learner
+
+    Raises:
+        ValueError: if the learner ids or their file names are not unique
+    """
+    dcm = DynamicCompetenceMap.from_definition_string(
+        name, definition, content_class=CompetenceTree, markup=markup
+    )
+    learners = []
+    for index, learner_definition in enumerate(learner_definitions):
+        learner = DynamicCompetenceMap.from_definition_string(
+            f"{name}-learner-{index}",
+            learner_definition,
+            content_class=Learner,
+            markup="json",
+        )
+        learners.append(learner)
+    # learners with different ids may share a file name
+    duplicate_file_names = DcmChart.get_duplicates(
+        [learner.file_name for learner in learners]
+    )
+    if duplicate_file_names:
+        raise ValueError(f"duplicate learner file names {duplicate_file_names}")
+    dcm_chart = DcmChart(dcm)
+    svg_markups = dcm_chart.generate_svg_markup_batch(
+        learners, config=config, with_java_script=True, text_mode=text_mode
+    )
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for learner in learners:
+            svg_markup = svg_markups[learner.learner_id]
+            zip_file.writestr(f"{learner.file_name}.svg", svg_markup)
+    return zip_buffer.getvalue()
+
+
+class RenderPoolSaturated(Exception):
+    """
+    raised when a render pool can not accept further work
+    """
+
+
+class RenderPool:
+    """
+    a pool of workers to keep CPU bound rendering off the asyncio event loop
+    with a bounded queue to apply back-pressure
+    """
+
+    modes = ["inline", "thread", "process"]
+
+    def __init__(
+        self, mode: str = "thread", max_workers: int = None, max_queue: int = 16
+    ):
+        """
+        constructor
+
+        Args:
+            mode (str): "inline" to render on the event loop, "thread" or "process" to use a worker pool
+            max_workers (int): the number of workers - default: number of CPUs
+            max_queue (int): the number of jobs that may wait for a free worker
+        """
+        if mode not in RenderPool.modes:
+            raise ValueError(
+                f"invalid render mode {mode} - must be one of {RenderPool.modes}"
+            )
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.max_pending = self.max_workers + self.max_queue
+        self.pending = 0
+        self.executor: Optional[Executor] = None
+        if mode == "thread":
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="dcm-render"
+            )
+        elif mode == "process":
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    @property
+    def saturated(self) -> bool:
+        """
+        check whether all workers are busy and the queue is full
+        """
+        saturated = self.pending >= self.max_pending
+        return saturated
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        run the given function with the given arguments in the pool
+
+        Args:
+            func (Callable): the function to run - needs to be picklable in process mode
+            *args: the positional arguments of the function
+
+        Returns:
+            Any: the result of the function
+
+        Raises:
+            RenderPoolSaturated: if the queue is full
+        """
+        if self.executor is None:
+            return func(*args)
+        if self.saturated:
+            raise RenderPoolSaturated(
+                f"render pool saturated: {self.pending} jobs pending"
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+        return result
+
+    def shutdown(self):
+        """
+        shut down my workers
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
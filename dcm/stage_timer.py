@@ -0,0 +1,158 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from typing import Callable, ContextManager, Dict, Optional
+
+
+class StageTimer:
+    """
+    instrumentation hooks for the stages of a rendering
+
+    this base class is the null timer that records nothing so that
+    the hooks have near-zero overhead when instrumentation is disabled
+    """
+
+    enabled = False
+    _null_context = nullcontext()
+
+    def stage(self, name: str) -> ContextManager:
+        """
+        get a context manager measuring the duration of the stage with the given name
+        """
+        return self._null_context
+
+    def add_time(self, name: str, seconds: float):
+        """
+        add the given duration to the stage with the given name
+        """
+        pass
+
+    def count(self, name: str, value: int = 1):
+        """
+        add the given value to the counter with the given name e.g. elements or bytes
+        """
+        pass
+
+
+# the shared null timer
+NULL_TIMER = StageTimer()
+
+
+class RecordingStageTimer(StageTimer):
+    """
+    a stage timer recording the total duration of each stage and the counters
+
+    stages may be nested e.g. the text placement is part of the pie elements stage
+    """
+
+    enabled = True
+
+    def __init__(self, callback: Optional[Callable[[str, float], None]] = None):
+        """
+        constructor
+
+        Args:
+            callback (Callable): optional function to be called with the name and duration of each stage
+        """
+        self.callback = callback
+        self.timings: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start_time)
+
+    def add_time(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def count(self, name: str, value: int = 1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def as_dict(self) -> dict:
+        """
+        get my timings and counters as a dict
+        """
+        timer_dict = {"timings": dict(self.timings), "counts": dict(self.counts)}
+        return timer_dict
+
+
+@dataclass
+class StageStatistic:
+    """
+    aggregated durations of a stage
+
+    Attributes:
+        count (int): number of renderings the stage was measured in
+        total (float): the total duration in seconds
+        max (float): the longest duration in seconds
+    """
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        """
+        the mean duration in seconds
+        """
+        mean = self.total / self.count if self.count else 0.0
+        return mean
+
+
+class StageTimingStats:
+    """
+    thread safe aggregation of the recorded stage timings and counters of many renderings
+    """
+
+    def __init__(self):
+        self.renderings = 0
+        self.stages: Dict[str, StageStatistic] = {}
+        self.counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def add(self, timings: Dict[str, float], counts: Optional[Dict[str, int]] = None):
+        """
+        add the timings and counters of a rendering
+
+        Args:
+            timings (Dict[str, float]): the durations in seconds by stage name
+            counts (Dict[str, int]): the counters by name
+        """
+        with self.lock:
+            self.renderings += 1
+            for name, seconds in timings.items():
+                stat = self.stages.setdefault(name, StageStatistic())
+                stat.count += 1
+                stat.total += seconds
+                stat.max = max(stat.max, seconds)
+            for name, value in (counts or {}).items():
+                self.counts[name] = self.counts.get(name, 0) + value
+
+    def as_dict(self) -> dict:
+        """
+        get the aggregated timings and counters as a dict
+        """
+        with self.lock:
+            stats_dict = {
+                "renderings": self.renderings,
+                "stages": {
+                    name: {**asdict(stat), "mean": stat.mean}
+                    for name, stat in self.stages.items()
+                },
+                "counts": dict(self.counts),
+            }
+        return stats_dict
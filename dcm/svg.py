@@ -1,8 +1,18 @@
+import dataclasses
 import html
 import math
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+try:
+    # numpy is optional and only used to vectorise the angle table calculation
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from dcm.stage_timer import NULL_TIMER, StageTimer
 
 
 @dataclass
@@ -19,6 +29,13 @@ class SVGConfig:
         indent (str): Indentation string, default is two spaces.
         default_color (str): Default color code for SVG elements.
         with_pop(bool): if True support popup javascript functionality
+        compact (bool): if True generate minified markup without indentation and comments
+            using rounded coordinates, relative path commands and CSS classes for text styles
+        precision (int): number of decimal places of coordinates in compact mode
+        fragment_ids (bool): if True wrap the markup of each competence element in a group
+            with a fragment id so that it may be patched incrementally
+        with_timestamp (bool): if True the header comment contains the generation time -
+            set to False for byte-wise identical markup of identical input
     """
 
     width: int = 600
@@ -29,6 +46,10 @@ class SVGConfig:
     indent: str = "  "
     default_color: str = "#C0C0C0"
     with_popup: bool = False
+    compact: bool = False
+    precision: int = 2
+    fragment_ids: bool = False
+    with_timestamp: bool = True
 
     @property
     def total_height(self) -> int:
@@ -48,10 +69,17 @@ class SVGConfig:
         return line_height
 
 
-@dataclass
+# cache of the field names of the SVGNode classes for SVGNode.replace
+_node_field_names: Dict[type, Tuple[str, ...]] = {}
+
+
+@dataclass(frozen=True, slots=True)
 class SVGNode:
     """
     a generic SVG Node
+
+    nodes are immutable value objects - use replace to derive
+    a modified node instead of copying and changing it
     """
 
     indent_level: int = 1
@@ -65,8 +93,35 @@ class SVGNode:
     title: Optional[str] = None  # Tooltip
     comment: Optional[str] = None
 
+    def replace(self, **changes) -> "SVGNode":
+        """
+        get a shallow copy of me with the given field values changed
 
-@dataclass
+        this is a cheaper version of dataclasses.replace since there is
+        no __post_init__ processing for nodes
+
+        Args:
+            **changes: the field values to change
+
+        Returns:
+            SVGNode: a new node of my class
+        """
+        node_class = self.__class__
+        field_names = _node_field_names.get(node_class)
+        if field_names is None:
+            field_names = tuple(f.name for f in dataclasses.fields(node_class))
+            _node_field_names[node_class] = field_names
+        if not changes.keys() <= set(field_names):
+            invalid_names = sorted(changes.keys() - set(field_names))
+            raise TypeError(f"invalid fields {invalid_names} for {node_class.__name__}")
+        node = object.__new__(node_class)
+        for name in field_names:
+            value = changes[name] if name in changes else getattr(self, name)
+            object.__setattr__(node, name, value)
+        return node
+
+
+@dataclass(frozen=True, slots=True)
 class SVGNodeConfig(SVGNode):
     """
     a single SVG Node configuration
@@ -132,7 +187,7 @@ class Arc:
     middle_y: Optional[float] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Polygon(SVGNode):
     """
     A polygon representing a series of data points in a radar chart.
@@ -142,7 +197,7 @@ class Polygon(SVGNode):
     points: List[Tuple[float, float]] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DonutSegment(SVGNode):
     """
     A donut segment representing a
@@ -182,17 +237,38 @@ class DonutSegment(SVGNode):
         )
         return radial_radius
 
-    def x_y(self, angle: float, radial_radius: float):
-        x = self.cx + radial_radius * math.cos(math.radians(angle))
-        y = self.cy + radial_radius * math.sin(math.radians(angle))
+    @property
+    def angles(self) -> Tuple[float, float, float]:
+        """
+        get the start, end and middle angle of this segment
+        """
+        angles = (self.start_angle, self.end_angle, self.relative_angle(0.5))
+        return angles
+
+    def x_y(
+        self,
+        angle: float,
+        radial_radius: float,
+        angle_table: Optional["AngleTable"] = None,
+    ):
+        if angle_table is None:
+            x = self.cx + radial_radius * math.cos(math.radians(angle))
+            y = self.cy + radial_radius * math.sin(math.radians(angle))
+        else:
+            cos, sin = angle_table.unit_vector(angle)
+            x = self.cx + radial_radius * cos
+            y = self.cy + radial_radius * sin
         return x, y
 
-    def get_arc(self, radial_offset: float = 0.5) -> Arc:
+    def get_arc(
+        self, radial_offset: float = 0.5, angle_table: Optional["AngleTable"] = None
+    ) -> Arc:
         """
         Get the Arc for the given radial offset
 
         Args:
             radial_offset(float): e.g. 0.0 - inner 1.0 outer 0.5 middle
+            angle_table(AngleTable): optional table of precomputed unit vectors
         Returns:
             Arc: the arc at the given radial offset
         """
@@ -200,10 +276,10 @@ class DonutSegment(SVGNode):
         radial_radius = self.radial_radius(radial_offset)
 
         # Calculate the start and end points of the arc
-        start_x, start_y = self.x_y(self.start_angle, radial_radius)
-        end_x, end_y = self.x_y(self.end_angle, radial_radius)
+        start_x, start_y = self.x_y(self.start_angle, radial_radius, angle_table)
+        end_x, end_y = self.x_y(self.end_angle, radial_radius, angle_table)
         middle_angle = self.relative_angle(0.5)
-        middle_x, middle_y = self.x_y(middle_angle, radial_radius)
+        middle_x, middle_y = self.x_y(middle_angle, radial_radius, angle_table)
 
         return Arc(
             radius=radial_radius,
@@ -216,6 +292,104 @@ class DonutSegment(SVGNode):
         )
 
 
+class AngleTable:
+    """
+    a table of the unit vectors (cos, sin) of angles given in degrees
+    so that the trigonometric functions are evaluated only once per angle
+    for all paths, texts and level arcs of a chart
+    """
+
+    def __init__(self):
+        """
+        constructor
+        """
+        self.unit_vectors: Dict[float, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.unit_vectors)
+
+    def precompute(self, angles: Iterable[float]):
+        """
+        compute the unit vectors of all given angles at once -
+        vectorised if numpy is available
+
+        Args:
+            angles(Iterable[float]): the angles in degrees
+        """
+        new_angles = [angle for angle in set(angles) if angle not in self.unit_vectors]
+        if not new_angles:
+            return
+        if np is not None:
+            radians = np.radians(np.array(new_angles, dtype=float))
+            cos_values = np.cos(radians).tolist()
+            sin_values = np.sin(radians).tolist()
+        else:
+            radians = [math.radians(angle) for angle in new_angles]
+            cos_values = [math.cos(radian) for radian in radians]
+            sin_values = [math.sin(radian) for radian in radians]
+        self.unit_vectors.update(zip(new_angles, zip(cos_values, sin_values)))
+
+    def precompute_segments(self, segments: Iterable[DonutSegment]):
+        """
+        compute the unit vectors of the start, end and middle angles
+        of the given segments
+
+        Args:
+            segments(Iterable[DonutSegment]): the segments
+        """
+        self.precompute(angle for segment in segments for angle in segment.angles)
+
+    def unit_vector(self, angle: float) -> Tuple[float, float]:
+        """
+        get the unit vector for the given angle computing it if necessary
+
+        Args:
+            angle(float): the angle in degrees
+
+        Returns:
+            Tuple[float, float]: cos and sin of the angle
+        """
+        unit_vector = self.unit_vectors.get(angle)
+        if unit_vector is None:
+            radians = math.radians(angle)
+            unit_vector = (math.cos(radians), math.sin(radians))
+            self.unit_vectors[angle] = unit_vector
+        return unit_vector
+
+
+def format_number(value: float, precision: int) -> str:
+    """
+    format the given number rounded to the given number of decimal places
+    without trailing zeros
+
+    Args:
+        value (float): the number to format
+        precision (int): the number of decimal places
+
+    Returns:
+        str: the shortest representation e.g. "300" for 300.00000000000006
+    """
+    text = f"{value:.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    if text == "-0":
+        text = "0"
+    return text
+
+
+class SVGChunks(list):
+    """
+    a text stream collecting the written chunks e.g. to be
+    yielded by a generator
+    """
+
+    def write(self, chunk: str):
+        """
+        collect the given chunk
+        """
+        self.append(chunk)
+
+
 class SVG:
     """
     Class for creating SVG drawings.
@@ -235,7 +409,48 @@ class SVG:
         self.width = self.config.width
         self.height = self.config.height
         self.elements = []
-        self.indent = self.config.indent
+        self.compact = self.config.compact
+        self.indent = "" if self.compact else self.config.indent
+        # line separator of the generated markup
+        self.newline = "" if self.compact else "\n"
+        # unit vectors of the angles used by the donut segments
+        self.angle_table = AngleTable()
+        # text stream to write elements to in streaming mode
+        self.stream: Optional[TextIO] = None
+        # instrumentation hooks - the null timer records nothing
+        self.timer: StageTimer = NULL_TIMER
+        # the index of the content of each fragment in my elements
+        self.fragment_indices: Dict[str, int] = {}
+        self.fragment_start: Optional[Tuple[str, int]] = None
+
+    def fmt(self, value: float) -> str:
+        """
+        format the given coordinate - rounded in compact mode
+        and unchanged otherwise
+
+        Args:
+            value (float): the coordinate
+
+        Returns:
+            str: the text representation of the coordinate
+        """
+        if self.compact:
+            return format_number(value, self.config.precision)
+        return f"{value}"
+
+    def minify(self, markup: str) -> str:
+        """
+        remove the indentation and line breaks of the given markup in compact mode
+
+        Args:
+            markup (str): the markup to minify
+
+        Returns:
+            str: the minified markup
+        """
+        if self.compact:
+            markup = "".join(line.strip() for line in markup.split("\n"))
+        return markup
 
     def get_indent(self, level) -> str:
         """
@@ -282,7 +497,15 @@ class SVG:
                 f"{self.indent * 2}}}\n"
             )
 
+        if self.compact:
+            # text styles shared by all text elements instead of repeated attributes
+            style += (
+                f".dcm-text {{ font-family: {self.config.font}; font-size: {self.config.font_size}px; dominant-baseline: middle; }}\n"
+                ".dcm-middle { dominant-baseline: middle; text-anchor: middle; }\n"
+                ".dcm-bold { font-weight: bold; }\n"
+            )
         style += f"{self.indent}</style>\n"
+        style = self.minify(style)
         return style
 
     def get_text_width(self, text: str) -> int:
@@ -337,8 +560,12 @@ class SVG:
         Returns:
             str: SVG path definition string for the full donut segment or the middle_arc if middle_arc is set to true.
         """
+        if self.compact:
+            return self.get_compact_donut_path(segment, radial_offset, middle_arc)
         if middle_arc:
-            arc = segment.get_arc(radial_offset=radial_offset)
+            arc = segment.get_arc(
+                radial_offset=radial_offset, angle_table=self.angle_table
+            )
 
             # Create the path for the middle arc
             path_str = (
@@ -346,8 +573,8 @@ class SVG:
                 f"A {arc.radius} {arc.radius} 0 {segment.large_arc_flag} 1 {arc.end_x} {arc.end_y}"
             )
         else:
-            outer_arc = segment.get_arc(radial_offset=1)
-            inner_arc = segment.get_arc(radial_offset=0)
+            outer_arc = segment.get_arc(radial_offset=1, angle_table=self.angle_table)
+            inner_arc = segment.get_arc(radial_offset=0, angle_table=self.angle_table)
             path_str = (
                 f"M {inner_arc.start_x} {inner_arc.start_y} "  # Move to start of inner arc
                 f"L {outer_arc.start_x} {outer_arc.start_y} "  # Line to start of outer arc
@@ -359,6 +586,77 @@ class SVG:
 
         return path_str
 
+    def get_compact_donut_path(
+        self,
+        segment: DonutSegment,
+        radial_offset: float = 0.5,
+        middle_arc: bool = False,
+    ) -> str:
+        """
+        Create a minified SVG path definition for the given DonutSegment
+        using relative commands and rounded coordinates.
+
+        Args:
+            segment (DonutSegment): The segment for which to create the path.
+            radial_offset(float): 0 to 1 - useable in middle_arc mode
+            middle_arc(bool): if True get the middle arc
+
+        Returns:
+            str: SVG path definition string
+        """
+        precision = self.config.precision
+
+        def point(x: float, y: float) -> Tuple[float, float]:
+            return round(x, precision), round(y, precision)
+
+        def delta(start: Tuple[float, float], end: Tuple[float, float]) -> str:
+            # differences of rounded points so that errors do not accumulate
+            dx = self.fmt(end[0] - start[0])
+            dy = self.fmt(end[1] - start[1])
+            return f"{dx} {dy}"
+
+        flag = segment.large_arc_flag
+        if middle_arc:
+            arc = segment.get_arc(
+                radial_offset=radial_offset, angle_table=self.angle_table
+            )
+            start = point(arc.start_x, arc.start_y)
+            end = point(arc.end_x, arc.end_y)
+            r = self.fmt(arc.radius)
+            path_str = (
+                f"M{self.fmt(start[0])} {self.fmt(start[1])}"
+                f"a{r} {r} 0 {flag} 1 {delta(start, end)}"
+            )
+        else:
+            outer_arc = segment.get_arc(radial_offset=1, angle_table=self.angle_table)
+            inner_arc = segment.get_arc(radial_offset=0, angle_table=self.angle_table)
+            inner_start = point(inner_arc.start_x, inner_arc.start_y)
+            outer_start = point(outer_arc.start_x, outer_arc.start_y)
+            outer_end = point(outer_arc.end_x, outer_arc.end_y)
+            inner_end = point(inner_arc.end_x, inner_arc.end_y)
+            outer_r = self.fmt(segment.outer_radius)
+            inner_r = self.fmt(segment.inner_radius)
+            path_str = (
+                f"M{self.fmt(inner_start[0])} {self.fmt(inner_start[1])}"
+                f"l{delta(inner_start, outer_start)}"
+                f"a{outer_r} {outer_r} 0 {flag} 1 {delta(outer_start, outer_end)}"
+                f"l{delta(outer_end, inner_end)}"
+                f"a{inner_r} {inner_r} 0 {flag} 0 {delta(inner_end, inner_start)}"
+                "z"
+            )
+        return path_str
+
+    def add_comment(self, comment: str, indent_level: int = 1):
+        """
+        Add an SVG comment - comments are dropped in compact mode
+
+        Args:
+            comment (str): the comment text
+            indent_level (int): Indentation level for the comment.
+        """
+        if not self.compact:
+            self.add_element(f"<!-- {comment} -->", indent_level=indent_level)
+
     def add_element(self, element: str, indent_level: int = 1, comment: str = None):
         """
         Add an SVG element to the elements list with proper indentation.
@@ -368,12 +666,68 @@ class SVG:
             indent_level (int): Indentation level for the element.
             comment(str): optional comment to add
         """
+        if self.compact:
+            self.emit(self.minify(element))
+            return
         base_indent = self.get_indent(indent_level)
         if comment:
             indented_comment = f"{base_indent}<!-- {comment} -->\n"
-            self.elements.append(indented_comment)
+            self.emit(indented_comment)
         indented_element = f"{base_indent}{element}\n"
-        self.elements.append(indented_element)
+        self.emit(indented_element)
+
+    def emit(self, chunk: str):
+        """
+        emit the given chunk of markup - either to the stream
+        in streaming mode or to my elements list
+
+        Args:
+            chunk (str): the markup to emit
+        """
+        if self.stream is not None:
+            self.stream.write(chunk)
+        else:
+            self.elements.append(chunk)
+
+    def start_fragment(self, fragment_id: str):
+        """
+        start a group for the elements of a fragment
+        that may be replaced incrementally
+
+        Args:
+            fragment_id (str): the id of the fragment group
+        """
+        if self.config.fragment_ids:
+            self.add_element(f'<g id="{fragment_id}">')
+            if self.stream is None:
+                self.fragment_start = (fragment_id, len(self.elements))
+
+    def end_fragment(self):
+        """
+        end the group of the current fragment
+
+        the elements of the fragment are joined into a single
+        element so that the fragment may be patched later
+        """
+        if self.config.fragment_ids:
+            if self.fragment_start is not None:
+                fragment_id, start = self.fragment_start
+                self.elements[start:] = ["".join(self.elements[start:])]
+                self.fragment_indices[fragment_id] = start
+                self.fragment_start = None
+            self.add_element("</g>")
+
+    def patch_fragments(self, fragments: Dict[str, str]):
+        """
+        replace the content of the given fragments
+
+        Args:
+            fragments (Dict[str, str]): the fragment markup by fragment id
+        """
+        for fragment_id, markup in fragments.items():
+            index = self.fragment_indices.get(fragment_id)
+            if index is not None:
+                self.elements[index] = markup
 
     def add_circle(self, config: SVGNodeConfig):
         """
@@ -383,7 +737,7 @@ class SVG:
             config (SVGNodeConfig): Configuration for the circle element.
         """
         color = config.fill if config.fill else self.config.default_color
-        circle_element = f'<circle cx="{config.x}" cy="{config.y}" r="{config.width}" fill="{color}" class="{config.element_class}" />'
+        circle_element = f'<circle cx="{self.fmt(config.x)}" cy="{self.fmt(config.y)}" r="{self.fmt(config.width)}" fill="{color}" class="{config.element_class}" />'
 
         # If URL is provided, wrap the circle in an anchor tag to make it clickable
         if config.url:
@@ -422,7 +776,7 @@ class SVG:
             indent_level (int): Indentation level for the rectangle.
         """
         color = fill if fill else self.config.default_color
-        rect = f'<rect x="{x}" y="{y}" width="{width}" height="{height}" fill="{color}" />\n'
+        rect = f'<rect x="{self.fmt(x)}" y="{self.fmt(y)}" width="{self.fmt(width)}" height="{self.fmt(height)}" fill="{color}" />\n'
         self.add_element(rect, indent_level=indent_level)
 
     def add_polygon(self, polygon: Polygon, indent_level: int = 1):
@@ -433,7 +787,7 @@ class SVG:
             polygon (Polygon): The polygon to add to the SVG.
             indent_level (int): Indentation level for the element.
         """
-        points_str = " ".join(f"{x},{y}" for x, y in polygon.points)
+        points_str = " ".join(f"{self.fmt(x)},{self.fmt(y)}" for x, y in polygon.points)
         fill_color = polygon.fill if polygon.fill else self.config.default_color
         opacity = polygon.opacity
         stroke_color = polygon.color if polygon.color else "black"
@@ -529,22 +883,40 @@ class SVG:
         # Create a text element to hold the tspan elements
         # Only include the transform attribute if it is provided
         transform_attr = f'transform="{transform}" ' if transform else ""
-
-        text_element = (
-            f'\n{self.get_indent(indent_level)}<text class="{text_class}" x="{x}" y="{y}" fill="{fill}" '
-            f'font-family="{self.config.font}" '
-            f'font-size="{self.config.font_size}" '
-            f'font-weight="{font_weight}" '
-            f'text-anchor="{text_anchor}" '
-            f'dominant-baseline="middle" '
-            f"{transform_attr}>"
-        )
+        x = self.fmt(x)
+        y = self.fmt(y)
+
+        if self.compact:
+            # the font attributes are defined by the dcm-text CSS class
+            text_classes = f"{text_class} dcm-text"
+            if font_weight == "bold":
+                text_classes += " dcm-bold"
+            anchor_attr = (
+                f' text-anchor="{text_anchor}"' if text_anchor != "start" else ""
+            )
+            text_element = (
+                f'<text class="{text_classes}" x="{x}" y="{y}" fill="{fill}"{anchor_attr}'
+                f"{' ' + transform_attr.strip() if transform_attr else ''}>"
+            )
+        else:
+            text_element = (
+                f'\n{self.get_indent(indent_level)}<text class="{text_class}" x="{x}" y="{y}" fill="{fill}" '
+                f'font-family="{self.config.font}" '
+                f'font-size="{self.config.font_size}" '
+                f'font-weight="{font_weight}" '
+                f'text-anchor="{text_anchor}" '
+                f'dominant-baseline="middle" '
+                f"{transform_attr}>"
+            )
         # Add tspan elements for each line
+        line_height = self.fmt(self.config.line_height)
         for line in text_obj.lines:
             escaped_line = html.escape(line)
-            text_element += f'\n{self.get_indent(indent_level+1)}<tspan x="{x}" dy="{self.config.line_height}">{escaped_line}</tspan>'
+            text_element += f'{self.newline}{self.get_indent(indent_level+1)}<tspan x="{x}" dy="{line_height}">{escaped_line}</tspan>'
 
-        text_element += f"\n{self.get_indent(indent_level)}</text>\n"
+        text_element += (
+            f"{self.newline}{self.get_indent(indent_level)}</text>{self.newline}"
+        )
         self.add_element(text_element)
 
     def add_group(
@@ -570,6 +942,10 @@ class SVG:
         if group_class:
             group_attrs.append(f'class="{group_class}"')
         attrs_str = " ".join(group_attrs)
+        if self.compact:
+            group_str = f"<g {attrs_str}>{self.minify(content)}</g>"
+            self.add_element(group_str)
+            return
         indented_content = "\n".join(
             f"{self.get_indent(indent_level + 1)}{line}"
             for line in content.strip().split("\n")
@@ -652,7 +1028,9 @@ class SVG:
         if direction in ["horizontal", "angled"]:
             # Calculate position for horizontal or angled text
             # Use the get_arc method to find the position for horizontal or angled text
-            mid_arc = segment.get_arc(radial_offset=0.5)  # Get the mid-arc
+            mid_arc = segment.get_arc(
+                radial_offset=0.5, angle_table=self.angle_table
+            )  # Get the mid-arc
             text_x, text_y = mid_arc.middle_x, mid_arc.middle_y
 
             # Adjust text anchor and rotation for better readability
@@ -660,7 +1038,7 @@ class SVG:
             if direction == "angled":
                 mid_angle = segment.relative_angle(0.5)
                 rotation_angle = self.get_text_rotation(mid_angle)
-                transform = f"rotate({rotation_angle}, {text_x}, {text_y})"
+                transform = f"rotate({self.fmt(rotation_angle)}, {self.fmt(text_x)}, {self.fmt(text_y)})"
 
             # Add text using the add_text method
             self.add_text(
@@ -689,9 +1067,15 @@ class SVG:
                     f'<path id="{path_id}" d="{path_d}" fill="none" stroke="none" />'
                 )
 
-                text_tag = f"""<text class="{text_class}" fill="{color}" font-family="{self.config.font}" font-size="{self.config.font_size}">"""
+                if self.compact:
+                    text_tag = (
+                        f"""<text class="{text_class} dcm-text" fill="{color}">"""
+                    )
+                    text_path = f"""<textPath xlink:href="#{path_id}" startOffset="50%" class="dcm-middle">{html.escape(line)}</textPath>"""
+                else:
+                    text_tag = f"""<text class="{text_class}" fill="{color}" font-family="{self.config.font}" font-size="{self.config.font_size}">"""
+                    text_path = f"""<textPath  xlink:href="#{path_id}" startOffset="50%" dominant-baseline="middle" text-anchor="middle">{html.escape(line)}</textPath>"""
                 self.add_element(text_tag, indent_level=indent_level)
-                text_path = f"""<textPath  xlink:href="#{path_id}" startOffset="50%" dominant-baseline="middle" text-anchor="middle">{html.escape(line)}</textPath>"""
                 self.add_element(text_path, indent_level=indent_level + 1)
                 self.add_element("</text>", indent_level=indent_level)
         else:
@@ -751,26 +1135,69 @@ class SVG:
     """
         return popup_script
 
-    def get_svg_markup(self, with_java_script: bool = False) -> str:
+    def get_patch_java_script(self) -> str:
         """
-        Generate the complete SVG markup.
+        get the java script code for replacing the content of fragments
+        """
+        patch_script = """
+    <script>
+        function patchFragments(fragments) {
+            // replace the content of the fragment groups
+            // with the given ids by the given markup
+            for (const [fragmentId, markup] of Object.entries(fragments)) {
+                var fragment = document.getElementById(fragmentId);
+                if (fragment) {
+                    fragment.innerHTML = markup;
+                }
+            }
+        }
+    </script>
+    """
+        return patch_script
+
+    def get_svg_prolog(self, with_java_script: bool = False) -> str:
+        """
+        get the markup that precedes the elements: header, javascript and styles
 
         Args:
-            with_java_script(bool): if True(default) the javascript code is included otherwise
-            it's available via the get_java_script function
+            with_java_script(bool): if True the javascript code is included
 
         Returns:
-            str: String containing the complete SVG markup.
+            str: the prolog markup
         """
-        # Get current date and time
-        now = datetime.now()
-        formatted_now = now.strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = ""
+        if self.config.with_timestamp:
+            # Get current date and time
+            now = datetime.now()
+            timestamp = f" at {now.strftime('%Y-%m-%d %H:%M:%S')}"
+        comment = (
+            ""
+            if self.compact
+            else f"<!-- generated by dcm https://github.com/WolfgangFahl/dcm{timestamp} -->\n"
+        )
         header = (
-            f"<!-- generated by dcm https://github.com/WolfgangFahl/dcm at {formatted_now} -->\n"
+            f"{comment}"
             f'<svg xmlns="http://www.w3.org/2000/svg" '
             f'xmlns:xlink="http://www.w3.org/1999/xlink" '
-            f'width="{self.width}" height="{self.config.total_height}">\n'
+            f'width="{self.width}" height="{self.config.total_height}">{self.newline}'
         )
+        styles = self.get_svg_style()
+        java_script = self.get_java_script() if with_java_script else ""
+        if self.compact:
+            # keep the line breaks since the script has line comments
+            java_script = "\n".join(
+                line.strip() for line in java_script.split("\n") if line.strip()
+            )
+        prolog = f"{header}{java_script}{styles}"
+        return prolog
+
+    def get_svg_epilog(self) -> str:
+        """
+        get the markup that follows the elements: the optional popup and the footer
+
+        Returns:
+            str: the epilog markup
+        """
         popup = (
             """
         <!-- Add a foreignObject for the popup -->
@@ -787,13 +1214,78 @@ class SVG:
             if self.config.with_popup
             else ""
         )
-        styles = self.get_svg_style()
-        body = "".join(self.elements)
         footer = "</svg>"
-        java_script = self.get_java_script() if with_java_script else ""
-        svg_markup = f"{header}{java_script}{styles}{body}{popup}{footer}"
+        if self.compact:
+            popup = re.sub(r"<!--.*?-->", "", self.minify(popup))
+        epilog = f"{popup}{footer}"
+        return epilog
+
+    def get_svg_markup(self, with_java_script: bool = False) -> str:
+        """
+        Generate the complete SVG markup.
+
+        Args:
+            with_java_script(bool): if True(default) the javascript code is included otherwise
+            it's available via the get_java_script function
+
+        Returns:
+            str: String containing the complete SVG markup.
+        """
+        with self.timer.stage("markup"):
+            prolog = self.get_svg_prolog(with_java_script)
+            body = "".join(self.elements)
+            epilog = self.get_svg_epilog()
+            svg_markup = f"{prolog}{body}{epilog}"
+        if self.timer.enabled:
+            self.timer.count("svg_elements", len(self.elements))
+            self.timer.count("bytes", len(svg_markup.encode()))
         return svg_markup
 
+    def iter_svg_markup(self, with_java_script: bool = False) -> Iterator[str]:
+        """
+        Generate the complete SVG markup chunk by chunk.
+
+        Args:
+            with_java_script(bool): if True the javascript code is included
+
+        Yields:
+            str: the chunks of the SVG markup
+        """
+        yield self.get_svg_prolog(with_java_script)
+        yield from self.elements
+        yield self.get_svg_epilog()
+
+    def write_svg_markup(self, stream: TextIO, with_java_script: bool = False):
+        """
+        write the complete SVG markup to the given text stream
+
+        Args:
+            stream(TextIO): the stream to write to
+            with_java_script(bool): if True the javascript code is included
+        """
+        for chunk in self.iter_svg_markup(with_java_script):
+            stream.write(chunk)
+
+    def start_stream(self, stream: TextIO, with_java_script: bool = False):
+        """
+        switch to streaming mode: write the prolog to the given
+        text stream and write all elements added from now on
+        directly to it instead of keeping them
+
+        Args:
+            stream(TextIO): the stream to write to
+            with_java_script(bool): if True the javascript code is included
+        """
+        self.stream = stream
+        self.stream.write(self.get_svg_prolog(with_java_script))
+
+    def end_stream(self):
+        """
+        finish streaming mode by writing the epilog
+        """
+        self.stream.write(self.get_svg_epilog())
+        self.stream = None
+
     def save(self, filename: str):
         """
         Save the SVG markup to a file.
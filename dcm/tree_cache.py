@@ -0,0 +1,159 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Tuple
+
+from dcm.version import Version
+
+
+@dataclass
+class TreeCacheStats:
+    """
+    counters of a tree cache
+
+    Attributes:
+        hits (int): number of definitions loaded from the cache
+        misses (int): number of definitions that needed to be parsed
+        writes (int): number of cache entries written
+        errors (int): number of cache entries that could not be read or written
+    """
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        """
+        get my counters as a dict
+        """
+        return asdict(self)
+
+
+class TreeCache:
+    """
+    a cache directory with the pickled results of parsing definition files
+    keyed by file path, modification time and size so that warm starts
+    do not need to parse YAML or JSON at all
+    """
+
+    # increase when the layout of the cached objects changes
+    # 1: parsed competence trees
+    # 2: trees with memoized chart layouts and layout_version and with a node_table
+    # 3: the layouts are an OrderedDict in least recently used order
+    format_version = 3
+
+    def __init__(self, cache_dir: str):
+        """
+        constructor
+
+        Args:
+            cache_dir (str): the directory for the cache entries
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.stats = TreeCacheStats()
+        self.lock = threading.Lock()
+
+    def get_key(self, file_path: str, content_class) -> Tuple:
+        """
+        get the key for the given definition file
+
+        Args:
+            file_path (str): the path of the definition file
+            content_class: the class the definition is parsed into
+
+        Returns:
+            Tuple: the key which changes whenever the file or the code that parses it changes
+        """
+        stat = os.stat(file_path)
+        key = (
+            TreeCache.format_version,
+            Version.version,
+            os.path.abspath(file_path),
+            stat.st_mtime_ns,
+            stat.st_size,
+            content_class.__name__,
+        )
+        return key
+
+    def get_cache_path(self, file_path: str, content_class) -> str:
+        """
+        get the path of the cache entry for the given definition file
+        """
+        name = f"{content_class.__name__}:{os.path.abspath(file_path)}"
+        digest = hashlib.sha256(name.encode()).hexdigest()
+        cache_path = os.path.join(self.cache_dir, f"{digest}.pickle")
+        return cache_path
+
+    def get(self, file_path: str, content_class) -> Tuple[bool, Any]:
+        """
+        get the cached parse result for the given definition file
+
+        Args:
+            file_path (str): the path of the definition file
+            content_class: the class the definition is parsed into
+
+        Returns:
+            Tuple[bool, Any]: whether the entry was found and up to date and the cached value
+        """
+        cache_path = self.get_cache_path(file_path, content_class)
+        hit = False
+        value = None
+        if os.path.exists(cache_path):
+            try:
+                key = self.get_key(file_path, content_class)
+                with open(cache_path, "rb") as cache_file:
+                    cached_key, cached_value = pickle.load(cache_file)
+                if cached_key == key:
+                    hit = True
+                    value = cached_value
+            except Exception:
+                with self.lock:
+                    self.stats.errors += 1
+        with self.lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+        return hit, value
+
+    def put(
+        self, file_path: str, content_class, value: Any, key: Optional[Tuple] = None
+    ):
+        """
+        cache the given parse result for the given definition file
+
+        Args:
+            file_path (str): the path of the definition file
+            content_class: the class the definition is parsed into
+            value (Any): the parse result - None for definitions that are not valid for the content class
+            key (Tuple): the key determined before the file was read - None to determine it now
+        """
+        if key is None:
+            key = self.get_key(file_path, content_class)
+        cache_path = self.get_cache_path(file_path, content_class)
+        try:
+            data = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(data)
+                os.replace(tmp_path, cache_path)
+            except Exception:
+                os.remove(tmp_path)
+                raise
+            with self.lock:
+                self.stats.writes += 1
+        except Exception:
+            with self.lock:
+                self.stats.errors += 1
@@ -0,0 +1,358 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from dcm.dcm_core import CompetenceTree, DynamicCompetenceMap, YamlSafeLoader
+from dcm.tree_cache import TreeCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TreeRegistryStats:
+    """
+    counters of a tree registry
+
+    Attributes:
+        indexed (int): number of tree ids found by the index scan
+        hits (int): number of lookups answered by a loaded tree
+        loads (int): number of trees loaded on first access or after eviction
+        evictions (int): number of trees dropped to stay within the memory budget
+        loaded (int): number of trees currently loaded
+        loaded_bytes (int): the definition file size of the trees currently loaded
+        reloads (int): number of loaded trees replaced after their definition changed
+        errors (int): number of changed definitions that could not be loaded
+    """
+
+    indexed: int = 0
+    hits: int = 0
+    loads: int = 0
+    evictions: int = 0
+    loaded: int = 0
+    loaded_bytes: int = 0
+    reloads: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        """
+        get my counters as a dict
+        """
+        return asdict(self)
+
+
+class TreeRegistry(Mapping):
+    """
+    a lazy read-only mapping of tree ids to DynamicCompetenceMaps
+
+    only the tree ids are indexed on construction by scanning the top level
+    keys of the definition files - a tree is loaded on first access and
+    the least recently used trees are evicted when the loaded trees exceed
+    the memory budget
+
+    changed definition files are detected by polling their modification
+    time and size - loaded trees are re-parsed in the background and
+    swapped in atomically and the listeners are notified
+    """
+
+    # a top level key of a YAML mapping
+    top_level_key_pattern = re.compile(r"^([A-Za-z_][\w\-]*)\s*:")
+
+    def __init__(
+        self,
+        examples_path: Optional[str] = None,
+        markup: str = "yaml",
+        tree_cache: Optional[TreeCache] = None,
+        memory_budget: Optional[int] = None,
+    ):
+        """
+        constructor
+
+        Args:
+            examples_path (str): the root directory of the definitions - None for the default examples path
+            markup (str): the markup of the definition files ('json' or 'yaml')
+            tree_cache (TreeCache): optional cache of parsed trees
+            memory_budget (int): the maximum definition file size in bytes of the trees
+                to keep loaded - the file size is used as a cheap proxy for the memory
+                a tree needs - None for no limit - the most recently used tree is always kept
+        """
+        self.examples_path = examples_path
+        self.markup = markup
+        self.tree_cache = tree_cache
+        self._memory_budget = memory_budget
+        self.lock = threading.RLock()
+        self.stats = TreeRegistryStats()
+        # the file path by tree id
+        self.index: Dict[str, str] = {}
+        # the loaded trees by tree id in least recently used order
+        self.loaded = OrderedDict()
+        # the modification time and size by file path at the last scan
+        self.file_states: Dict[str, Tuple[int, int]] = {}
+        # the tree id by file path at the last scan - None for invalid definitions
+        self.file_tree_ids: Dict[str, Optional[str]] = {}
+        # callbacks to be notified with the id of each changed tree
+        self.listeners: List[Callable[[str], None]] = []
+        self.watch_thread: Optional[threading.Thread] = None
+        self.watch_stop = threading.Event()
+        self.scan()
+
+    def add_listener(self, listener: Callable[[str], None]):
+        """
+        add a listener to be called with the tree id of each changed, added or removed tree
+        """
+        self.listeners.append(listener)
+
+    def scan(self) -> List[str]:
+        """
+        (re)build my index of tree ids scanning only the definition files
+        that changed since the last scan - changed trees that are loaded
+        are re-parsed and swapped in
+
+        Returns:
+            List[str]: the ids of the trees that changed, were added or were removed
+        """
+        index = {}
+        file_states = {}
+        file_tree_ids = {}
+        changed_files = []
+        for name, filepath in DynamicCompetenceMap.iter_example_files(
+            self.markup, self.examples_path
+        ):
+            try:
+                stat = os.stat(filepath)
+            except FileNotFoundError:
+                continue
+            file_state = (stat.st_mtime_ns, stat.st_size)
+            file_states[filepath] = file_state
+            if self.file_states.get(filepath) == file_state:
+                tree_id = self.file_tree_ids.get(filepath)
+            else:
+                changed_files.append(filepath)
+                try:
+                    tree_id = self.scan_tree_id(filepath)
+                    if tree_id is None and self.markup == "json":
+                        tree_id = self.load_tree_id(name, filepath)
+                except Exception as ex:
+                    # e.g. a definition that is currently being edited
+                    logger.warning("could not scan %s: %s", filepath, ex)
+                    self.stats.errors += 1
+                    tree_id = self.file_tree_ids.get(filepath)
+            file_tree_ids[filepath] = tree_id
+            if tree_id is not None:
+                index[tree_id] = filepath
+        removed_files = [
+            filepath for filepath in self.file_states if filepath not in file_states
+        ]
+        changed_ids = set()
+        for filepath in changed_files + removed_files:
+            changed_ids.add(self.file_tree_ids.get(filepath))
+            changed_ids.add(file_tree_ids.get(filepath))
+        changed_ids.discard(None)
+        # re-parse the loaded trees outside of the lock
+        reloaded = {}
+        failed = set()
+        for tree_id in changed_ids:
+            if tree_id in self.loaded and tree_id in index:
+                filepath = index[tree_id]
+                dcm = None
+                try:
+                    name = os.path.splitext(os.path.basename(filepath))[0]
+                    dcm = self.load(name, filepath)
+                except Exception as ex:
+                    logger.warning("could not reload %s: %s", filepath, ex)
+                if dcm is not None and dcm.main_id == tree_id:
+                    reloaded[tree_id] = (dcm, os.path.getsize(filepath))
+                else:
+                    self.stats.errors += 1
+                    failed.add(tree_id)
+        with self.lock:
+            self.index = index
+            self.file_states = file_states
+            self.file_tree_ids = file_tree_ids
+            for tree_id in changed_ids:
+                if tree_id in reloaded:
+                    self.unload(tree_id)
+                    dcm, size = reloaded[tree_id]
+                    self.loaded[tree_id] = (dcm, size)
+                    self.stats.loaded = len(self.loaded)
+                    self.stats.loaded_bytes += size
+                    self.stats.reloads += 1
+                elif tree_id in self.loaded and tree_id not in failed:
+                    self.unload(tree_id)
+            self.stats.indexed = len(index)
+            self.evict()
+        for tree_id in sorted(changed_ids):
+            for listener in self.listeners:
+                listener(tree_id)
+        return sorted(changed_ids)
+
+    def watch(self, interval: float):
+        """
+        scan for changed definitions every interval seconds until stopped
+        """
+        while not self.watch_stop.wait(interval):
+            try:
+                self.scan()
+            except Exception as ex:
+                logger.warning("scanning %s failed: %s", self.examples_path, ex)
+
+    def start_watching(self, interval: float = 2.0):
+        """
+        start a background thread polling for changed definitions
+
+        Args:
+            interval (float): the number of seconds between two scans
+        """
+        if self.watch_thread is None:
+            self.watch_stop.clear()
+            self.watch_thread = threading.Thread(
+                target=self.watch, args=(interval,), name="dcm-tree-watch", daemon=True
+            )
+            self.watch_thread.start()
+
+    def stop_watching(self):
+        """
+        stop polling for changed definitions
+        """
+        if self.watch_thread is not None:
+            self.watch_stop.set()
+            self.watch_thread.join()
+            self.watch_thread = None
+
+    def scan_tree_id(self, filepath: str) -> Optional[str]:
+        """
+        get the tree id of the given YAML definition file by scanning its top level keys
+        without parsing the whole file
+
+        Args:
+            filepath (str): the path of the definition file
+
+        Returns:
+            Optional[str]: the tree id - None if the file is not a valid competence tree
+            definition or can not be scanned
+        """
+        if self.markup != "yaml":
+            return None
+        keys = set()
+        tree_id = None
+        with open(filepath, "r") as definition_file:
+            for line in definition_file:
+                match = TreeRegistry.top_level_key_pattern.match(line)
+                if match:
+                    key = match.group(1)
+                    keys.add(key)
+                    if key == "id":
+                        value = yaml.load(line, Loader=YamlSafeLoader)["id"]
+                        if value is not None:
+                            tree_id = str(value)
+        if tree_id is None or not DynamicCompetenceMap.is_valid_definition(
+            keys, CompetenceTree.required_keys()
+        ):
+            return None
+        return tree_id
+
+    def load_tree_id(self, name: str, filepath: str) -> Optional[str]:
+        """
+        get the tree id of the given definition file by loading it
+        """
+        dcm = self.load(name, filepath)
+        tree_id = dcm.main_id if dcm is not None else None
+        return tree_id
+
+    def load(self, name: str, filepath: str) -> Optional[DynamicCompetenceMap]:
+        """
+        load the given definition file
+        """
+        dcm = DynamicCompetenceMap.load_definition_file(
+            name,
+            filepath,
+            content_class=CompetenceTree,
+            markup=self.markup,
+            tree_cache=self.tree_cache,
+        )
+        return dcm
+
+    @property
+    def memory_budget(self) -> Optional[int]:
+        return self._memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, memory_budget: Optional[int]):
+        with self.lock:
+            self._memory_budget = memory_budget
+            self.evict()
+
+    def unload(self, tree_id: str):
+        """
+        drop the given tree from the loaded trees - needs to be called with the lock held
+        """
+        _dcm, size = self.loaded.pop(tree_id)
+        self.stats.loaded = len(self.loaded)
+        self.stats.loaded_bytes -= size
+
+    def evict(self):
+        """
+        evict the least recently used trees until the loaded trees fit my memory budget
+        needs to be called with the lock held
+        """
+        if self._memory_budget is None:
+            return
+        while len(self.loaded) > 1 and self.stats.loaded_bytes > self._memory_budget:
+            tree_id = next(iter(self.loaded))
+            self.unload(tree_id)
+            self.stats.evictions += 1
+
+    def is_loaded(self, tree_id: str) -> bool:
+        """
+        check whether the given tree is loaded so that a lookup does not need to parse it
+        """
+        return tree_id in self.loaded
+
+    def __getitem__(self, tree_id: str) -> DynamicCompetenceMap:
+        with self.lock:
+            if tree_id in self.loaded:
+                self.loaded.move_to_end(tree_id)
+                self.stats.hits += 1
+                dcm, _size = self.loaded[tree_id]
+                return dcm
+            filepath = self.index[tree_id]
+        # parse outside of the lock so that lookups of loaded trees are not blocked
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        dcm = self.load(name, filepath)
+        if dcm is None or dcm.main_id != tree_id:
+            raise KeyError(f"{filepath} does not define competence tree {tree_id}")
+        size = os.path.getsize(filepath)
+        with self.lock:
+            if tree_id in self.loaded:
+                # loaded by a concurrent lookup in the meantime
+                self.loaded.move_to_end(tree_id)
+                self.stats.hits += 1
+                dcm, _size = self.loaded[tree_id]
+                return dcm
+            self.loaded[tree_id] = (dcm, size)
+            self.stats.loads += 1
+            self.stats.loaded = len(self.loaded)
+            self.stats.loaded_bytes += size
+            self.evict()
+        return dcm
+
+    def __contains__(self, tree_id) -> bool:
+        return tree_id in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.index.keys()))
+
+    def __len__(self) -> int:
+        return len(self.index)
@@ -4,6 +4,15 @@ Created on 2023-11-08
 @author: wf
 """
 
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
 from ngwidgets.webserver_test import WebserverTest
 
 from dcm.dcm_cmd import CompetenceCmd
@@ -57,6 +66,56 @@ class TestAPI(WebserverTest):
                 markup_check = MarkupCheck(self, dcm)
                 markup_check.check_markup(svg_content=svg_markup, svg_config=svg_config)
 
+    def test_svg_render_cache(self):
+        """
+        test that repeated render requests are answered from the render cache
+        """
+        name, definition = next(iter(self.example_definitions["yaml"].items()))
+        data = {"name": name, "definition": definition, "markup": "yaml"}
+        svg_markup = self.get_html_for_post("/svg", data)
+        stats_before = self.client.get("/svg/cache").json()
+        cached_markup = self.get_html_for_post("/svg", data)
+        stats_after = self.client.get("/svg/cache").json()
+        self.assertEqual(svg_markup, cached_markup)
+        self.assertEqual(stats_before["hits"] + 1, stats_after["hits"])
+        self.assertEqual(stats_before["misses"], stats_after["misses"])
+
+    def test_svg_batch_render(self):
+        """
+        test rendering a batch of learners
+        """
+        learner_path = f"{DynamicCompetenceMap.examples_path()}/arch_student_123.json"
+        with open(learner_path, "r") as learner_file:
+            learner_dict = json.load(learner_file)
+        learners = []
+        for index in range(3):
+            learner_dict["learner_id"] = f"student_{index}"
+            learners.append(json.dumps(learner_dict))
+        definition = self.example_definitions["yaml"]["architecture"]
+        data = {
+            "name": "architecture",
+            "definition": definition,
+            "markup": "yaml",
+            "learners": learners,
+        }
+        response = self.client.post("/svg/batch", json=data)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/zip", response.headers["content-type"])
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
+            names = sorted(zip_file.namelist())
+            self.assertEqual(["student_0.svg", "student_1.svg", "student_2.svg"], names)
+            dcm = DynamicCompetenceMap.from_definition_string(
+                "architecture", definition, content_class=CompetenceTree, markup="yaml"
+            )
+            for name in names:
+                svg_markup = zip_file.read(name).decode()
+                MarkupCheck(self, dcm).check_markup(svg_content=svg_markup)
+        # duplicate learners are rejected instead of silently collapsed
+        data["learners"] = learners + learners[:1]
+        response = self.client.post("/svg/batch", json=data)
+        self.assertEqual(400, response.status_code)
+        self.assertIn("student_0", response.json()["detail"])
+
     def test_element_description(self):
         """
         Test the element description endpoint
@@ -85,3 +144,142 @@ class TestAPI(WebserverTest):
                 print(f"{path}:\n{html}")
             for expected_content in expected_contents:
                 self.assertIn(expected_content, html)
+
+    def test_description_caching(self):
+        """
+        test the caching headers of the element description endpoint
+        """
+        path = "/description/greta_v2_0_1/ProfessionelleSelbststeuerung"
+        response = self.client.get(path)
+        self.assertEqual(200, response.status_code)
+        etag = response.headers["etag"]
+        self.assertIn("max-age", response.headers["cache-control"])
+        stats_before = self.client.get("/descriptions/stats").json()
+        cached_response = self.client.get(path)
+        stats_after = self.client.get("/descriptions/stats").json()
+        self.assertEqual(response.text, cached_response.text)
+        self.assertEqual(etag, cached_response.headers["etag"])
+        self.assertEqual(stats_before["hits"] + 1, stats_after["hits"])
+        not_modified = self.client.get(path, headers={"If-None-Match": etag})
+        self.assertEqual(304, not_modified.status_code)
+        self.assertEqual(b"", not_modified.content)
+        modified = self.client.get(path, headers={"If-None-Match": '"other"'})
+        self.assertEqual(200, modified.status_code)
+
+    def test_svg_conditional_requests(self):
+        """
+        test that identical render requests give identical markup with
+        an ETag that allows conditional requests
+        """
+        name, definition = next(iter(self.example_definitions["yaml"].items()))
+        data = {"name": name, "definition": definition, "markup": "yaml"}
+        response = self.client.post("/svg", json=data)
+        self.assertEqual(200, response.status_code)
+        etag = response.headers["etag"]
+        self.assertIn("max-age", response.headers["cache-control"])
+        self.assertNotIn(" at ", response.text.split("\n", 1)[0])
+        rerendered = self.client.post("/svg", json=data)
+        self.assertEqual(response.text, rerendered.text)
+        self.assertEqual(etag, rerendered.headers["etag"])
+        not_modified = self.client.post(
+            "/svg", json=data, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(304, not_modified.status_code)
+        # a configuration without an explicit timestamp gives the same markup
+        data["config"] = {"width": 600}
+        configured = self.client.post("/svg", json=data)
+        self.assertEqual(etag, configured.headers["etag"])
+        data["config"] = {"width": 600, "with_timestamp": True}
+        timestamped = self.client.post("/svg", json=data)
+        self.assertIn(" at ", timestamped.text.split("\n", 1)[0])
+
+    def test_compression(self):
+        """
+        test the compression of SVG and description responses
+        """
+        name, definition = next(iter(self.example_definitions["yaml"].items()))
+        data = {"name": name, "definition": definition, "markup": "yaml"}
+        response = self.client.post(
+            "/svg", json=data, headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        gzip_etag = response.headers["etag"]
+        uncompressed = self.client.post(
+            "/svg", json=data, headers={"Accept-Encoding": "identity"}
+        )
+        self.assertNotIn("content-encoding", uncompressed.headers)
+        self.assertEqual(uncompressed.text, response.text)
+        self.assertNotEqual(gzip_etag, uncompressed.headers["etag"])
+        path = "/description/greta_v2_0_1"
+        response = self.client.get(path, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(200, response.status_code)
+        self.assertIn("<h2>GRETA</h2>", response.text)
+
+    def test_metrics(self):
+        """
+        test the Prometheus metrics endpoint
+        """
+        name, definition = next(iter(self.example_definitions["yaml"].items()))
+        data = {"name": name, "definition": definition, "markup": "yaml"}
+        self.client.post("/svg", json=data)
+        self.client.get("/description/architecture")
+        self.client.get("/description/unknown")
+        response = self.client.get("/metrics")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        metrics_text = response.text
+        if self.debug:
+            print(metrics_text)
+        for expected in [
+            "# TYPE dcm_http_requests_total counter",
+            'dcm_http_requests_total{route="/svg/",status="200"}',
+            'dcm_http_requests_total{route="/description/{path}",status="200"}',
+            'dcm_http_requests_total{route="/description/{path}",status="404"}',
+            "# TYPE dcm_http_request_duration_seconds histogram",
+            'dcm_http_request_duration_seconds_bucket{route="/svg/",le="+Inf"}',
+            "dcm_render_cache_hit_ratio ",
+            "dcm_trees_loaded_bytes ",
+            "dcm_assessments_active ",
+            "# TYPE dcm_learner_store_write_duration_seconds histogram",
+        ]:
+            self.assertIn(expected, metrics_text)
+
+    def test_custom_root_path(self):
+        """
+        test that the competence trees of a custom root path are served and reloaded
+        """
+        # hot reload is off by default
+        self.assertEqual(0, self.cmd.parse_args([]).watch_interval)
+        with tempfile.TemporaryDirectory() as root_path:
+            filepath = os.path.join(root_path, "custom.yaml")
+            shutil.copy(
+                os.path.join(DynamicCompetenceMap.examples_path(), "architecture.yaml"),
+                filepath,
+            )
+            ws = DynamicCompentenceMapWebServer()
+            ws.args = self.cmd.parse_args(
+                ["--root_path", root_path, "--watch_interval", "0.01"]
+            )
+            ws.configure_run()
+            self.assertEqual(["architecture"], list(ws.examples))
+            self.assertEqual(filepath, ws.examples.index["architecture"])
+            response = asyncio.run(ws.show_description("architecture"))
+            self.assertEqual(200, response.status_code)
+            dcm = ws.examples["architecture"]
+            with open(filepath) as yaml_file:
+                definition = yaml_file.read()
+            with open(filepath, "w") as yaml_file:
+                yaml_file.write(
+                    definition.replace("name: architecture", "name: changed")
+                )
+            mtime_ns = os.stat(filepath).st_mtime_ns + 1_000_000_000
+            os.utime(filepath, ns=(mtime_ns, mtime_ns))
+            for _i in range(500):
+                if ws.examples.stats.reloads:
+                    break
+                time.sleep(0.01)
+            ws.on_shutdown()
+            reloaded_dcm = ws.examples["architecture"]
+            self.assertIsNot(dcm, reloaded_dcm)
+            self.assertEqual("changed", reloaded_dcm.competence_tree.name)
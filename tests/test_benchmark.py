@@ -0,0 +1,61 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+
+from ngwidgets.basetest import Basetest
+
+from dcm.benchmark import Benchmark, main
+
+
+class TestBenchmark(Basetest):
+    """
+    test the rendering pipeline benchmark
+    """
+
+    def test_benchmark(self):
+        """
+        test benchmarking an example and writing the results
+        """
+        benchmark = Benchmark(
+            repeat=1, text_modes=["empty", "curved"], names=["architecture"]
+        )
+        results = benchmark.run(verbose=self.debug)
+        self.assertEqual(4, len(results))
+        for result in results:
+            self.assertEqual("architecture", result.tree_id)
+            self.assertEqual(Benchmark.stages, list(result.timings.keys()))
+            self.assertGreater(result.total, 0)
+        # the learner's achievements add markup
+        self.assertGreater(results[1].svg_size, results[0].svg_size)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, "benchmark.json")
+            exit_code = main(
+                [
+                    "-r",
+                    "1",
+                    "--text_modes",
+                    "empty",
+                    "--names",
+                    "greta",
+                    "-o",
+                    json_path,
+                    "--comparisons",
+                ]
+            )
+            self.assertEqual(0, exit_code)
+            with open(json_path) as json_file:
+                benchmark_dict = json.load(json_file)
+        self.assertEqual(Benchmark.stages, benchmark_dict["stages"])
+        self.assertEqual(2, len(benchmark_dict["results"]))
+        self.assertEqual("greta", benchmark_dict["results"][0]["name"])
+        comparisons = benchmark_dict["comparisons"]
+        self.assertEqual(
+            ["deepcopy", "replace"], list(comparisons["segment_derivation"].keys())
+        )
+        self.assertEqual(["from_dict", "fast"], list(comparisons["loading"].keys()))
@@ -4,7 +4,9 @@ Created on 2023-11-06
 @author: wf
 """
 
+import io
 import os
+from xml.dom import minidom
 
 from ngwidgets.basetest import Basetest
 
@@ -162,3 +164,199 @@ class TestDynamicCompetenceMap(Basetest):
             dcm.learner = learner
             self.gen_svg_for_dcm(dcm, learner_id, "json")
             pass
+
+    def testBatchLearnerCompetenceMaps(self):
+        """
+        test that the batch generation for many learners gives the same
+        markup as generating the maps one by one
+        """
+        examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        learner_examples = DynamicCompetenceMap.get_examples(content_class=Learner)
+        for learner in learner_examples.values():
+            tree_id = learner.get_competence_tree_ids()[0]
+            dcm = examples.get(tree_id)
+            # a cohort of learners with different achievement levels
+            cohort = []
+            for level in range(1, 4):
+                achievements = [
+                    Achievement(path=achievement.path, level=level)
+                    for achievement in learner.achievements
+                ]
+                cohort.append(
+                    Learner(
+                        learner_id=f"{learner.learner_id}-{level}",
+                        achievements=achievements,
+                    )
+                )
+            for svg_config, text_mode in [
+                (SVGConfig(with_popup=True), "curved"),
+                (SVGConfig(with_popup=True), "empty"),
+                (SVGConfig(with_popup=True, fragment_ids=True), "curved"),
+            ]:
+                dcm_chart = DcmChart(dcm)
+                svg_markups = dcm_chart.generate_svg_markup_batch(
+                    cohort, config=svg_config, text_mode=text_mode
+                )
+                self.assertEqual(len(cohort), len(svg_markups))
+                for cohort_learner in cohort:
+                    expected = DcmChart(dcm).generate_svg_markup(
+                        learner=cohort_learner, config=svg_config, text_mode=text_mode
+                    )
+                    svg_markup = svg_markups[cohort_learner.learner_id]
+                    # ignore the timestamp comment line
+                    self.assertEqual(
+                        expected.split("\n", 1)[1], svg_markup.split("\n", 1)[1]
+                    )
+                    if not svg_config.fragment_ids:
+                        MarkupCheck(self, dcm).check_markup(
+                            svg_content=svg_markup, svg_config=svg_config
+                        )
+            # the pie elements of the tree are generated once for the whole cohort
+            dcm_chart = DcmChart(dcm)
+            element_paths = []
+            generate_element = dcm_chart.generate_donut_segment_for_element
+
+            def count_element(svg, element, learner, segment, ringspec=None):
+                element_paths.append(element.path)
+                return generate_element(svg, element, learner, segment, ringspec)
+
+            dcm_chart.generate_donut_segment_for_element = count_element
+            dcm_chart.generate_svg_markup_batch(cohort, config=svg_config)
+            self.assertEqual(len(set(element_paths)), len(element_paths))
+            with self.assertRaises(ValueError):
+                DcmChart(dcm).generate_svg_markup_batch(cohort + cohort[:1])
+
+    def testStreamingCompetenceMaps(self):
+        """
+        test that streaming the markup gives the same result as
+        generating the markup in memory
+        """
+        for examples in self.example_definitions.values():
+            for dcm in examples.values():
+                svg_config = SVGConfig(with_popup=True)
+                for text_mode in ["curved", "horizontal", "angled", "empty"]:
+                    expected = DcmChart(dcm).generate_svg_markup(
+                        config=svg_config, text_mode=text_mode
+                    )
+                    chunks = list(
+                        DcmChart(dcm).iter_svg_markup(
+                            config=svg_config, text_mode=text_mode
+                        )
+                    )
+                    self.assertTrue(len(chunks) > 1)
+                    stream = io.StringIO()
+                    DcmChart(dcm).write_svg_markup(
+                        stream, config=svg_config, text_mode=text_mode
+                    )
+                    # ignore the timestamp comment line
+                    expected = expected.split("\n", 1)[1]
+                    self.assertEqual(expected, "".join(chunks).split("\n", 1)[1])
+                    self.assertEqual(expected, stream.getvalue().split("\n", 1)[1])
+
+    def testCompactCompetenceMaps(self):
+        """
+        test that the compact mode reduces the size of the markup
+        of the bundled examples while keeping all elements
+        """
+        total_size = 0
+        total_compact_size = 0
+        for examples in self.example_definitions.values():
+            for example_name, dcm in examples.items():
+                for text_mode in ["curved", "angled", "empty"]:
+                    svg_markup = DcmChart(dcm).generate_svg_markup(
+                        config=SVGConfig(with_popup=True), text_mode=text_mode
+                    )
+                    compact_markup = DcmChart(dcm).generate_svg_markup(
+                        config=SVGConfig(with_popup=True, compact=True),
+                        text_mode=text_mode,
+                    )
+                    size = len(svg_markup.encode())
+                    compact_size = len(compact_markup.encode())
+                    if self.debug:
+                        print(f"{example_name} {text_mode}: {size}→{compact_size}")
+                    self.assertLess(compact_size, size, example_name)
+                    total_size += size
+                    total_compact_size += compact_size
+                    # the compact markup must be well formed and complete
+                    svg_doc = minidom.parseString(svg_markup.encode())
+                    compact_doc = minidom.parseString(compact_markup.encode())
+                    for tag in ["path", "text", "circle", "g"]:
+                        self.assertEqual(
+                            len(svg_doc.getElementsByTagName(tag)),
+                            len(compact_doc.getElementsByTagName(tag)),
+                            f"{example_name} {text_mode} {tag}",
+                        )
+                    self.assertNotIn("<!--", compact_markup)
+        # at least a third of the bytes are saved
+        self.assertLess(total_compact_size, total_size * 2 / 3)
+
+    def testRingFragments(self):
+        """
+        test that the incrementally generated fragments of a changed ring
+        are the same as in a full rendering
+        """
+        examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        learner_examples = DynamicCompetenceMap.get_examples(content_class=Learner)
+        for learner_id, learner in learner_examples.items():
+            dcm = examples[learner.get_competence_tree_ids()[0]]
+            ct = dcm.competence_tree
+            config = SVGConfig(with_popup=True, fragment_ids=True)
+            dcm_chart = DcmChart(dcm)
+            svg_markup = dcm_chart.generate_svg_markup(
+                learner=learner, config=config, text_mode="curved"
+            )
+            for level_name in ["aspect", "area"]:
+                ringspec = ct.ring_specs[level_name]
+                ringspec.outer_ratio = ringspec.outer_ratio + 0.05
+                ringspec.levels_visible = True
+                segments = dcm_chart.segments
+                segment_dict = dict(segments[level_name])
+                fragments = dcm_chart.generate_ring_fragments(level_name)
+                # the segments of the previous rendering are not modified
+                self.assertEqual(segment_dict, segments[level_name])
+                self.assertIsNot(segments, dcm_chart.segments)
+                self.assertEqual(
+                    len(ct.elements_by_level[level_name]), len(fragments), learner_id
+                )
+                full_markup = DcmChart(dcm).generate_svg_markup(
+                    learner=learner, config=config, text_mode="curved"
+                )
+                for fragment_id, fragment in fragments.items():
+                    self.assertIn(f'<g id="{fragment_id}">', svg_markup)
+                    self.assertNotIn(fragment, svg_markup)
+                    self.assertIn(fragment, full_markup)
+                svg_markup = full_markup
+
+    def testPathFragments(self):
+        """
+        test that the fragments for a changed achievement and selection
+        are the same as in a full rendering
+        """
+        examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        learner_examples = DynamicCompetenceMap.get_examples(content_class=Learner)
+        for learner_id, learner in learner_examples.items():
+            dcm = examples[learner.get_competence_tree_ids()[0]]
+            config = SVGConfig(with_popup=True, fragment_ids=True)
+            paths = [achievement.path for achievement in learner.achievements]
+            dcm_chart = DcmChart(dcm)
+            dcm_chart.generate_svg_markup(
+                learner=learner, selected_paths=[paths[0]], config=config
+            )
+            # change the level of the selected achievement and select the next one
+            achievement = learner.achievements[0]
+            achievement.level = 1 if achievement.level != 1 else 2
+            fragments = dcm_chart.generate_path_fragments(
+                [achievement.path], selected_paths=[paths[1]]
+            )
+            expected_ids = {DcmChart.get_fragment_id(path) for path in paths[:2]}
+            self.assertEqual(expected_ids, set(fragments.keys()), learner_id)
+            full_markup = DcmChart(dcm).generate_svg_markup(
+                learner=learner, selected_paths=[paths[1]], config=config
+            )
+            for fragment in fragments.values():
+                self.assertIn(fragment, full_markup)
+            # the patched markup of the last rendering is the full markup
+            patched_markup = dcm_chart.patch_svg_markup(fragments)
+            self.assertEqual(
+                full_markup.split("\n", 1)[1], patched_markup.split("\n", 1)[1]
+            )
@@ -0,0 +1,73 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_core import DynamicCompetenceMap
+from dcm.description_cache import DescriptionCache
+
+
+class TestDescriptionCache(Basetest):
+    """
+    test the cache of rendered element descriptions
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        self.competence_tree = examples["architecture"].competence_tree
+
+    def test_memoization(self):
+        """
+        test that descriptions are rendered once until their tree is invalidated
+        """
+        cache = DescriptionCache()
+        aspect = self.competence_tree.aspects[0]
+        html, etag = cache.get(aspect)
+        self.assertEqual(aspect.as_html(), html)
+        self.assertEqual((html, etag), cache.get(aspect))
+        self.assertEqual(1, cache.stats.hits)
+        self.assertEqual(1, cache.stats.misses)
+        cache.invalidate_tree("other")
+        self.assertEqual(1, cache.stats.entries)
+        cache.invalidate_tree(self.competence_tree.id)
+        self.assertEqual(0, cache.stats.entries)
+        self.assertEqual(1, cache.stats.invalidations)
+        cache.get(aspect)
+        self.assertEqual(2, cache.stats.misses)
+
+    def test_lru(self):
+        """
+        test that the least recently used descriptions are evicted
+        """
+        cache = DescriptionCache(max_entries=2)
+        aspects = self.competence_tree.aspects[:3]
+        self.assertIsNone(cache.get(aspects[0], cached_only=True))
+        self.assertEqual(0, cache.stats.misses)
+        for aspect in [aspects[0], aspects[1], aspects[0], aspects[2]]:
+            cache.get(aspect)
+        # aspect 1 is the least recently used one
+        self.assertEqual(1, cache.stats.evictions)
+        self.assertEqual(2, cache.stats.entries)
+        self.assertIsNotNone(cache.get(aspects[0], cached_only=True))
+        self.assertIsNone(cache.get(aspects[1], cached_only=True))
+
+    def test_prerender(self):
+        """
+        test pre-rendering all descriptions of a tree
+        """
+        cache = DescriptionCache()
+        tree_id = self.competence_tree.id
+        self.assertTrue(cache.needs_prerender(tree_id))
+        self.assertFalse(cache.needs_prerender(tree_id))
+        cache.prerender(self.competence_tree)
+        element_count = len(self.competence_tree.elements_by_path)
+        self.assertEqual(element_count, cache.stats.prerendered)
+        for element in self.competence_tree.elements_by_path.values():
+            cache.get(element)
+        self.assertEqual(element_count, cache.stats.hits)
+        cache.invalidate_tree(tree_id)
+        self.assertTrue(cache.needs_prerender(tree_id))
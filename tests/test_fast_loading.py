@@ -0,0 +1,61 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import json
+
+import yaml
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_core import (
+    CompetenceFacet,
+    CompetenceLevel,
+    CompetenceTree,
+    DynamicCompetenceMap,
+)
+
+
+class TestFastLoading(Basetest):
+    """
+    test the fast loading path for competence tree definitions
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.definitions = {}
+        for markup in ["json", "yaml"]:
+            self.definitions[markup] = DynamicCompetenceMap.get_example_dcm_definitions(
+                markup=markup, required_keys=CompetenceTree.required_keys()
+            )
+
+    def test_conversion(self):
+        """
+        test that scalar values are converted like dataclasses_json does
+        """
+        data = {"name": "facet", "id": 1, "time": 2, "max_score": "3", "unknown": 4}
+        facet = CompetenceFacet.from_dict_fast(data)
+        self.assertEqual(CompetenceFacet.from_dict(data), facet)
+        self.assertEqual("1", facet.id)
+        self.assertIsInstance(facet.time, float)
+        level = CompetenceLevel.from_dict_fast({"name": "level", "level": 2.0})
+        self.assertIsInstance(level.level, int)
+
+    def test_fast_loading(self):
+        """
+        test that the fast loading path and the dataclasses_json and
+        pure python yaml path give the same competence trees for all examples
+        """
+        for markup, definitions in self.definitions.items():
+            for name, text in definitions.items():
+                if markup == "yaml":
+                    slow_data = yaml.safe_load(text)
+                else:
+                    slow_data = json.loads(text)
+                slow_tree = CompetenceTree.from_dict(slow_data)
+                fast_data = DynamicCompetenceMap.parse_markup(text, markup)
+                fast_tree = CompetenceTree.from_dict_fast(fast_data)
+                self.assertEqual(slow_data, fast_data, name)
+                self.assertEqual(slow_tree, fast_tree, name)
+                self.assertEqual(slow_tree.to_json(), fast_tree.to_json(), name)
@@ -0,0 +1,80 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from ngwidgets.basetest import Basetest
+
+from dcm.benchmark import Benchmark
+from dcm.dcm_core import CompetenceTree
+from dcm.generator import CompetenceTreeGenerator, GeneratorConfig
+
+
+class TestGenerator(Basetest):
+    """
+    test the synthetic competence tree and learner generator
+    """
+
+    def test_generate_tree(self):
+        """
+        test the fan-out and determinism of generated trees
+        """
+        config = GeneratorConfig(
+            aspects=3, areas_per_aspect=2, facets_per_area=4, levels=4
+        )
+        tree = CompetenceTreeGenerator(config, seed=1).generate_tree("test")
+        self.assertEqual(3, len(tree.elements_by_level["aspect"]))
+        self.assertEqual(6, len(tree.elements_by_level["area"]))
+        self.assertEqual(config.total_facets, len(tree.elements_by_level["facet"]))
+        self.assertEqual(4, len(tree.levels))
+        facet = tree.elements_by_level["facet"][0]
+        self.assertEqual("test/A1/A1_1/F1_1_1", facet.path)
+        self.assertEqual("h", facet.time_unit)
+        self.assertIsNotNone(facet.description)
+        # the same seed gives the same tree
+        same_tree = CompetenceTreeGenerator(config, seed=1).generate_tree("test")
+        self.assertEqual(tree.to_json(), same_tree.to_json())
+        # a generated definition round trips through the regular loading
+        self.assertEqual(
+            tree.to_json(), CompetenceTree.from_json(tree.to_json()).to_json()
+        )
+        large_config = GeneratorConfig.for_facets(10000)
+        self.assertAlmostEqual(10000, large_config.total_facets, delta=500)
+
+    def test_learners_and_xapi(self):
+        """
+        test generated learners and xAPI statement streams
+        """
+        generator = CompetenceTreeGenerator(seed=2)
+        tree = generator.generate_tree()
+        facet_paths = {facet.path for facet in tree.elements_by_level["facet"]}
+        learners = generator.generate_learners(tree, 5, coverage=0.5)
+        self.assertEqual(5, len(learners))
+        self.assertEqual(5, len({learner.learner_id for learner in learners}))
+        for learner in learners:
+            self.assertTrue(learner.achievements)
+            for achievement in learner.achievements:
+                self.assertIn(achievement.path, facet_paths)
+                self.assertIsNotNone(tree.lookup_by_path(achievement.path))
+        xapi = generator.generate_xapi(tree, "learner@example.com", 50)
+        self.assertEqual(50, len(xapi.xapi_dict))
+        learner = xapi.to_learner(tree)
+        self.assertEqual("learner@example.com", learner.learner_id)
+        self.assertEqual(50, len(learner.achievements))
+        for achievement in learner.achievements:
+            self.assertIn(achievement.path, facet_paths)
+            self.assertLessEqual(achievement.level, tree.total_valid_levels)
+
+    def test_scaling_benchmark(self):
+        """
+        test benchmarking synthetic trees of increasing size
+        """
+        benchmark = Benchmark(
+            repeat=1, text_modes=["empty"], with_examples=False, synthetic=[20, 200]
+        )
+        results = benchmark.run(verbose=self.debug)
+        self.assertEqual(4, len(results))
+        self.assertEqual("synthetic_16", results[0].name)
+        self.assertLess(results[0].elements, results[2].elements)
+        self.assertLess(results[0].svg_size, results[2].svg_size)
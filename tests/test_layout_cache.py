@@ -0,0 +1,113 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_chart import DcmChart
+from dcm.dcm_core import DynamicCompetenceMap
+from dcm.svg import SVGConfig
+
+
+class TestLayoutCache(Basetest):
+    """
+    test the memoized segment layouts of competence trees
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.config = SVGConfig(with_timestamp=False)
+
+    def get_dcm(self, tree_id: str = "architecture") -> DynamicCompetenceMap:
+        """
+        get a freshly loaded example
+        """
+        dcm = DynamicCompetenceMap.get_examples(markup="yaml")[tree_id]
+        return dcm
+
+    def test_layout_reuse(self):
+        """
+        test that renderings of the same tree share the layout
+        """
+        dcm = self.get_dcm()
+        tree = dcm.competence_tree
+        chart = DcmChart(dcm)
+        svg_markup = chart.generate_svg_markup(config=self.config)
+        self.assertEqual(1, len(tree.layouts))
+        other_chart = DcmChart(dcm)
+        self.assertEqual(
+            svg_markup, other_chart.generate_svg_markup(config=self.config)
+        )
+        self.assertIs(chart.segments, other_chart.segments)
+        # a changed ring specification gives a new layout
+        tree.ring_specs["area"].outer_ratio *= 0.9
+        changed_markup = DcmChart(dcm).generate_svg_markup(config=self.config)
+        self.assertNotEqual(svg_markup, changed_markup)
+        self.assertEqual(2, len(tree.layouts))
+
+    def test_layout_lru(self):
+        """
+        test that the least recently used layout is evicted
+        """
+        dcm = self.get_dcm()
+        tree = dcm.competence_tree
+        ringspec = tree.ring_specs["area"]
+        outer_ratio = ringspec.outer_ratio
+        keys = []
+        for index in range(DcmChart.max_layouts_per_tree):
+            ringspec.outer_ratio = outer_ratio + index * 0.01
+            chart = DcmChart(dcm)
+            chart.generate_svg_markup(config=self.config)
+            keys.append(chart.get_layout_key(tree))
+        # using the first layout again keeps it when a new layout is added
+        ringspec.outer_ratio = outer_ratio
+        DcmChart(dcm).generate_svg_markup(config=self.config)
+        ringspec.outer_ratio = outer_ratio + 0.5
+        DcmChart(dcm).generate_svg_markup(config=self.config)
+        self.assertEqual(DcmChart.max_layouts_per_tree, len(tree.layouts))
+        self.assertIn(keys[0], tree.layouts)
+        self.assertNotIn(keys[1], tree.layouts)
+
+    def test_layout_invalidation(self):
+        """
+        test that changing the symmetry or the structure invalidates the layouts
+        """
+        dcm = self.get_dcm()
+        tree = dcm.competence_tree
+        DcmChart(dcm).generate_svg_markup(config=self.config)
+        layout_version = tree.layout_version
+        tree.set_symmetry_mode("aspect", "count")
+        self.assertEqual(layout_version + 1, tree.layout_version)
+        self.assertEqual({}, tree.layouts)
+        svg_markup = DcmChart(dcm).generate_svg_markup(config=self.config)
+        fresh_dcm = self.get_dcm()
+        fresh_dcm.competence_tree.set_symmetry_mode("aspect", "count")
+        self.assertEqual(
+            svg_markup, DcmChart(fresh_dcm).generate_svg_markup(config=self.config)
+        )
+        # removing an aspect needs an update of the paths
+        del tree.aspects[-1]
+        tree.update_paths()
+        self.assertEqual({}, tree.layouts)
+        self.assertNotEqual(
+            svg_markup, DcmChart(dcm).generate_svg_markup(config=self.config)
+        )
+
+    def test_ring_fragments_keep_layout(self):
+        """
+        test that regenerating the fragments of a ring does not change the shared layout
+        """
+        dcm = self.get_dcm()
+        tree = dcm.competence_tree
+        config = SVGConfig(with_timestamp=False, fragment_ids=True)
+        chart = DcmChart(dcm)
+        svg_markup = chart.generate_svg_markup(config=config)
+        ringspec = tree.ring_specs["area"]
+        outer_ratio = ringspec.outer_ratio
+        ringspec.outer_ratio = outer_ratio + 0.05
+        chart.generate_ring_fragments("area")
+        ringspec.outer_ratio = outer_ratio
+        # a fresh chart gets the memoized layout of the original ring specification
+        self.assertEqual(svg_markup, DcmChart(dcm).generate_svg_markup(config=config))
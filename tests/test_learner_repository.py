@@ -0,0 +1,130 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import tempfile
+import time
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_core import Achievement, DynamicCompetenceMap, Learner
+from dcm.learner_repository import LearnerRepository, SqliteLearnerRepository
+from dcm.learner_store import LearnerStore
+
+
+class TestLearnerRepository(Basetest):
+    """
+    test the learner repositories
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.learners = DynamicCompetenceMap.get_examples(content_class=Learner)
+
+    def test_sqlite_round_trip(self):
+        """
+        test storing, updating and loading learners in the SQLite repository
+        """
+        with tempfile.TemporaryDirectory() as storage_path:
+            repository = SqliteLearnerRepository(storage_path)
+            for learner in self.learners.values():
+                repository.schedule(learner)
+                loaded_learner = repository.load(learner.file_name)
+                self.assertEqual(learner.to_json(), loaded_learner.to_json())
+            self.assertEqual(len(self.learners), repository.learner_count)
+            learner = next(iter(self.learners.values()))
+            achievement = learner.achievements[1]
+            achievement.level = 5
+            repository.record(learner, achievement)
+            loaded_learner = repository.load(learner.file_name)
+            self.assertEqual(5, loaded_learner.achievements[1].level)
+            self.assertEqual(learner.to_json(), loaded_learner.to_json())
+            with self.assertRaises(FileNotFoundError):
+                repository.load("unknown")
+            # a learner json file added later e.g. by an upload is imported on demand
+            uploaded_learner = Learner(
+                "uploaded", achievements=[Achievement(path=achievement.path, level=2)]
+            )
+            with open(repository.get_file_path(uploaded_learner), "w") as json_file:
+                json_file.write(uploaded_learner.to_json())
+            loaded_learner = repository.load(uploaded_learner.file_name)
+            self.assertEqual(uploaded_learner.to_json(), loaded_learner.to_json())
+            self.assertEqual(len(self.learners) + 1, repository.learner_count)
+            # recording an achievement of an unknown learner is a single write
+            writes = repository.stats.writes
+            new_learner = Learner(
+                "new", achievements=[Achievement(path=achievement.path, level=1)]
+            )
+            repository.record(new_learner, new_learner.achievements[0])
+            self.assertEqual(writes + 1, repository.stats.writes)
+            repository.record(new_learner, new_learner.achievements[0])
+            self.assertEqual(writes + 2, repository.stats.writes)
+            repository.close()
+
+    def test_abstract_repository(self):
+        """
+        test that an incomplete repository can not be instantiated
+        """
+
+        class IncompleteRepository(LearnerRepository):
+            def schedule(self, learner: Learner) -> str:
+                return self.get_file_path(learner)
+
+        with self.assertRaises(TypeError):
+            IncompleteRepository("/tmp")
+
+    def test_find_learners(self):
+        """
+        test that the indexed queries give the same results as scanning json files
+        """
+        with tempfile.TemporaryDirectory() as storage_path:
+            json_store = LearnerStore(storage_path, max_delay=0)
+            sqlite_repository = SqliteLearnerRepository(
+                storage_path, db_path=":memory:"
+            )
+            # a cohort of learners with the achievements of the examples
+            for index in range(100):
+                for learner in self.learners.values():
+                    cohort_learner = Learner(
+                        f"{learner.learner_id}-{index}",
+                        achievements=[
+                            Achievement(
+                                path=achievement.path,
+                                level=(achievement.level + index) % 5,
+                                date_assessed_iso=achievement.date_assessed_iso,
+                            )
+                            for achievement in learner.achievements
+                        ],
+                    )
+                    json_store.schedule(cohort_learner)
+                    sqlite_repository.schedule(cohort_learner)
+            path = "architecture/DandP/ArchDesign"
+            queries = [
+                {"path": path, "min_level": 3},
+                {"tree_id": "greta_v2_0_1"},
+                {"assessed_since": "2023-09-01"},
+                {"path": path, "min_level": 3, "assessed_since": "2024-01-01"},
+            ]
+            for query in queries:
+                start_time = time.perf_counter()
+                expected = json_store.find_learners(**query)
+                scan_time = time.perf_counter() - start_time
+                start_time = time.perf_counter()
+                learner_ids = sqlite_repository.find_learners(**query)
+                query_time = time.perf_counter() - start_time
+                if self.debug:
+                    print(
+                        f"{query}: {len(learner_ids)} learners scan {scan_time*1000:.1f} ms query {query_time*1000:.1f} ms"
+                    )
+                self.assertEqual(expected, learner_ids, query)
+                self.assertLess(query_time, scan_time)
+            self.assertEqual(
+                40, len(sqlite_repository.find_learners(path=path, min_level=3))
+            )
+            # the SQLite repository may import the json files
+            imported_repository = SqliteLearnerRepository(
+                storage_path, db_path=":memory:"
+            )
+            self.assertEqual(200, imported_repository.import_json_files())
@@ -0,0 +1,156 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_core import Achievement, Learner
+from dcm.learner_store import AchievementEvent, LearnerEventLog, LearnerStore
+
+
+class TestLearnerStore(Basetest):
+    """
+    test the background learner store
+    """
+
+    def get_learner(self, learner_id: str) -> Learner:
+        """
+        get a learner with a single achievement
+        """
+        learner = Learner(
+            learner_id, achievements=[Achievement(path="tree/aspect/area", level=1)]
+        )
+        return learner
+
+    def read_level(self, file_path: str) -> int:
+        """
+        read the level of the first achievement from the given learner file
+        """
+        with open(file_path) as json_file:
+            learner_record = json.load(json_file)
+        level = learner_record["achievements"][0]["level"]
+        return level
+
+    def test_coalescing(self):
+        """
+        test that changes of a learner are coalesced into a single delayed write
+        """
+        with tempfile.TemporaryDirectory() as storage_path:
+            store = LearnerStore(storage_path, max_delay=0.2)
+            write_durations = []
+            store.write_observer = write_durations.append
+            learner = self.get_learner("learner-1")
+            for level in range(1, 6):
+                learner.achievements[0].level = level
+                file_path = store.schedule(learner)
+            self.assertFalse(os.path.exists(file_path))
+            self.assertEqual(4, store.stats.coalesced)
+            deadline = time.monotonic() + 5
+            while not os.path.exists(file_path) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self.assertEqual(5, self.read_level(file_path))
+            # the write is counted after the file has been replaced
+            store.close()
+            self.assertEqual(1, store.stats.writes)
+            self.assertEqual(1, len(write_durations))
+            self.assertAlmostEqual(write_durations[0], store.stats.write_seconds)
+            # no temporary files are left behind
+            self.assertEqual(["learner-1.json"], os.listdir(storage_path))
+
+    def test_flush_and_close(self):
+        """
+        test that flush and close write pending learners immediately
+        """
+        with tempfile.TemporaryDirectory() as storage_path:
+            store = LearnerStore(storage_path, max_delay=60)
+            learners = [self.get_learner(f"learner-{i}") for i in range(3)]
+            for learner in learners:
+                store.schedule(learner)
+            store.flush(learners[0])
+            self.assertTrue(os.path.exists(store.get_file_path(learners[0])))
+            self.assertEqual(2, store.stats.pending)
+            store.close()
+            for learner in learners:
+                self.assertEqual(1, self.read_level(store.get_file_path(learner)))
+            self.assertEqual(0, store.stats.pending)
+            self.assertEqual(3, store.stats.writes)
+
+    def test_load_and_snapshot(self):
+        """
+        test that loading a learner only writes its own pending change and
+        that the pending change is the state at the time of scheduling
+        """
+        with tempfile.TemporaryDirectory() as storage_path:
+            store = LearnerStore(storage_path, max_delay=60)
+            learners = [self.get_learner(f"learner-{i}") for i in range(5)]
+            for learner in learners:
+                learner.achievements[0].level = 3
+                store.schedule(learner)
+            # changes after scheduling are not written without scheduling them
+            learners[0].achievements[0].level = 4
+            loaded_learner = store.load(learners[0].file_name)
+            self.assertEqual(3, loaded_learner.achievements[0].level)
+            self.assertEqual(1, store.stats.writes)
+            self.assertEqual(4, store.stats.pending)
+            store.close()
+            self.assertEqual(5, store.stats.writes)
+            self.assertEqual(3, self.read_level(store.get_file_path(learners[1])))
+
+    def test_write_error(self):
+        """
+        test that a failing background write is logged
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # a storage directory that does not exist
+            storage_path = os.path.join(tmp_dir, "learners")
+            store = LearnerStore(storage_path, max_delay=0.01)
+            with self.assertLogs("dcm.learner_store", level="ERROR"):
+                store.schedule(self.get_learner("learner-1"))
+                store.close()
+            self.assertEqual(0, store.stats.writes)
+
+    def test_event_log(self):
+        """
+        test appending achievement events, replaying and compacting them
+        """
+        with tempfile.TemporaryDirectory() as storage_path:
+            event_log = LearnerEventLog(storage_path, compaction_threshold=5)
+            learner = self.get_learner("learner-1")
+            achievement = learner.achievements[0]
+            file_path = event_log.schedule(learner)
+            self.assertEqual(1, self.read_level(file_path))
+            for level in [2, 3, None, 4]:
+                achievement.level = level
+                event_log.record(learner, achievement)
+            # the snapshot is unchanged but loading replays the events
+            self.assertEqual(1, self.read_level(file_path))
+            log_path = event_log.get_log_path(learner.file_name)
+            with open(log_path) as log_file:
+                self.assertEqual(4, len(log_file.readlines()))
+            loaded_learner = event_log.load(learner.file_name)
+            self.assertEqual(4, loaded_learner.achievements[0].level)
+            # an event for a new path adds an achievement
+            new_achievement = Achievement(path="tree/aspect/other", level=2)
+            learner.add_achievement(new_achievement)
+            event_log.record(learner, new_achievement)
+            # the fifth event triggers the compaction
+            self.assertFalse(os.path.exists(log_path))
+            loaded_learner = event_log.load(learner.file_name)
+            self.assertEqual(2, len(loaded_learner.achievements))
+            self.assertEqual(
+                2, loaded_learner.achievements_by_path["tree/aspect/other"].level
+            )
+            with open(event_log.get_audit_path(learner.file_name)) as audit_file:
+                audit_events = [AchievementEvent.from_line(line) for line in audit_file]
+            self.assertEqual(
+                [2, 3, None, 4, 2], [event.level for event in audit_events]
+            )
+            with self.assertRaises(FileNotFoundError):
+                event_log.load("unknown")
@@ -0,0 +1,49 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from ngwidgets.basetest import Basetest
+
+from dcm.metrics import Counter, Histogram, Sample, get_metrics_text
+
+
+class TestMetrics(Basetest):
+    """
+    test the Prometheus text exposition of the metrics
+    """
+
+    def test_metrics_text(self):
+        """
+        test counters, samples and histograms
+        """
+        counter = Counter("requests_total", "number of requests", ("route", "status"))
+        counter.inc("/svg/", "200")
+        counter.inc("/svg/", "200")
+        counter.inc('/a"b', "404")
+        histogram = Histogram(
+            "latency_seconds", "latencies", ("route",), buckets=[0.1, 1.0]
+        )
+        for value in [0.05, 0.1, 0.5, 2.0]:
+            histogram.observe(value, "/svg/")
+        sample = Sample("ratio", "a ratio", 0.5)
+        metrics_text = get_metrics_text([counter, histogram, sample])
+        if self.debug:
+            print(metrics_text)
+        expected = """# HELP requests_total number of requests
+# TYPE requests_total counter
+requests_total{route="/a\\"b",status="404"} 1
+requests_total{route="/svg/",status="200"} 2
+# HELP latency_seconds latencies
+# TYPE latency_seconds histogram
+latency_seconds_bucket{route="/svg/",le="0.1"} 2
+latency_seconds_bucket{route="/svg/",le="1.0"} 3
+latency_seconds_bucket{route="/svg/",le="+Inf"} 4
+latency_seconds_sum{route="/svg/"} 2.65
+latency_seconds_count{route="/svg/"} 4
+# HELP ratio a ratio
+# TYPE ratio gauge
+ratio 0.5
+"""
+        self.assertEqual(expected, metrics_text)
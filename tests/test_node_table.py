@@ -0,0 +1,96 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_chart import DcmChart
+from dcm.dcm_core import Achievement, DynamicCompetenceMap, Learner
+from dcm.svg import DonutSegment
+
+
+class TestNodeTable(Basetest):
+    """
+    test the integer indexed node table of competence trees
+    """
+
+    def test_node_table(self):
+        """
+        test the parents, levels and child ranges of all examples
+        """
+        examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        for tree_id, dcm in examples.items():
+            tree = dcm.competence_tree
+            table = tree.node_table
+            self.assertEqual(len(tree.elements_by_path), len(table))
+            self.assertIs(tree, table.elements[0])
+            self.assertEqual(-1, table.parents[0])
+            self.assertEqual(tree.aspects, table.get_children(0))
+            for index, element in enumerate(table.elements):
+                self.assertEqual(index, element.node_index)
+                level = table.levels[index]
+                self.assertIn(element, tree.elements_by_level[tree.level_names[level]])
+                if level < 3:
+                    children = getattr(element, tree.level_attr_names[level + 1])
+                    self.assertEqual(children, table.get_children(index), tree_id)
+                if index > 0:
+                    self.assertEqual(
+                        "/".join(element.path.split("/")[:-1]),
+                        table.get_parent(element).path,
+                    )
+
+    def test_parent_segments(self):
+        """
+        test that the parent segments do not depend on how the parents are found
+        """
+        dcm = DynamicCompetenceMap.get_examples(markup="yaml")["greta_v2_0_1"]
+        tree = dcm.competence_tree
+        chart = DcmChart(dcm)
+        chart.generate_svg_markup()
+        tree_segment = DonutSegment(cx=300, cy=300, inner_radius=0, outer_radius=100)
+        segments = chart.calculate_sub_segments(
+            tree,
+            tree_segment,
+            "facet",
+            "count",
+            tree.elements_by_level["facet"],
+        )
+        ringspec = tree.ring_specs["area"]
+        by_table = chart.calculate_parent_segments(segments, ringspec, tree)
+        by_split = chart.calculate_parent_segments(segments, ringspec)
+        self.assertEqual(by_split, by_table)
+        self.assertEqual(len(tree.elements_by_level["area"]), len(by_table))
+
+    def test_achievement_path_parts(self):
+        """
+        test the cached path parts of achievements
+        """
+        achievement = Achievement(path="tree/aspect/area/facet", level=1)
+        self.assertEqual("tree", achievement.tree_id)
+        self.assertEqual("facet", achievement.facet_id)
+        self.assertIs(achievement.path_parts, achievement.path_parts)
+        achievement.path = "other/aspect"
+        self.assertEqual("other", achievement.tree_id)
+        self.assertIsNone(achievement.area_id)
+        # the cache is not part of the serialization
+        self.assertNotIn("_path_parts", achievement.to_json())
+
+    def test_achievement_resolve(self):
+        """
+        test resolving the path of achievements via the node table
+        """
+        examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        tree = examples["greta_v2_0_1"].competence_tree
+        facet = tree.elements_by_level["facet"][0]
+        achievement = Achievement(path=facet.path, level=1)
+        self.assertIs(facet, achievement.resolve(tree))
+        self.assertEqual(facet.path.split("/"), achievement.path_parts)
+        self.assertEqual(facet.id, achievement.facet_id)
+        self.assertEqual(facet.area.id, achievement.area_id)
+        unknown = Achievement(path=f"{tree.id}/unknown", level=1)
+        self.assertIsNone(unknown.resolve(tree))
+        self.assertEqual("unknown", unknown.aspect_id)
+        learner = Learner("learner", achievements=[achievement, unknown])
+        self.assertEqual(1, learner.resolve_achievements(tree))
@@ -0,0 +1,172 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import time
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_chart import DcmChart
+from dcm.dcm_core import DynamicCompetenceMap
+from dcm.render_cache import (
+    RenderCache,
+    choose_encoding,
+    compress,
+    get_encodings,
+    get_etag,
+)
+from dcm.svg import SVGConfig
+
+
+class TestRenderCache(Basetest):
+    """
+    test the SVG render cache
+    """
+
+    def test_key(self):
+        """
+        test that the key depends on definition and all render options
+        """
+        definition = "name: test"
+        key = RenderCache.get_key(definition, "yaml", "empty", None)
+        self.assertEqual(key, RenderCache.get_key(definition, "yaml", "empty", None))
+        other_keys = [
+            RenderCache.get_key("name: other", "yaml", "empty", None),
+            RenderCache.get_key(definition, "json", "empty", None),
+            RenderCache.get_key(definition, "yaml", "curved", None),
+            RenderCache.get_key(definition, "yaml", "empty", SVGConfig(width=666)),
+        ]
+        self.assertEqual(len(other_keys), len(set(other_keys)))
+        self.assertNotIn(key, other_keys)
+
+    def test_lru(self):
+        """
+        test the least recently used eviction and the counters
+        """
+        cache = RenderCache(max_entries=2)
+        renders = []
+
+        def render(name: str):
+            renders.append(name)
+            return f"<svg>{name}</svg>"
+
+        for name in ["a", "b", "a", "c", "b", "a"]:
+            svg_markup = cache.get_or_render(name, lambda: render(name))
+            self.assertEqual(f"<svg>{name}</svg>", svg_markup)
+        # a,b miss - a hit - c miss evicts b - b miss evicts a - a miss evicts c
+        self.assertEqual(["a", "b", "c", "b", "a"], renders)
+        stats = cache.stats
+        self.assertEqual(1, stats.hits)
+        self.assertEqual(5, stats.misses)
+        self.assertEqual(3, stats.evictions)
+        self.assertEqual(2, stats.entries)
+        self.assertAlmostEqual(1 / 6, stats.as_dict()["hit_ratio"])
+
+    def test_disk_tier(self):
+        """
+        test the on-disk tier
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = RenderCache(max_entries=1, cache_dir=cache_dir)
+            etag = cache.put("a", "<svg>a</svg>")
+            self.assertEqual(get_etag("<svg>a</svg>"), etag)
+            cache.put("b", "<svg>b</svg>")
+            # the entity tag is kept with the entry
+            self.assertEqual(
+                ("<svg>b</svg>", get_etag("<svg>b</svg>")), cache.get_entry("b")
+            )
+            # a has been evicted from memory but is still on disk
+            self.assertIsNone(cache.get_entry("a", memory_only=True))
+            self.assertEqual(0, cache.stats.misses)
+            self.assertEqual(("<svg>a</svg>", etag), cache.get_entry("a"))
+            self.assertEqual(1, cache.stats.disk_hits)
+            # a fresh cache on the same directory is warm
+            warm_cache = RenderCache(max_entries=1, cache_dir=cache_dir)
+            self.assertEqual("<svg>b</svg>", warm_cache.get("b"))
+            self.assertIsNone(warm_cache.get("c"))
+            self.assertEqual(1, warm_cache.stats.misses)
+
+    def test_disk_tier_errors(self):
+        """
+        test that failing writes of the on-disk tier are counted and the markup is served from memory
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = os.path.join(tmp_dir, "cache")
+            cache = RenderCache(max_entries=1, cache_dir=cache_dir, svgz=True)
+            # the directory vanishes e.g. because the disk was cleaned up
+            shutil.rmtree(cache_dir)
+            cache.put("a", "<svg>a</svg>")
+            self.assertEqual(1, cache.stats.disk_errors)
+            self.assertEqual("<svg>a</svg>", cache.get("a"))
+            self.assertEqual(1, cache.stats.hits)
+
+    def test_choose_encoding(self):
+        """
+        test the content negotiation of the compression
+        """
+        self.assertIsNone(choose_encoding(None))
+        self.assertIsNone(choose_encoding("identity"))
+        self.assertIsNone(choose_encoding("gzip;q=0"))
+        self.assertEqual("gzip", choose_encoding("gzip, deflate"))
+        self.assertEqual("gzip", choose_encoding("deflate, gzip;q=0.5"))
+        self.assertEqual(get_encodings()[0], choose_encoding("*"))
+        self.assertEqual(get_encodings()[0], choose_encoding("gzip, br"))
+
+    def test_svgz(self):
+        """
+        test the precomputed .svgz files of the on-disk tier
+        """
+        svg_markup = "<svg>" + "<text>a</text>" * 100 + "</svg>"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = RenderCache(max_entries=1, cache_dir=cache_dir, svgz=True)
+            cache.put("a", svg_markup)
+            svgz_path = os.path.join(cache_dir, "a.svgz")
+            self.assertTrue(os.path.isfile(svgz_path))
+            warm_cache = RenderCache(max_entries=1, cache_dir=cache_dir, svgz=True)
+            self.assertIsNone(
+                warm_cache.get_compressed("a", svg_markup, "gzip", memory_only=True)
+            )
+            compressed = warm_cache.get_compressed("a", svg_markup, "gzip")
+            self.assertEqual(svg_markup, gzip.decompress(compressed).decode())
+            self.assertEqual(1, warm_cache.stats.compressed_hits)
+            self.assertEqual(0, warm_cache.stats.compressions)
+            # memory tier
+            self.assertEqual(
+                compressed, warm_cache.get_compressed("a", svg_markup, "gzip")
+            )
+            self.assertEqual(2, warm_cache.stats.compressed_hits)
+
+    def test_compression_benchmark(self):
+        """
+        benchmark size and latency of the compression of the examples
+        """
+        examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        total_size = 0
+        total_compressed = {encoding: 0 for encoding in get_encodings()}
+        for tree_id, dcm in examples.items():
+            svg_markup = DcmChart(dcm).generate_svg_markup(
+                config=SVGConfig(with_popup=True), text_mode="curved"
+            )
+            size = len(svg_markup.encode())
+            total_size += size
+            for encoding in get_encodings():
+                start_time = time.perf_counter()
+                compressed = compress(svg_markup, encoding)
+                elapsed = time.perf_counter() - start_time
+                total_compressed[encoding] += len(compressed)
+                if self.debug:
+                    print(
+                        f"{tree_id} {encoding}: {size} -> {len(compressed)} bytes "
+                        f"({len(compressed)/size:.1%}) in {elapsed*1000:.1f} ms"
+                    )
+        for encoding, compressed_size in total_compressed.items():
+            if self.debug:
+                print(f"{encoding}: {total_size} -> {compressed_size} bytes")
+            # repetitive svg markup compresses well
+            self.assertLess(compressed_size, total_size / 4)
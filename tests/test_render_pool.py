@@ -0,0 +1,77 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import asyncio
+import threading
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_core import CompetenceTree, DynamicCompetenceMap
+from dcm.render_pool import RenderPool, RenderPoolSaturated, render_svg_markup
+
+
+class TestRenderPool(Basetest):
+    """
+    test rendering in a worker pool
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.definitions = DynamicCompetenceMap.get_example_dcm_definitions(
+            markup="yaml", required_keys=CompetenceTree.required_keys()
+        )
+
+    def strip_timestamp(self, svg_markup: str) -> str:
+        """
+        remove the generated at comment line
+        """
+        return svg_markup.split("\n", 1)[1]
+
+    def test_render_modes(self):
+        """
+        test that all render modes give the same markup
+        """
+        name, definition = next(iter(self.definitions.items()))
+        expected = self.strip_timestamp(
+            render_svg_markup(name, definition, "yaml", "curved")
+        )
+        for mode in RenderPool.modes:
+            pool = RenderPool(mode=mode, max_workers=2)
+            try:
+                svg_markup = asyncio.run(
+                    pool.run(render_svg_markup, name, definition, "yaml", "curved")
+                )
+            finally:
+                pool.shutdown()
+            self.assertEqual(expected, self.strip_timestamp(svg_markup), mode)
+            self.assertEqual(0, pool.pending)
+
+    def test_back_pressure(self):
+        """
+        test that a saturated pool refuses further work
+        """
+        release = threading.Event()
+
+        def blocked_render() -> str:
+            release.wait(timeout=5)
+            return "<svg/>"
+
+        async def run_jobs():
+            pool = RenderPool(mode="thread", max_workers=1, max_queue=1)
+            jobs = [asyncio.create_task(pool.run(blocked_render)) for _i in range(2)]
+            # let the jobs get submitted
+            await asyncio.sleep(0.05)
+            self.assertTrue(pool.saturated)
+            with self.assertRaises(RenderPoolSaturated):
+                await pool.run(blocked_render)
+            release.set()
+            results = await asyncio.gather(*jobs)
+            self.assertFalse(pool.saturated)
+            pool.shutdown()
+            return results
+
+        results = asyncio.run(run_jobs())
+        self.assertEqual(["<svg/>", "<svg/>"], results)
@@ -0,0 +1,85 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_chart import DcmChart
+from dcm.dcm_core import DynamicCompetenceMap
+from dcm.render_pool import render_svg_markup, render_svg_markup_timed
+from dcm.stage_timer import NULL_TIMER, RecordingStageTimer, StageTimingStats
+from dcm.svg import SVGConfig
+
+
+class TestStageTimer(Basetest):
+    """
+    test the rendering stage instrumentation hooks
+    """
+
+    def test_stage_timer(self):
+        """
+        test recording the stages of a rendering
+        """
+        dcm = DynamicCompetenceMap.get_examples(markup="yaml")["architecture"]
+        config = SVGConfig(with_timestamp=False)
+        self.assertFalse(NULL_TIMER.enabled)
+        with NULL_TIMER.stage("test"):
+            pass
+        stage_names = []
+        timer = RecordingStageTimer(lambda name, _seconds: stage_names.append(name))
+        timed_svg_markup = DcmChart(dcm, timer=timer).generate_svg_markup(
+            config=config, text_mode="curved"
+        )
+        svg_markup = DcmChart(dcm).generate_svg_markup(
+            config=config, text_mode="curved"
+        )
+        # instrumentation does not change the markup
+        self.assertEqual(svg_markup, timed_svg_markup)
+        for stage in [
+            "calculate_ring_specs",
+            "inner_circle",
+            "calculate_segments",
+            "pie_elements",
+            "text",
+            "legend",
+            "markup",
+        ]:
+            self.assertIn(stage, timer.timings)
+            self.assertIn(stage, stage_names)
+        # text placement is part of the pie elements stage
+        self.assertLessEqual(timer.timings["text"], timer.timings["pie_elements"])
+        self.assertEqual(len(svg_markup.encode()), timer.counts["bytes"])
+        self.assertEqual(
+            len(dcm.competence_tree.elements_by_path), timer.counts["elements"]
+        )
+        self.assertGreater(timer.counts["segments"], 0)
+
+    def test_stage_timing_stats(self):
+        """
+        test aggregating the timings of several renderings
+        """
+        filepath = os.path.join(DynamicCompetenceMap.examples_path(), "greta.yaml")
+        with open(filepath) as yaml_file:
+            definition = yaml_file.read()
+        config = SVGConfig(with_timestamp=False)
+        stats = StageTimingStats()
+        for _i in range(2):
+            svg_markup, timer_dict = render_svg_markup_timed(
+                "greta", definition, "yaml", config=config
+            )
+            stats.add(timer_dict["timings"], timer_dict["counts"])
+        self.assertEqual(
+            render_svg_markup("greta", definition, "yaml", config=config), svg_markup
+        )
+        stats_dict = stats.as_dict()
+        if self.debug:
+            print(stats_dict)
+        self.assertEqual(2, stats_dict["renderings"])
+        parse_stats = stats_dict["stages"]["parse"]
+        self.assertEqual(2, parse_stats["count"])
+        self.assertGreaterEqual(parse_stats["max"], parse_stats["mean"])
+        self.assertEqual(2 * len(svg_markup.encode()), stats_dict["counts"]["bytes"])
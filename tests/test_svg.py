@@ -4,12 +4,23 @@ Created on 2024-01-18
 @author: wf
 """
 
+import dataclasses
+import io
+import math
 import os
 from typing import Tuple
 
 from ngwidgets.basetest import Basetest
 
-from dcm.svg import SVG, Arc, DonutSegment, SVGNodeConfig
+from dcm.svg import (
+    SVG,
+    AngleTable,
+    Arc,
+    DonutSegment,
+    SVGConfig,
+    SVGNodeConfig,
+    format_number,
+)
 
 
 class TestSVG(Basetest):
@@ -71,6 +82,36 @@ class TestSVG(Basetest):
             print(svg_markup)
         self.save(svg, "multiline_svg_text.svg")
 
+    def test_streaming(self):
+        """
+        test that streaming mode gives the same markup as
+        accumulating the elements
+        """
+
+        def add_elements(svg: SVG):
+            svg.add_text(x=100, y=100, text="line 1\nline 2")
+            svg.add_rectangle(10, 10, 30, 20, fill="#FF0000")
+            svg.add_donut_segment(
+                SVGNodeConfig(id="segment", title="a segment", comment="comment"),
+                DonutSegment(
+                    cx=150, cy=150, inner_radius=50, outer_radius=100, end_angle=90
+                ),
+            )
+
+        svg = SVG()
+        add_elements(svg)
+        expected = svg.get_svg_markup(with_java_script=True).split("\n", 1)[1]
+        stream = io.StringIO()
+        svg.write_svg_markup(stream, with_java_script=True)
+        self.assertEqual(expected, stream.getvalue().split("\n", 1)[1])
+        streaming_svg = SVG()
+        stream = io.StringIO()
+        streaming_svg.start_stream(stream, with_java_script=True)
+        add_elements(streaming_svg)
+        streaming_svg.end_stream()
+        self.assertEqual([], streaming_svg.elements)
+        self.assertEqual(expected, stream.getvalue().split("\n", 1)[1])
+
     def test_get_donut_path(self):
         """
         Test the get_donut_path method to ensure it returns the correct
@@ -201,3 +242,107 @@ class TestSVG(Basetest):
             if debug:
                 svg_markup = svg.get_svg_markup()
                 print(svg_markup)
+
+    def test_segment_replace(self):
+        """
+        test deriving segments and node configs as immutable value objects
+        """
+        segment = DonutSegment(
+            cx=300.0,
+            cy=300.0,
+            inner_radius=100.0,
+            outer_radius=150.0,
+            start_angle=0.0,
+            end_angle=45.0,
+            text_mode="curved",
+        )
+        config = SVGNodeConfig(
+            x=300.0,
+            y=300.0,
+            fill="#C0C0C0",
+            title="Facet",
+            comment="CompetenceFacet:" + "description " * 20,
+            url="http://example.com/description/tree/aspect/area/facet",
+        )
+        stacked_segment = segment.replace(outer_radius=125.0)
+        self.assertEqual(125.0, stacked_segment.outer_radius)
+        self.assertEqual(150.0, segment.outer_radius)
+        self.assertIsInstance(stacked_segment, DonutSegment)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            segment.outer_radius = 125.0
+        stacked_config = config.replace(fill="#00FF00")
+        self.assertEqual("#00FF00", stacked_config.fill)
+        self.assertEqual("#C0C0C0", config.fill)
+        self.assertEqual(config.url, stacked_config.url)
+
+    def test_angle_table(self):
+        """
+        test that precomputed unit vectors give the same geometry
+        as the direct trigonometric calculation
+        """
+        angle_table = AngleTable()
+        segments = []
+        for i in range(12):
+            segment = DonutSegment(
+                start_angle=i * 30,
+                end_angle=i * 30 + 30,
+                inner_radius=50,
+                outer_radius=100,
+                cx=150,
+                cy=150,
+            )
+            segments.append(segment)
+        angle_table.precompute_segments(segments)
+        # 12 start/end angles in 0..360 and 12 middle angles
+        self.assertEqual(25, len(angle_table))
+        for angle, (cos, sin) in angle_table.unit_vectors.items():
+            self.assertEqual(math.cos(math.radians(angle)), cos)
+            self.assertEqual(math.sin(math.radians(angle)), sin)
+        for segment in segments:
+            for offset in [0.0, 0.5, 1.0]:
+                self.assertEqual(
+                    segment.get_arc(offset),
+                    segment.get_arc(offset, angle_table=angle_table),
+                )
+        # angles that have not been precomputed are added on demand
+        angle_table.unit_vector(7.5)
+        self.assertEqual(26, len(angle_table))
+
+    def test_compact(self):
+        """
+        test the compact number formatting and path minification
+        """
+        self.assertEqual("300", format_number(300.00000000000006, 2))
+        self.assertEqual("412.35", format_number(412.3456789012, 2))
+        self.assertEqual("0", format_number(-0.0001, 2))
+        self.assertEqual("-12.5", format_number(-12.5, 3))
+        segment = DonutSegment(
+            start_angle=0,
+            end_angle=90,
+            inner_radius=50,
+            outer_radius=100,
+            cx=150,
+            cy=150,
+        )
+        svg = SVG(SVGConfig(compact=True))
+        path = svg.get_donut_path(segment)
+        self.assertEqual(
+            "M200 150l50 0a100 100 0 0 1 -100 100l0 -50a50 50 0 0 0 50 -50z", path
+        )
+        middle_path = svg.get_donut_path(segment, middle_arc=True)
+        self.assertEqual("M225 150a75 75 0 0 1 -75 75", middle_path)
+
+    def test_timestamp(self):
+        """
+        test that markup without timestamp is deterministic
+        """
+        with_timestamp = SVG(SVGConfig()).get_svg_prolog()
+        self.assertRegex(with_timestamp.split("\n")[0], r" at \d{4}-\d{2}-\d{2} ")
+        svg = SVG(SVGConfig(with_timestamp=False))
+        prolog = svg.get_svg_prolog()
+        self.assertTrue(
+            prolog.startswith(
+                "<!-- generated by dcm https://github.com/WolfgangFahl/dcm -->\n"
+            )
+        )
+        self.assertEqual(prolog, SVG(SVGConfig(with_timestamp=False)).get_svg_prolog())
@@ -0,0 +1,69 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+import tempfile
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_core import CompetenceTree, DynamicCompetenceMap, Learner
+from dcm.tree_cache import TreeCache
+
+
+class TestTreeCache(Basetest):
+    """
+    test the cache of parsed competence trees
+    """
+
+    def test_warm_start(self):
+        """
+        test that a warm start loads the same examples from the cache
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for content_class, markup in [(CompetenceTree, "yaml"), (Learner, "json")]:
+                tree_cache = TreeCache(cache_dir)
+                cold = DynamicCompetenceMap.get_examples(
+                    content_class, markup, tree_cache=tree_cache
+                )
+                self.assertEqual(0, tree_cache.stats.hits)
+                warm = DynamicCompetenceMap.get_examples(
+                    content_class, markup, tree_cache=tree_cache
+                )
+                # invalid definitions are cached as well
+                self.assertEqual(tree_cache.stats.misses, tree_cache.stats.hits)
+                self.assertEqual(0, tree_cache.stats.errors)
+                self.assertEqual(sorted(cold.keys()), sorted(warm.keys()))
+                for example_id, example in cold.items():
+                    warm_example = warm[example_id]
+                    if content_class is CompetenceTree:
+                        example = example.competence_tree
+                        warm_example = warm_example.competence_tree
+                        for aspect in warm_example.aspects:
+                            self.assertIs(warm_example, aspect.competence_tree)
+                    self.assertEqual(example.to_json(), warm_example.to_json())
+
+    def test_invalidation(self):
+        """
+        test that a changed file is not loaded from the cache
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            tree_cache = TreeCache(cache_dir)
+            file_path = os.path.join(cache_dir, "tree.yaml")
+            with open(file_path, "w") as yaml_file:
+                yaml_file.write("name: tree\n")
+            hit, _value = tree_cache.get(file_path, CompetenceTree)
+            self.assertFalse(hit)
+            tree_cache.put(file_path, CompetenceTree, "tree")
+            hit, value = tree_cache.get(file_path, CompetenceTree)
+            self.assertTrue(hit)
+            self.assertEqual("tree", value)
+            # the cache entries are per content class
+            hit, _value = tree_cache.get(file_path, Learner)
+            self.assertFalse(hit)
+            with open(file_path, "w") as yaml_file:
+                yaml_file.write("name: changed tree\n")
+            hit, _value = tree_cache.get(file_path, CompetenceTree)
+            self.assertFalse(hit)
@@ -0,0 +1,121 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from ngwidgets.basetest import Basetest
+
+from dcm.dcm_core import DynamicCompetenceMap
+from dcm.tree_registry import TreeRegistry
+
+
+class TestTreeRegistry(Basetest):
+    """
+    test the lazy competence tree registry
+    """
+
+    def test_lazy_loading(self):
+        """
+        test that the registry indexes the same trees as the eager
+        loading but only loads them on first access
+        """
+        examples = DynamicCompetenceMap.get_examples(markup="yaml")
+        registry = TreeRegistry(markup="yaml")
+        self.assertEqual(sorted(examples.keys()), sorted(registry.keys()))
+        self.assertEqual(0, registry.stats.loads)
+        self.assertNotIn("unknown", registry)
+        with self.assertRaises(KeyError):
+            registry["unknown"]
+        tree_id = "architecture"
+        self.assertIn(tree_id, registry)
+        dcm = registry[tree_id]
+        self.assertIs(dcm, registry[tree_id])
+        self.assertEqual(1, registry.stats.loads)
+        self.assertEqual(1, registry.stats.hits)
+        self.assertEqual(
+            examples[tree_id].competence_tree.to_json(),
+            dcm.competence_tree.to_json(),
+        )
+
+    def test_eviction(self):
+        """
+        test the least recently used eviction under a memory budget
+        """
+        registry = TreeRegistry(markup="yaml")
+        tree_ids = sorted(registry.keys())
+        for tree_id in tree_ids:
+            registry[tree_id]
+        self.assertEqual(len(tree_ids), registry.stats.loaded)
+        # only the most recently used tree fits
+        registry.memory_budget = 1
+        self.assertEqual(1, registry.stats.loaded)
+        self.assertEqual(len(tree_ids) - 1, registry.stats.evictions)
+        self.assertIn(tree_ids[-1], registry.loaded)
+        # evicted trees are loaded again on access
+        registry[tree_ids[0]]
+        self.assertEqual(len(tree_ids) + 1, registry.stats.loads)
+        self.assertEqual([tree_ids[0]], list(registry.loaded.keys()))
+
+    def test_hot_reload(self):
+        """
+        test that changed definitions are detected and swapped in
+        """
+        with tempfile.TemporaryDirectory() as examples_path:
+            filepath = os.path.join(examples_path, "architecture.yaml")
+            shutil.copy(
+                os.path.join(DynamicCompetenceMap.examples_path(), "architecture.yaml"),
+                filepath,
+            )
+            registry = TreeRegistry(examples_path, markup="yaml")
+            changed_ids = []
+            registry.add_listener(changed_ids.append)
+            self.assertEqual([], registry.scan())
+            dcm = registry["architecture"]
+            with open(filepath) as yaml_file:
+                definition = yaml_file.read()
+            mtime_ns = os.stat(filepath).st_mtime_ns
+
+            def write(text: str):
+                nonlocal mtime_ns
+                with open(filepath, "w") as yaml_file:
+                    yaml_file.write(text)
+                # make sure the change is visible even with a coarse mtime resolution
+                mtime_ns += 1_000_000_000
+                os.utime(filepath, ns=(mtime_ns, mtime_ns))
+
+            write(definition.replace("name: architecture", "name: changed"))
+            self.assertEqual(["architecture"], registry.scan())
+            self.assertEqual(["architecture"], changed_ids)
+            reloaded_dcm = registry["architecture"]
+            self.assertIsNot(dcm, reloaded_dcm)
+            self.assertEqual("changed", reloaded_dcm.competence_tree.name)
+            self.assertEqual(1, registry.stats.reloads)
+            # a broken definition keeps the last good version
+            write(definition + "\n  broken: [")
+            with self.assertLogs("dcm.tree_registry", level="WARNING"):
+                registry.scan()
+            self.assertIs(reloaded_dcm, registry["architecture"])
+            self.assertEqual(1, registry.stats.errors)
+            # a renamed tree
+            write(definition.replace("id: architecture", "id: renamed"))
+            self.assertEqual(["architecture", "renamed"], registry.scan())
+            self.assertNotIn("architecture", registry)
+            self.assertEqual("renamed", registry["renamed"].main_id)
+            os.remove(filepath)
+            self.assertEqual(["renamed"], registry.scan())
+            self.assertEqual(0, len(registry))
+            # the watcher thread
+            registry.start_watching(0.01)
+            write(definition)
+            for _i in range(500):
+                if "architecture" in registry:
+                    break
+                time.sleep(0.01)
+            registry.stop_watching()
+            self.assertIn("architecture", registry)